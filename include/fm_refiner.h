@@ -0,0 +1,163 @@
+#pragma once
+#include <ogdf/basic/Graph.h>
+#include <ogdf/basic/NodeArray.h>
+#include <ogdf/graphalg/PlanarSeparatorModule.h>
+#include <vector>
+
+using namespace ogdf;
+
+/**
+ * Fiduccia-Mattheyses style refinement of a vertex separator, usable as a postprocessor for all separator modules.
+ * A separator node v can be moved into one of the two halves, in which case its neighbours in the other half have to
+ * enter the separator. The gain of such a move is 1 - (number of neighbours of v in the other half).
+ * Moves are picked greedily from bucket queues with O(1) gain updates, every node is moved at most once per pass,
+ * and each pass is rolled back to the best separator seen during the pass.
+ * The balance constraint (no half larger than 2/3 of the nodes) is never violated by a move.
+ * Apart from reading the sides from the input lists once, a refinement only touches the separator nodes and the
+ * neighbourhoods of the moved and pulled nodes: the node arrays are kept between calls (for the same graph), the
+ * neighbour counts are only maintained for separator nodes and the lists are updated from the moves that were kept.
+ */
+class FMRefiner : public Postprocessor {
+
+public:
+
+	/**
+	 * Constructor.
+	 *
+	 * @param maxPasses maximum number of refinement passes
+	 * @param maxNonImproving number of consecutive moves without improvement after which a pass is stopped
+	 */
+	FMRefiner(int maxPasses = 8, int maxNonImproving = 100);
+
+	/**
+	 * Refines the separation.
+	 *
+	 * @param G the graph
+	 * @param separator the list of separator nodes
+	 * @param first the first half of the graph
+	 * @param second the second half of the graph
+	 * @return true if the separation was refined successfully
+	 */
+	virtual bool apply(const Graph &G, List<node> &separator, List<node> &first, List<node> &second) override;
+
+	/**
+	 * Returns the name of the postprocessor, used as suffix of the algorithm name.
+	 *
+	 * @return "FM"
+	 */
+	virtual std::string getName() const override {
+		return "FM";
+	}
+
+private:
+
+	/**
+	 * Bucket priority queue of separator nodes, indexed by gain.
+	 * Insertion, removal and gain updates take O(1), the maximum is found by scanning down from the highest gain.
+	 */
+	class BucketQueue {
+
+	public:
+
+		/**
+		 * Initializes an empty queue for the given graph.
+		 *
+		 * @param G the graph
+		 * @param maxDegree the maximum degree of G, which bounds the range of gains
+		 */
+		void init(const Graph &G, int maxDegree);
+
+		void insert(node v, int gain);
+
+		void remove(node v);
+
+		void update(node v, int gain);
+
+		bool contains(node v) const { return m_inQueue[v]; }
+
+		int gain(node v) const { return m_gain[v]; }
+
+		/**
+		 * Returns a node with maximum gain.
+		 *
+		 * @return the node or nullptr if the queue is empty
+		 */
+		node top();
+
+	private:
+
+		int m_offset = 0; // gain + offset = bucket index
+		int m_maxBucket = -1; // highest bucket that may be non-empty
+		std::vector<node> m_head;
+		NodeArray<node> m_next;
+		NodeArray<node> m_prev;
+		NodeArray<int> m_gain;
+		NodeArray<bool> m_inQueue;
+	};
+
+	/**
+	 * A single move of a separator node into one of the halves.
+	 */
+	struct Move {
+		node v;
+		int to; // 0 = first, 1 = second
+		size_t pulledBegin; // position of the first pulled node in m_pulled
+	};
+
+	static constexpr int SEP = 2;
+
+	int m_maxPasses;
+	int m_maxNonImproving;
+
+	NodeArray<int> m_side; // 0 = first, 1 = second, 2 = separator
+	NodeArray<int> m_origin; // side of every node in the input
+	NodeArray<ListIterator<node>> m_position; // position of every node in the input list of its half
+	NodeArray<int> m_count[2]; // number of neighbours in first / second half, only valid for separator nodes
+	NodeArray<bool> m_locked; // nodes that were already moved in the current pass
+	NodeArray<bool> m_listed; // helper to collect nodes without duplicates
+	int m_size[3];
+	int m_bound; // maximum allowed size of a half
+
+	BucketQueue m_queue[2]; // m_queue[k] contains the gains for moving separator nodes into half k
+	std::vector<Move> m_moves;
+	std::vector<node> m_pulled;
+	std::vector<node> m_touched; // all nodes that were moved or pulled in the current pass
+	std::vector<node> m_changed; // all nodes that were moved or pulled in any pass
+
+	/**
+	 * Initializes the node arrays and the queues for a new graph.
+	 *
+	 * @param G the graph
+	 */
+	void init(const Graph &G);
+
+	/**
+	 * Counts the neighbours of v in both halves.
+	 */
+	void countNeighbours(node v);
+
+	/**
+	 * Runs one refinement pass.
+	 *
+	 * @param sepNodes the separator nodes, replaced by the separator nodes after the pass
+	 * @return true if the separator became smaller or better balanced
+	 */
+	bool pass(std::vector<node> &sepNodes);
+
+	/**
+	 * Moves separator node v into half k and pulls its neighbours from the other half into the separator.
+	 */
+	void move(node v, int k);
+
+	/**
+	 * Reverts the last move.
+	 */
+	void undo();
+
+	/**
+	 * Finds the best feasible move into half k.
+	 *
+	 * @return the node to move or nullptr if there is none
+	 */
+	node bestMove(int k);
+};
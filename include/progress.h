@@ -0,0 +1,102 @@
+#pragma once
+#include <chrono>
+#include <fstream>
+#include <memory>
+#include <string>
+
+/**
+ * One progress event, a flat json object that is built field by field.
+ */
+class ProgressEvent {
+
+public:
+
+    /**
+     * Constructor.
+     *
+     * @param type the type of the event (value of the field "event")
+     */
+    explicit ProgressEvent(const std::string &type);
+
+    ProgressEvent &add(const std::string &key, const std::string &value);
+
+    ProgressEvent &add(const std::string &key, const char *value);
+
+    ProgressEvent &add(const std::string &key, int value);
+
+    ProgressEvent &add(const std::string &key, long value);
+
+    ProgressEvent &add(const std::string &key, unsigned long value);
+
+    ProgressEvent &add(const std::string &key, double value);
+
+    ProgressEvent &add(const std::string &key, bool value);
+
+    /**
+     * Adds a field whose value is already encoded as json (e.g. an array).
+     *
+     * @param key the name of the field
+     * @param json the encoded value
+     * @return this event
+     */
+    ProgressEvent &addJson(const std::string &key, const std::string &json);
+
+    /**
+     * @return the event as one line of json (without line break)
+     */
+    std::string str() const;
+
+private:
+
+    std::string json;
+};
+
+
+/**
+ * Encodes a string as json string (with quotes).
+ *
+ * @param value the string
+ * @return the encoded string
+ */
+std::string jsonString(const std::string &value);
+
+
+/**
+ * Stream of structured progress events of an experiment, written as json lines to a file or a pipe (see
+ * scripts/monitor.py). Every line is flushed immediately, so the stream can be followed while the experiment runs.
+ * Every event gets the field "elapsed", the seconds since the log was created.
+ * Events are written by the main thread only.
+ */
+class ProgressLog {
+
+public:
+
+    /**
+     * Constructor.
+     *
+     * @param file path to the event file (appended to) or pipe, no events are written if empty
+     */
+    explicit ProgressLog(const std::string &file);
+
+    /**
+     * @return whether events are written
+     */
+    bool enabled() const;
+
+    /**
+     * Writes an event (nothing happens if the log is disabled).
+     *
+     * @param event the event
+     */
+    void write(ProgressEvent &event);
+
+    /**
+     * @return the seconds since the log was created
+     */
+    double elapsed() const;
+
+private:
+
+    std::unique_ptr<std::ofstream> out;
+    std::chrono::steady_clock::time_point start;
+};
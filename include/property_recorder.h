@@ -2,6 +2,7 @@
 #pragma once
 #include <utils.h>
 #include <map>
+#include <vector>
 #include <iostream>
 #include <tinyxml2.h>
 #include <filesystem>
@@ -24,6 +25,11 @@ public:
 	 * diameter_lB = lower bound of the diameter
 	 * diameter_uB = upper bound of the diameter
 	 * name = name of the instance (filename)
+	 * roots = the sampled roots of the level width profiles
+	 * levelWidths = number of nodes per BFS level, one profile per sampled root
+	 * middleWidth = minimum width of the middle level (the level containing the median node) over all sampled roots
+	 * faceSizes = histogram of the face sizes of the planar embedding (size -> number of faces)
+	 * degrees = histogram of the node degrees (degree -> number of nodes)
 	 */
     struct Properties {
 		int nodes = 0;
@@ -33,14 +39,21 @@ public:
         int diameter_lB = -1;
         int diameter_uB = -1;
         std::string name = "anonymous";
+        std::vector<int> roots;
+        std::vector<std::vector<int>> levelWidths;
+        int middleWidth = -1;
+        std::map<int, int> faceSizes;
+        std::map<int, int> degrees;
     };
 
 	/**
 	 * Constructor.
 	 *
 	 * @param file the path to the xml file that will contain the properties
+	 * @param samples number of sampled roots for the level width profiles
+	 * @param threads number of threads used to compute the level width profiles
 	 */
-    PropertyRecorder(const std::string &file);
+    PropertyRecorder(const std::string &file, int samples = 8, int threads = 4);
 
 	/**
 	 * Applies the PR recursively to a directory of instance files.
@@ -71,6 +84,10 @@ private:
 
     std::string fileName; // name of the xml document
 
+    int samples; // number of sampled roots for the level width profiles
+
+    int threads; // number of threads for the level width profiles
+
 	/**
 	 * Reads a single xml-node corresponding to an instance and containing the data into a properties-object that is
 	 * then stored in the propMap. (Used when reading in an xml-file)
@@ -87,4 +104,13 @@ private:
 	 */
     void processInstance(std::string path);
 
+	/**
+	 * Calculates the structural statistics of a graph: level width profiles from sampled roots, the minimum middle
+	 * level width, the face size histogram and the degree histogram.
+	 *
+	 * @param G the graph, must be simple and planar embedded
+	 * @param prop the properties to store the statistics in
+	 */
+    void calculateStructure(const Graph &G, Properties &prop) const;
+
 };
@@ -0,0 +1,178 @@
+#pragma once
+#include <property_recorder.h>
+#include <fstream>
+#include <map>
+#include <memory>
+#include <string>
+#include <vector>
+
+/**
+ * Container for one line of the results.
+ * Stores data on the instance, the algorithm and the solution - some of it redundant.
+ */
+struct Result {
+
+    std::string algorithm;
+    const PropertyRecorder::Properties *prop; // properties of the instance, not copied (they have to outlive the result)
+    int nodes;
+    int edges;
+    long time;
+    int sepSize;
+    int shortSize; // size of the smaller half
+    int longSize;  // size of the larger half
+    double balance;   // defined as A/B where A is the smaller half
+    double ratio; // defined as S/A where A is the smaller half
+    std::string exitPoint;
+
+
+    /**
+     * Constructor.
+     *
+     * @param algorithm the name of the algorithm
+     * @param prop properties of the instance, only referenced
+     * @param nodes number of nodes of the instance
+     * @param edges number of edges of the instance
+     * @param time time in microseconds it took to solve the instance
+     * @param sepSize separator size (nodes in the separator)
+     * @param firstSize size of the first list
+     * @param secondSize size of the second list
+     * @param exitPoint identifier of the termination point of the algorithm
+     */
+    Result(const std::string &algorithm, const PropertyRecorder::Properties &prop, int nodes, int edges, long time, int sepSize, int firstSize, int secondSize, const std::string &exitPoint);
+
+
+    /**
+     * Exports the result to one csv-line.
+     *
+     * @return a string containing the data of this result
+     */
+    std::string to_csv() const;
+
+
+    /**
+     * Contains the headline of the csv-file.
+     *
+     * @return the headline
+     */
+    static std::string get_head();
+};
+
+
+/**
+ * Destination of the results of an experiment. Results are buffered and written in blocks.
+ */
+class ResultSink {
+
+public:
+
+    virtual ~ResultSink() = default;
+
+    /**
+     * Adds a result, it is written at the latest when flush is called.
+     *
+     * @param res the result
+     */
+    virtual void write(const Result &res) = 0;
+
+    /**
+     * Writes all buffered results to the file.
+     */
+    virtual void flush() = 0;
+};
+
+
+/**
+ * Writes results as lines of a csv-file.
+ */
+class CsvResultSink : public ResultSink {
+
+public:
+
+    /**
+     * Constructor, creates the file and writes the headline.
+     *
+     * @param file path to the csv-file
+     * @param blockSize number of results that are buffered before they are written
+     */
+    CsvResultSink(const std::string &file, size_t blockSize = 4096);
+
+    ~CsvResultSink() override;
+
+    void write(const Result &res) override;
+
+    void flush() override;
+
+private:
+
+    std::string fileName;
+    size_t blockSize;
+    size_t buffered = 0;
+    std::string buffer;
+};
+
+
+/**
+ * Writes results as fixed-width binary records (see scripts/utils.py, read_binary_results).
+ *
+ * The result file starts with a 16 byte header (magic "PSRES01\n", record size, reserved), followed by records of
+ * 28 bytes (little endian, no padding):
+ *      uint32 instance, uint16 algorithm, uint16 exit, int64 time, int32 sep_size, int32 short, int32 long
+ * Algorithm, instance and exit point are dictionary-encoded: their codes are defined in a text file next to the
+ * result file (<file>.dict), one entry per line, appended before the first record that uses them:
+ *      algorithm <code> <name>
+ *      exit <code> <name>
+ *      instance <code> <nodes> <edges> <diameter> <diam_lB> <diam_uB> <radius> <name>
+ * Per-instance data is only stored in the dictionary, balance and ratio are derived from the sizes of the halves.
+ */
+class BinaryResultSink : public ResultSink {
+
+public:
+
+    static constexpr size_t recordSize = 28;
+
+    /**
+     * Constructor, creates the result file and the dictionary file.
+     *
+     * @param file path to the result file
+     * @param blockSize number of results that are buffered before they are written
+     */
+    BinaryResultSink(const std::string &file, size_t blockSize = 65536);
+
+    ~BinaryResultSink() override;
+
+    void write(const Result &res) override;
+
+    void flush() override;
+
+private:
+
+    std::string fileName;
+    size_t blockSize;
+    std::vector<char> buffer;
+    std::string dictionaryBuffer; // entries that were not yet written
+
+    std::map<std::string, uint16_t> algorithms;
+    std::map<std::string, uint16_t> exitPoints;
+    std::map<std::string, uint32_t> instances;
+
+    /**
+     * Looks up the code of a name, a new entry is added to the dictionary if the name has no code yet.
+     *
+     * @param dictionary the dictionary of the name
+     * @param kind the kind of the entry (algorithm, exit or instance)
+     * @param name the name
+     * @param instance for instance entries, the result whose instance data is stored in the entry
+     * @return the code
+     */
+    template<typename T>
+    T encode(std::map<std::string, T> &dictionary, const std::string &kind, const std::string &name, const Result* instance = nullptr);
+};
+
+
+/**
+ * Creates the result sink matching the extension of the result file: binary records for .psr, csv otherwise.
+ *
+ * @param file path to the result file
+ * @return the sink
+ */
+std::unique_ptr<ResultSink> createResultSink(const std::string &file);
@@ -0,0 +1,51 @@
+#pragma once
+#include <memory>
+#include <string>
+#include <vector>
+#include <ogdf/graphalg/PlanarSeparatorModule.h>
+
+using namespace ogdf;
+
+/**
+ * Ecoding algorithms as const longs to select algorithms.
+ */
+const short LT      = 1 << 0;
+const short LTFC    = 1 << 1;
+const short D       = 1 << 2;
+const short DFC     = 1 << 3;
+const short HP      = 1 << 4;
+const short all     = (1 << 5) - 1;
+
+/**
+ * Parses a selection of algorithms from a string (as passed via -A), e.g. "LipTar,DFC,HP".
+ *
+ * @param names the names of the selected algorithms
+ * @return the selection encoded as bit flags
+ */
+short parseAlgorithms(const std::string &names);
+
+/**
+ * Creates fresh instances of all selected separator modules, in the order LT, Dual, LTFC, DualFC, HPN.
+ *
+ * @param selection bit flags of the selected algorithms
+ * @return the separator modules
+ */
+std::vector<std::unique_ptr<PlanarSeparatorModule>> createSeparators(short selection);
+
+/**
+ * Tells whether a separator module draws from OGDF's shared random stream (randomNumber) while separating. Such
+ * modules have to be seeded per solve, otherwise their results depend on the order in which the threads draw.
+ * The other modules are deterministic once their start node is set.
+ *
+ * @param sep the separator module
+ * @return true if the module is randomized
+ */
+bool usesRandomness(const PlanarSeparatorModule &sep);
+
+/**
+ * Creates a fresh postprocessor from its name.
+ *
+ * @param name the name of the postprocessor as returned by getName(), i.e. "NE", "DMD" or "FM"
+ * @return the postprocessor
+ */
+std::unique_ptr<Postprocessor> createPostprocessor(const std::string &name);
@@ -75,6 +75,27 @@ void readGraph(Graph &G, std::string path);
 unsigned long getHashCode(std::string path);
 
 
+/**
+ * Stores the rotation system (the cyclic order of the neighbours of every node) of an embedded simple graph in a
+ * binary file. Nodes are identified by their position in G.nodes, i.e. by the order in the instance file.
+ *
+ * @param G the embedded graph
+ * @param file the path to the binary file
+ */
+void writeRotationSystem(const Graph &G, const std::string &file);
+
+
+/**
+ * Embeds a simple graph according to a rotation system stored with writeRotationSystem.
+ * Fails if the file does not exist, does not match the graph or does not describe a planar embedding.
+ *
+ * @param G the graph (as read from the same instance file, made simple and undirected)
+ * @param file the path to the binary file
+ * @return true if G now has the stored planar embedding
+ */
+bool readRotationSystem(Graph &G, const std::string &file);
+
+
 /**
  * Extracts the file name from a path.
  *
@@ -0,0 +1,389 @@
+"""
+This script maintains a catalog of all instances, built from the property file, and selects instances from it.
+The catalog contains one row per instance (path, name, collection, family, nodes, edges, diameter, diameter_lB,
+diameter_uB, radius, structural statistics and hash) and can be queried with expressions like
+
+    family in (grid, delaunay) and nodes < 50k
+    collection == vlsi and not family in (lin, msm)
+    name like "table/*" or diameter_uB >= 1000
+
+Supported are comparisons (<, <=, >, >=, ==, !=), "in" / "not in" with a list of values, "like" with shell-style
+wildcards, "and", "or", "not" and parentheses. Numbers may carry a k (thousand) or M (million) suffix.
+The selected instance names are written to a selection file, which is read by the experiment (-s option of main.cpp),
+so excluded instances are never opened or parsed. The analysis scripts accept the same expressions (--select).
+"""
+
+import argparse
+import csv
+import fnmatch
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from deduplicate import file_hash
+
+CATALOG_COLUMNS = ["path", "name", "collection", "family", "nodes", "edges", "diameter", "diameter_lB", "diameter_uB",
+                   "radius", "middle_width", "max_width", "mean_face", "max_degree", "hash"]
+
+numeric_columns = {"nodes", "edges", "diameter", "diameter_lB", "diameter_uB", "radius", "middle_width", "max_width",
+                   "mean_face", "max_degree"}
+
+_TOKEN = re.compile(r'\s*(?:(<=|>=|==|!=|<|>|=|\(|\)|,)|"([^"]*)"|\'([^\']*)\'|([^\s()<>=!,"\']+))')
+_SUFFIX = {'k': 1e3, 'K': 1e3, 'M': 1e6}
+
+
+def read_properties(file):
+    """
+    Reads the property file generated by the property recorder.
+
+    :param file: path to the xml-file
+    :return: dictionary mapping identifier (instance path) to dictionary of properties
+    """
+    props = dict()
+    if file is None or not os.path.exists(file):
+        return props
+
+    for instance in ET.parse(file).getroot().findall('instance'):
+        props[instance.find('identifier').text] = {child.tag: child.text for child in instance
+                                                   if child.tag != 'structure'}
+    return props
+
+
+def _histogram(text):
+    return {int(key): int(count) for key, count in (entry.split(":") for entry in (text or "").split())}
+
+
+def read_structure(file):
+    """
+    Reads the structural statistics recorded by the property recorder (level width profiles from sampled roots,
+    minimum middle level width, face size and degree histograms).
+
+    :param file: path to the xml-file
+    :return: dictionary mapping identifier (instance path) to dictionary with keys roots, level_widths, middle_width,
+             face_sizes and degrees, instances without statistics are left out
+    """
+    structure = dict()
+    if file is None or not os.path.exists(file):
+        return structure
+
+    for instance in ET.parse(file).getroot().findall('instance'):
+        element = instance.find('structure')
+        if element is None:
+            continue
+        levels = element.findall('levels')
+        structure[instance.find('identifier').text] = {
+            'roots': [int(level.get('root')) for level in levels],
+            'level_widths': [[int(width) for width in (level.text or "").split()] for level in levels],
+            'middle_width': int(element.find('middle_width').text),
+            'face_sizes': _histogram(element.find('face_sizes').text),
+            'degrees': _histogram(element.find('degrees').text)}
+    return structure
+
+
+def summarize_structure(statistics):
+    """
+    Condenses the structural statistics of one instance into the catalog columns.
+
+    :param statistics: dictionary as returned by read_structure for one instance, or None
+    :return: dictionary with middle_width, max_width, mean_face and max_degree (-1 if unknown)
+    """
+    if statistics is None:
+        return {'middle_width': -1, 'max_width': -1, 'mean_face': -1, 'max_degree': -1}
+
+    faces = statistics['face_sizes']
+    total = sum(faces.values())
+    return {'middle_width': statistics['middle_width'],
+            'max_width': max((max(widths) for widths in statistics['level_widths'] if widths), default=-1),
+            'mean_face': round(sum(size * count for size, count in faces.items()) / total, 4) if total > 0 else -1,
+            'max_degree': max(statistics['degrees'], default=-1)}
+
+
+def family_of(name):
+    """
+    Derives the family of an instance from its name: the file name without its numeric parameters
+    (e.g. delaunay for delaunay_large/delaunay_10000, alue for vlsi/ALUE/alue2087). Instances without numeric
+    parameters (e.g. the cities in europe/) belong to the family of their directory.
+
+    :param name: the instance name
+    :return: the family
+    """
+    directory, _, file = name.rpartition("/")
+    family = re.sub(r'[_\d]+$', '', file)
+    if family == file or not family:
+        family = directory.rpartition("/")[2] if directory else file
+    return family.lower()
+
+
+def catalog_row(path, prop, with_hash=True, statistics=None):
+    """
+    Creates the catalog entry of one instance.
+
+    :param path: path to the instance
+    :param prop: dictionary of properties as returned by read_properties
+    :param with_hash: whether to compute the hash of the file contents (the file is not parsed)
+    :param statistics: structural statistics as returned by read_structure, or None
+    :return: dictionary with one entry per catalog column
+    """
+    name = prop['name']
+    row = {'path': path, 'name': name, 'collection': name.split("/")[0], 'family': family_of(name)}
+    row.update(summarize_structure(statistics))
+    for column in ["nodes", "edges", "diameter", "diameter_lB", "diameter_uB", "radius"]:
+        row[column] = int(prop.get(column, -1))
+    row['hash'] = file_hash(path) if with_hash and os.path.exists(path) else ""
+    return row
+
+
+def build_catalog(property_file, with_hash=True):
+    """
+    Builds the catalog from the property file.
+
+    :param property_file: path to the property file
+    :param with_hash: whether to compute the hash of the file contents
+    :return: list of dictionaries, one per instance
+    """
+    structure = read_structure(property_file)
+    return [catalog_row(path, prop, with_hash, structure.get(path))
+            for path, prop in sorted(read_properties(property_file).items())]
+
+
+def write_catalog(catalog, file):
+    """
+    :param catalog: list of dictionaries as returned by build_catalog
+    :param file: path to the csv-file
+    """
+    with open(file, 'w', newline='') as target:
+        writer = csv.DictWriter(target, fieldnames=CATALOG_COLUMNS)
+        writer.writeheader()
+        writer.writerows(catalog)
+
+
+def read_catalog(file):
+    """
+    :param file: path to the csv-file
+    :return: list of dictionaries, one per instance
+    """
+    with open(file, 'r', newline='') as source:
+        catalog = list(csv.DictReader(source))
+    for row in catalog:
+        for column in numeric_columns:
+            value = float(row[column])
+            row[column] = int(value) if value.is_integer() else value
+    return catalog
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Could not parse expression at '{expression[position:]}'")
+        operator, double_quoted, single_quoted, word = match.groups()
+        if operator is not None:
+            tokens.append(('op', operator))
+        elif word is not None:
+            tokens.append(('word', word))
+        else:
+            tokens.append(('string', double_quoted if double_quoted is not None else single_quoted))
+        position = match.end()
+    return tokens
+
+
+def _value(token, column):
+    kind, text = token
+    if column not in numeric_columns:
+        return text
+    if kind == 'string':
+        raise ValueError(f"Column {column} is numeric, got '{text}'")
+    factor = _SUFFIX.get(text[-1], 1)
+    number = float(text[:-1] if factor != 1 else text) * factor
+    return int(number) if number.is_integer() else number
+
+
+class _Parser:
+    """
+    Recursive descent parser that compiles an expression into a predicate on catalog rows.
+    """
+
+    _comparisons = {'<': lambda a, b: a < b, '<=': lambda a, b: a <= b, '>': lambda a, b: a > b,
+                    '>=': lambda a, b: a >= b, '==': lambda a, b: a == b, '=': lambda a, b: a == b,
+                    '!=': lambda a, b: a != b}
+
+    def __init__(self, expression):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def keyword(self, word):
+        kind, text = self.peek()
+        if kind == 'word' and text.lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, operator):
+        if self.take() != ('op', operator):
+            raise ValueError(f"Expected '{operator}'")
+
+    def parse(self):
+        predicate = self.disjunction()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unexpected token '{self.peek()[1]}'")
+        return predicate
+
+    def disjunction(self):
+        terms = [self.conjunction()]
+        while self.keyword('or'):
+            terms.append(self.conjunction())
+        return terms[0] if len(terms) == 1 else lambda row: any(term(row) for term in terms)
+
+    def conjunction(self):
+        terms = [self.negation()]
+        while self.keyword('and'):
+            terms.append(self.negation())
+        return terms[0] if len(terms) == 1 else lambda row: all(term(row) for term in terms)
+
+    def negation(self):
+        if self.keyword('not'):
+            term = self.negation()
+            return lambda row: not term(row)
+        if self.peek() == ('op', '('):
+            self.take()
+            term = self.disjunction()
+            self.expect(')')
+            return term
+        return self.comparison()
+
+    def comparison(self):
+        kind, column = self.take()
+        if kind != 'word' or column not in CATALOG_COLUMNS:
+            raise ValueError(f"Unknown column '{column}', expected one of {CATALOG_COLUMNS}")
+
+        if self.keyword('like'):
+            pattern = _value(self.take(), None)
+            return lambda row: fnmatch.fnmatchcase(str(row[column]), pattern)
+
+        negated = self.keyword('not')
+        if negated or self.keyword('in'):
+            if negated and not self.keyword('in'):
+                raise ValueError("Expected 'in' after 'not'")
+            self.expect('(')
+            values = {_value(self.take(), column)}
+            while self.peek() == ('op', ','):
+                self.take()
+                values.add(_value(self.take(), column))
+            self.expect(')')
+            return lambda row: (row[column] in values) != negated
+
+        kind, operator = self.take()
+        if kind != 'op' or operator not in self._comparisons:
+            raise ValueError(f"Expected comparison after '{column}', got '{operator}'")
+        compare = self._comparisons[operator]
+        value = _value(self.take(), column)
+        return lambda row: compare(row[column], value)
+
+
+def compile_expression(expression):
+    """
+    Compiles a selection expression (see module docstring).
+
+    :param expression: the expression, an empty expression selects everything
+    :return: predicate that takes a catalog row
+    """
+    if not expression or not expression.strip():
+        return lambda row: True
+    return _Parser(expression).parse()
+
+
+def select(catalog, expression):
+    """
+    :param catalog: list of dictionaries as returned by build_catalog or read_catalog
+    :param expression: the selection expression
+    :return: list of the selected rows
+    """
+    predicate = compile_expression(expression)
+    return [row for row in catalog if predicate(row)]
+
+
+def load(catalog_file="../instances/catalog.csv", property_file="../instances/properties.xml"):
+    """
+    Reads the catalog, or builds it from the property file (without hashes) if it does not exist.
+
+    :param catalog_file: path to the catalog
+    :param property_file: path to the property file
+    :return: list of dictionaries, one per instance
+    """
+    if os.path.exists(catalog_file):
+        return read_catalog(catalog_file)
+    return build_catalog(property_file, with_hash=False)
+
+
+def selected_names(expression, catalog_file="../instances/catalog.csv", property_file="../instances/properties.xml"):
+    """
+    Selects instances by expression, used by the analysis scripts to filter result data.
+
+    :param expression: the selection expression
+    :param catalog_file: path to the catalog
+    :param property_file: path to the property file (used if the catalog does not exist)
+    :return: set of instance names
+    """
+    return {row['name'] for row in select(load(catalog_file, property_file), expression)}
+
+
+def write_selection(rows, file):
+    """
+    Writes the names of the selected instances, one per line (read by main.cpp).
+
+    :param rows: the selected catalog rows
+    :param file: path to the selection file
+    """
+    with open(file, 'w') as target:
+        target.writelines(row['name'] + "\n" for row in rows)
+
+
+def main(property_file, catalog_file, build, expression, selection):
+    """
+    (Re-)builds the catalog if required and selects instances from it.
+
+    :param property_file: path to the property file
+    :param catalog_file: path to the catalog
+    :param build: whether to rebuild the catalog
+    :param expression: selection expression, or None
+    :param selection: path to the selection file to write, or None
+    """
+    if build or not os.path.exists(catalog_file):
+        catalog = build_catalog(property_file)
+        write_catalog(catalog, catalog_file)
+        print(f"Wrote catalog of {len(catalog)} instances to {catalog_file}")
+    else:
+        catalog = read_catalog(catalog_file)
+
+    if expression is not None:
+        rows = select(catalog, expression)
+        print(f"Selected {len(rows)} of {len(catalog)} instances:")
+        for row in rows:
+            print(f"\t{row['name']} ({row['nodes']} nodes, {row['edges']} edges)")
+        if selection is not None:
+            write_selection(rows, selection)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Instance catalog.')
+    parser.add_argument('--properties', type=str, default="../instances/properties.xml", help='Path to property file')
+    parser.add_argument('--catalog', type=str, default="../instances/catalog.csv", help='Path to catalog')
+    parser.add_argument('--build', action='store_true', help='Rebuild the catalog')
+    parser.add_argument('--select', type=str, default=None, help='Selection expression')
+    parser.add_argument('--selection', type=str, default=None, help='Path to resulting selection file')
+    args = parser.parse_args()
+
+    main(args.properties, args.catalog, args.build, args.select, args.selection)
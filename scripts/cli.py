@@ -0,0 +1,57 @@
+"""
+Single entry point for the analysis scripts, e.g.
+    python -m cli table --path ../results/data.csv
+    python -m cli analysis --source ../results/data.csv --target ../plots/
+(run from the scripts directory, like the scripts themselves).
+
+Only the script of the chosen subcommand is imported, so the start-up time of a subcommand does not depend on the
+others. The plotting stack (matplotlib, seaborn) is only imported by utils.py when a plot is rendered, so
+subcommands that do not plot never load it.
+
+--profile and --cprofile (before the subcommand) trace the stages of the pipeline, see profiling.py.
+"""
+
+import argparse
+import importlib
+import sys
+
+import profiling
+
+# maps subcommand to (module, description), the modules provide add_arguments(parser) and run(args)
+COMMANDS = {"table": ("create_table", "Prints the overview table (LaTeX)"),
+            "analysis": ("data_analysis", "Plots the results of the experiments"),
+            "heuristics": ("heuristic_comparison", "Plots the comparison of the postprocessing heuristics"),
+            "diameter": ("diameter_analysis", "Plots the diameters of the instances"),
+            "sanity": ("sanity", "Aggregates the mean separator sizes per instance and algorithm"),
+            "report": ("report", "Writes a static interactive HTML report of the results")}
+
+
+def main(argv=None):
+    """
+    Parses the subcommand, imports its script and runs it with the remaining arguments.
+
+    :param argv: the command line arguments (without the program name), sys.argv[1:] if None
+    """
+    parser = argparse.ArgumentParser(prog="python -m cli", description='Analysis of the experimental data.')
+    parser.add_argument('--profile', type=str, default=None, metavar='TRACE',
+                        help=f'Write a json trace of the pipeline stages (or set {profiling.PROFILE_ENV})')
+    parser.add_argument('--cprofile', type=str, default=None, metavar='DUMP',
+                        help=f'Write a cProfile dump (or set {profiling.CPROFILE_ENV})')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+    for name, (_, description) in COMMANDS.items():
+        # the arguments of a subcommand are parsed by its own parser (including --help)
+        commands.add_parser(name, help=description, add_help=False)
+
+    args, rest = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    module_name, description = COMMANDS[args.command]
+    module = importlib.import_module(module_name)
+    command_parser = argparse.ArgumentParser(prog=f"python -m cli {args.command}", description=description)
+    module.add_arguments(command_parser)
+    command_args = command_parser.parse_args(rest)
+    with profiling.session(args.profile, args.cprofile):
+        module.run(command_args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,8 @@
 """
 This script analyses the experimental data by recreating table 1 from holzer et al.
 """
-import pandas as pd
 import argparse
-from utils import create_table
+from utils import create_table, read_results
 
 
 def main(path):
@@ -12,7 +11,7 @@ def main(path):
     """
 
     # read csv file
-    df = pd.read_csv(path, sep=r'\s*,\s*', encoding='utf-8', engine='python')
+    df = read_results(path)
 
     # create table
     base_algorithms = ["Dual", "DualFC", "HPN"]
@@ -23,9 +22,25 @@ def main(path):
     print(table_tex)
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Creation of overview table.')
+def add_arguments(parser):
+    """
+    Adds the command line arguments to a parser (shared with cli.py).
+
+    :param parser: the argument parser
+    """
     parser.add_argument('--path', type=str, help='Path to data file')
-    args = parser.parse_args()
 
+
+def run(args):
+    """
+    Runs the script with the parsed command line arguments.
+
+    :param args: the parsed arguments
+    """
     main(args.path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Creation of overview table.')
+    add_arguments(parser)
+    run(parser.parse_args())
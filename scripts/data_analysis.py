@@ -9,37 +9,43 @@ More specifically:
     3. Plots speed of core algorithms as violin- and boxplots
     4. Plots mean balance as bar-chart
     5. Plots the runtime development as line chart (0-1K nodes and 0-1M nodes)
+    6. Plots the relative separator sizes against the instance structure (if recorded)
 """
-from distutils.util import strtobool
-import pandas as pd
 import argparse
 import utils
 import os
+import catalog
+import profiling
 from utils import analyze_separator_size, analyze_instance_performance, analyze_separator_speed, \
-    analyze_separator_balance, analyze_runtime_development
+    analyze_separator_balance, analyze_runtime_development, analyze_structure
 
 
-def main(path, target, post):
+def main(path, target, post, selection=None):
     """
     Calls the different analysis methods.
 
-    :param path: path to csv-file generated by experiments
+    :param path: path (or list of paths) to csv-files generated by experiments or reference_separators.py
     :param target: path to folder to contain results
     :param post: whether to use best postprocessing for scatter plot or not
+    :param selection: expression to select instances by (see catalog.py), or None
     """
 
     # read csv file
-    df = pd.read_csv(path, sep=r'\s*,\s*', encoding='utf-8', engine='python')
+    df = utils.read_results(path)
 
-    df = df[df['instance'] != 'table/diameter/diameter_3333']
+    with profiling.stage("data_analysis.select", rows=len(df)):
+        if selection is not None:
+            df = df[df['instance'].isin(catalog.selected_names(selection))]
 
-    print(f"Analyzing instances ranging in size from {df['nodes'].min()} nodes to {df['nodes'].max()} nodes.")
+        df = df[df['instance'] != 'table/diameter/diameter_3333']
 
-    df = df.sort_values(by=['nodes'])
-    instances = df['instance'].unique()
+        print(f"Analyzing instances ranging in size from {df['nodes'].min()} nodes to {df['nodes'].max()} nodes.")
+
+        df = df.sort_values(by=['nodes'])
+        instances = df['instance'].unique()
 
     present_algorithms = df['algorithm'].unique()
-    algorithms = [alg for alg in utils.core_algorithms if alg in present_algorithms]
+    algorithms = [alg for alg in utils.core_algorithms + utils.reference_algorithms if alg in present_algorithms]
 
     # Which core algorithm yields the smallest relative separators?
     analyze_separator_size(df, "rel_sepsize_core", algorithms, instances, target)
@@ -63,15 +69,43 @@ def main(path, target, post):
     # Analyze runtime development
     analyze_runtime_development(df, "runtime_dev", algorithms, instances, 1000000, 'nodes', True, target)
 
+    # Can the structure of the instances explain the separator sizes?
+    structure = {row['name']: row for row in catalog.load()}
+    for column in ['middle_width', 'mean_face']:
+        if any(row[column] >= 0 for row in structure.values()):
+            analyze_structure(df, "structure_" + column, algorithms, instances, structure, column, target)
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
-    parser.add_argument('--source', type=str, help='Path to data file')
+
+def add_arguments(parser):
+    """
+    Adds the command line arguments to a parser (shared with cli.py).
+
+    :param parser: the argument parser
+    """
+    parser.add_argument('--source', type=str, nargs='+', help='Path(s) to data file(s)')
     parser.add_argument('--target', type=str, help='Path to folder with plots')
-    parser.add_argument('--post', type=lambda x: bool(strtobool(x)), default=True,
+    parser.add_argument('--force', action='store_true', help='Render all plots, even those that are up to date')
+    parser.add_argument('--post', type=lambda x: x.lower() in ("y", "yes", "t", "true", "on", "1"), default=True,
                         help='Whether to use postprocessing for scatter plot')
-    args = parser.parse_args()
+    parser.add_argument('--select', type=str, default=None,
+                        help='Expression to select instances, e.g. "family in (grid, delaunay) and nodes < 50k"')
+
 
+def run(args):
+    """
+    Runs the script with the parsed command line arguments.
+
+    :param args: the parsed arguments
+    """
+    utils.memoize_plots = not args.force
     if not os.path.exists(args.target):
         os.mkdir(args.target)
-    main(args.source, args.target, args.post)
+    main(args.source, args.target, args.post, args.select)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
+    add_arguments(parser)
+    args = parser.parse_args()
+    with profiling.session():  # ANALYSIS_PROFILE / ANALYSIS_CPROFILE
+        run(args)
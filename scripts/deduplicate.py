@@ -0,0 +1,314 @@
+"""
+This script indexes the instance corpus and finds duplicate instances, i.e. files that are byte-identical or contain
+structurally identical graphs under a different path or in a different format.
+Every graph gets a canonical structural fingerprint consisting of its size, its degree signature and a
+Weisfeiler-Lehman hash (computed vectorized on the CSR arrays). Instances with equal fingerprints are candidates
+only (Weisfeiler-Lehman cannot tell apart e.g. tori of the same size), so every group of files that are not
+byte-identical is confirmed by an exact isomorphism test before it is written to an alias file, which allows the
+experiment to solve each unique graph once and copy the results to all of its aliases (see the -d option of main.cpp).
+"""
+
+import argparse
+import hashlib
+import xml.etree.ElementTree as ET
+import numpy as np
+
+from graphs import read_graph, list_instances, from_edges
+
+_MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _mix(x):
+    """
+    splitmix64 finalizer, applied elementwise to an uint64 array (overflow wraps around on purpose).
+    """
+    with np.errstate(over='ignore'):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return (x ^ (x >> np.uint64(31))) & _MASK
+
+
+def wl_hash(graph, iterations=4):
+    """
+    Weisfeiler-Lehman hash of a graph: starting from the degrees, every node label is repeatedly replaced by a hash of
+    itself and the multiset of its neighbours' labels (a sum of mixed labels, which is order invariant).
+    Isomorphic graphs always get the same hash.
+
+    :param graph: the CSRGraph
+    :param iterations: number of refinement rounds
+    :return: hex digest of the sorted final labels
+    """
+    labels = graph.degrees().astype(np.uint64)
+    sources = graph.sources()
+    for _ in range(iterations):
+        neighbourhood = np.zeros(graph.n, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            np.add.at(neighbourhood, sources, _mix(labels[graph.indices]))
+            labels = _mix(labels * np.uint64(0x9E3779B97F4A7C15) + neighbourhood)
+    return hashlib.sha1(np.sort(labels).tobytes()).hexdigest()
+
+
+def fingerprint(graph):
+    """
+    Canonical structural fingerprint of a graph: size, degree signature and Weisfeiler-Lehman hash.
+
+    :param graph: the CSRGraph
+    :return: fingerprint string
+    """
+    degrees = np.bincount(graph.degrees())
+    signature = hashlib.sha1(degrees.astype(np.int64).tobytes()).hexdigest()[:12]
+    return f"{graph.n}-{graph.m}-{signature}-{wl_hash(graph)[:24]}"
+
+
+def _neighbour_sum(graph, values):
+    """
+    :return: for every node, the sum of the values of its neighbours (uint64, wrapping around)
+    """
+    degrees = graph.degrees()
+    sums = np.zeros(graph.n, dtype=np.uint64)
+    if len(graph.indices) > 0:
+        with np.errstate(over='ignore'):
+            sums[degrees > 0] = np.add.reduceat(values[graph.indices], graph.indptr[:-1][degrees > 0])
+    return sums
+
+
+def _refine(graph, colors):
+    """
+    Color refinement: repeatedly splits the color classes by the multiset of neighbour colors, until the number of
+    classes stays the same. The result only depends on the structure, so it is the same for isomorphic graphs.
+
+    :param graph: the CSRGraph
+    :param colors: array of initial colors
+    :return: array of colors 0, 1, ... (stable coloring)
+    """
+    colors = np.unique(colors, return_inverse=True)[1].ravel()
+    classes = colors.max(initial=-1) + 1
+    while True:
+        labels = _mix(colors.astype(np.uint64) + np.uint64(1))
+        with np.errstate(over='ignore'):
+            keys = _mix(labels * np.uint64(0x9E3779B97F4A7C15) + _neighbour_sum(graph, _mix(labels)))
+        refined = np.unique(keys, return_inverse=True)[1].ravel()
+        if refined.max(initial=-1) + 1 <= classes:
+            return colors
+        colors = refined
+        classes = colors.max() + 1
+
+
+def isomorphic(first, second, budget=1000):
+    """
+    Exact isomorphism test by individualization and refinement on the disjoint union of both graphs: the union is
+    refined, then a node of a non-trivial class is individualized together with a candidate of the other graph, until
+    all classes are singletons, which defines a bijection. A greedy pass first individualizes one node of every
+    non-trivial class at once (which succeeds quickly for the symmetries of real instances), then a backtracking search
+    tries all candidates. Every bijection is verified edge by edge, so a positive answer is always correct.
+
+    :param first: the first CSRGraph
+    :param second: the second CSRGraph
+    :param budget: maximum number of refinements
+    :return: True if the graphs are isomorphic, False if not, None if the budget was exhausted
+    """
+    n = first.n
+    if n != second.n or first.m != second.m or \
+            not np.array_equal(np.sort(first.degrees()), np.sort(second.degrees())):
+        return False
+
+    expected = np.sort(second.sources() * n + second.indices)
+
+    def verify(mapping):
+        return np.array_equal(np.sort(mapping[first.sources()] * n + mapping[first.indices]), expected)
+
+    # same graph with the same numbering, e.g. in another file format
+    if verify(np.arange(n)):
+        return True
+
+    union = from_edges(2 * n, np.concatenate([first.sources(), second.sources() + n]),
+                       np.concatenate([first.indices, second.indices + n]))
+    calls = 0
+
+    def refine(colors):
+        """
+        :return: pair (colors, counts) of the refined coloring and the class sizes in the first graph, None if the
+                 class sizes of both graphs differ
+        """
+        nonlocal calls
+        calls += 1
+        colors = _refine(union, colors)
+        counts = np.bincount(colors[:n], minlength=colors.max() + 1)
+        if not np.array_equal(counts, np.bincount(colors[n:], minlength=colors.max() + 1)):
+            return None
+        return colors, counts
+
+    def bijection(colors):
+        mapping = np.empty(n, dtype=np.int64)
+        mapping[np.argsort(colors[:n])] = np.argsort(colors[n:])
+        return mapping
+
+    def greedy(colors, counts):
+        while calls <= budget and counts.max(initial=1) > 1:
+            # pair the first node of every non-trivial class of both graphs
+            order = np.argsort(colors, kind='stable')
+            starts = np.searchsorted(colors[order], np.arange(len(counts)))
+            cells = np.flatnonzero(counts > 1)
+            colors = colors.copy()
+            colors[order[starts[cells]]] = len(counts) + np.arange(len(cells))
+            colors[order[starts[cells] + counts[cells]]] = len(counts) + np.arange(len(cells))
+            refined = refine(colors)
+            if refined is None:
+                return False
+            colors, counts = refined
+        return counts.max(initial=1) <= 1 and verify(bijection(colors))
+
+    def search(colors, counts):
+        if calls > budget:
+            return None
+        if counts.max(initial=1) <= 1:
+            return verify(bijection(colors))
+
+        cell = np.flatnonzero(counts == counts[counts > 1].min())[0]
+        node = np.flatnonzero(colors[:n] == cell)[0]
+        result = False
+        for candidate in np.flatnonzero(colors[n:] == cell):
+            individualized = colors.copy()
+            individualized[[node, n + candidate]] = len(counts)
+            refined = refine(individualized)
+            found = False if refined is None else search(*refined)
+            if found:
+                return True
+            if found is None:
+                result = None
+        return result
+
+    refined = refine(union.degrees())
+    if refined is None:
+        return False
+    if greedy(*refined):
+        return True
+    return search(*refined)
+
+
+def file_hash(path):
+    """
+    :return: sha1 of the file contents
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def index_instances(instance_dir):
+    """
+    Computes the fingerprint of every instance. Byte-identical files are only parsed once.
+
+    :param instance_dir: directory of instances
+    :return: dictionary mapping path to (fingerprint, file hash)
+    """
+    index = dict()
+    by_content = dict()
+    for path in list_instances(instance_dir):
+        content = file_hash(path)
+        if content not in by_content:
+            by_content[content] = fingerprint(read_graph(path))
+        index[path] = (by_content[content], content)
+    return index
+
+
+def group_duplicates(index, budget=1000):
+    """
+    Groups instances with equal fingerprints. Files with different contents are only grouped if their graphs are
+    isomorphic (see isomorphic), groups that could not be confirmed within the budget are split up.
+    The first path (in sorted order) of each group is the canonical one.
+
+    :param index: dictionary mapping path to (fingerprint, file hash)
+    :param budget: maximum number of refinements per isomorphism test
+    :return: list of groups, each a tuple (fingerprint, kind, list of paths) with kind "identical" if all files are
+             byte-identical and "isomorphic" otherwise
+    """
+    groups = dict()
+    for path in sorted(index):
+        groups.setdefault(index[path][0], []).append(path)
+
+    result = []
+    for key, paths in groups.items():
+        # byte-identical files are duplicates anyway, the graphs of different contents are compared
+        by_content = dict()
+        for path in paths:
+            by_content.setdefault(index[path][1], []).append(path)
+
+        classes = []  # list of (graph of the first file, paths)
+        for content_paths in by_content.values():
+            graph = read_graph(content_paths[0]) if len(by_content) > 1 else None
+            for other, other_paths in classes:
+                answer = isomorphic(graph, other, budget)
+                if answer is None:
+                    print(f"WARNING: could not decide if {content_paths[0]} and {other_paths[0]} are isomorphic, "
+                          f"not aliasing them")
+                if answer:
+                    other_paths += content_paths
+                    break
+            else:
+                classes.append((graph, list(content_paths)))
+
+        for _, class_paths in classes:
+            if len(class_paths) > 1:
+                class_paths.sort()
+                identical = len({index[path][1] for path in class_paths}) == 1
+                result.append((key, "identical" if identical else "isomorphic", class_paths))
+    return result
+
+
+def write_aliases(groups, file):
+    """
+    Writes the alias file read by the experiment.
+
+    :param groups: list of groups as returned by group_duplicates
+    :param file: path to the xml-file
+    """
+    root = ET.Element("aliases")
+    for key, kind, paths in groups:
+        group = ET.SubElement(root, "group", fingerprint=key, kind=kind)
+        for path in paths:
+            ET.SubElement(group, "instance").text = path
+    ET.indent(root)
+    ET.ElementTree(root).write(file)
+
+
+def read_aliases(file):
+    """
+    Reads an alias file.
+
+    :param file: path to the xml-file
+    :return: dictionary mapping each canonical path to the list of its aliases
+    """
+    aliases = dict()
+    for group in ET.parse(file).getroot().findall('group'):
+        paths = [instance.text for instance in group.findall('instance')]
+        aliases[paths[0]] = paths[1:]
+    return aliases
+
+
+def main(instance_dir, target):
+    """
+    Indexes all instances and writes the alias file.
+
+    :param instance_dir: directory of instances
+    :param target: path to the alias file
+    """
+    index = index_instances(instance_dir)
+    groups = group_duplicates(index)
+
+    print(f"Indexed {len(index)} instances, found {len(groups)} groups of duplicates:")
+    for key, kind, paths in groups:
+        print(f"\t{kind}: {', '.join(paths)}")
+
+    write_aliases(groups, target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Finds duplicate instances.')
+    parser.add_argument('--instances', type=str, default="../instances/", help='Path to directory with instances')
+    parser.add_argument('--target', type=str, default="../instances/aliases.xml", help='Path to resulting alias file')
+    args = parser.parse_args()
+
+    main(args.instances, args.target)
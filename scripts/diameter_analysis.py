@@ -1,14 +1,12 @@
 """
  This script analyses the diameter development as instances grow larger.
  """
-import pandas as pd
-import numpy as np
 import argparse
 import os
 import xml.etree.ElementTree as ET
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
-from utils import extract_short_instance_name
+from utils import extract_short_instance_name, lazy_import, np, plt
+
+cm = lazy_import("matplotlib.cm")
 
 
 def get_label(name):
@@ -85,12 +83,28 @@ def main(path, target):
     analyze_diameter(path, target)
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
+def add_arguments(parser):
+    """
+    Adds the command line arguments to a parser (shared with cli.py).
+
+    :param parser: the argument parser
+    """
     parser.add_argument('--path', type=str, help='Path to data file')
     parser.add_argument('--target', type=str, help='Path to folder with plots')
-    args = parser.parse_args()
 
+
+def run(args):
+    """
+    Runs the script with the parsed command line arguments.
+
+    :param args: the parsed arguments
+    """
     if not os.path.exists(args.target):
         os.mkdir(args.target)
-    main(args.path, args.target)
\ No newline at end of file
+    main(args.path, args.target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
+    add_arguments(parser)
+    run(parser.parse_args())
@@ -0,0 +1,318 @@
+"""
+This script benchmarks the separators in an application: an exact distance oracle for (unweighted) road networks
+that is built from the separator tree, evaluated by
+    1. preprocessing time (separator tree and labels)
+    2. label memory
+    3. query latency (single queries) and throughput (batches of random queries)
+The answers are verified against BFS on a sample of the queries.
+
+Oracle: every piece of the separator tree (see separators.decompose) stores the distances from each of its nodes to
+each of its separator nodes, within the subgraph induced by the piece (leaves store the distances between all of their
+nodes). The label of a node is the concatenation of its rows in all pieces on the path from the root to the piece in
+which it ends up (as separator node or leaf node), stored in one packed array for all nodes. The shortest path between
+u and v either meets the separator of a common piece or stays inside one of its halves, so the distance is the minimum
+of d(u, s) + d(s, v) over all separator nodes s of the common pieces, i.e. over the common prefix of both labels up to
+the lowest common piece.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import utils
+from graphs import read_embedded_graph, list_instances, extract_full_file_name, induced_subgraph, bfs
+from nested_dissection import rank_algorithms
+from r_division import RetryingSeparator
+from separators import Separator, decompose, DEFAULT_BINARY
+
+CSV_HEAD = "algorithm,instance,nodes,edges,time,label_entries,label_bytes,mean_label,max_label,tree_depth," \
+           "query_time,batch_query_time,throughput,checked,errors\n"
+
+# leaves up to this size are solved with Floyd-Warshall, larger ones with one BFS per node
+DENSE_LEAF = 256
+
+# state of the worker processes
+_graph = None
+_pieces = None
+
+
+def _init_worker(graph, pieces):
+    global _graph, _pieces
+    _graph = graph
+    _pieces = pieces
+
+
+def _block(piece):
+    """
+    :return: the nodes that the label rows of a piece refer to: its separator, or all of its nodes for leaves
+    """
+    return piece.nodes if not piece.children else piece.separator
+
+
+def _piece_distances(idx):
+    """
+    Computes the distances within a piece from all of its nodes to its block (see _block).
+
+    :param idx: index of the piece
+    :return: matrix of shape (nodes of the piece, nodes of the block), -1 for unreachable nodes
+    """
+    piece = _pieces[idx]
+    sub = induced_subgraph(_graph, piece.nodes)
+    targets = np.searchsorted(piece.nodes, _block(piece))
+
+    if not piece.children and sub.n <= DENSE_LEAF:
+        # Floyd-Warshall on the (small) leaf
+        unreachable = sub.n + 1
+        dist = np.full((sub.n, sub.n), unreachable, dtype=np.int32)
+        dist[sub.sources(), sub.indices] = 1
+        np.fill_diagonal(dist, 0)
+        for k in range(sub.n):
+            np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+        dist[dist >= unreachable] = -1
+        return dist[:, targets]
+
+    dist = np.empty((sub.n, len(targets)), dtype=np.int32)
+    for j, target in enumerate(targets):
+        dist[:, j] = bfs(sub, target)[0]
+    return dist
+
+
+class DistanceOracle:
+    """
+    Exact distance oracle built from a separator tree (see module docstring).
+    """
+
+    def __init__(self, graph, pieces, processes=None):
+        """
+        Constructor, computes the labels.
+
+        :param graph: the CSRGraph
+        :param pieces: the separator tree as returned by separators.decompose (without boundary)
+        :param processes: number of worker processes (default: number of cores, 1 = no pool)
+        """
+        n = graph.n
+        parent = np.array([piece.parent for piece in pieces], dtype=np.int64)
+        depth = np.array([piece.depth for piece in pieces], dtype=np.int64)
+        block_size = np.array([len(_block(piece)) for piece in pieces], dtype=np.int64)
+
+        # cumulative block sizes from the root, pieces are created after their parents
+        cum = block_size.copy()
+        for idx in range(1, len(pieces)):
+            cum[idx] += cum[parent[idx]]
+
+        # piece in which each node ends up
+        self.home = np.full(n, -1, dtype=np.int64)
+        for idx, piece in enumerate(pieces):
+            self.home[_block(piece)] = idx
+
+        lengths = cum[self.home]
+        self.ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.ptr[1:])
+
+        # distances are stored as small as possible, the largest value marks unreachable nodes
+        self.dtype = np.uint16 if n < np.iinfo(np.uint16).max else np.uint32
+        self.unreachable = np.iinfo(self.dtype).max
+        self.labels = np.empty(self.ptr[-1], dtype=self.dtype)
+
+        if processes == 1:
+            _init_worker(graph, pieces)
+            matrices = map(_piece_distances, range(len(pieces)))
+            self._fill(pieces, parent, cum, matrices)
+        else:
+            with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(graph, pieces)) as executor:
+                matrices = executor.map(_piece_distances, range(len(pieces)), chunksize=16)
+                self._fill(pieces, parent, cum, matrices)
+
+        self.cum = cum
+        self.depth = depth
+        # ancestors for the lowest common piece (binary lifting), up[j][p] is the 2^j-th ancestor of p
+        self.up = [np.where(parent >= 0, parent, np.arange(len(pieces)))]
+        while (1 << len(self.up)) <= depth.max(initial=0):
+            self.up.append(self.up[-1][self.up[-1]])
+
+    def _fill(self, pieces, parent, cum, matrices):
+        """
+        Writes the rows of all pieces into the labels of their nodes.
+        """
+        for idx, dist in enumerate(matrices):
+            piece = pieces[idx]
+            offset = self.ptr[piece.nodes] + (cum[parent[idx]] if parent[idx] >= 0 else 0)
+            positions = offset[:, None] + np.arange(dist.shape[1])[None, :]
+            self.labels[positions] = np.where(dist >= 0, dist, self.unreachable)
+
+    def _common_piece(self, a, b):
+        """
+        :return: the lowest common ancestors of the pieces a and b (arrays)
+        """
+        a, b = a.copy(), b.copy()
+        swap = self.depth[a] < self.depth[b]
+        a[swap], b[swap] = b[swap], a[swap]
+        difference = self.depth[a] - self.depth[b]
+        for j, up in enumerate(self.up):
+            lift = (difference >> j) & 1 == 1
+            a[lift] = up[a[lift]]
+        for up in reversed(self.up):
+            differ = up[a] != up[b]
+            a[differ], b[differ] = up[a[differ]], up[b[differ]]
+        return np.where(a == b, a, self.up[0][a])
+
+    def query(self, sources, targets):
+        """
+        Answers a batch of distance queries.
+
+        :param sources: array of source nodes
+        :param targets: array of target nodes
+        :return: array of distances, -1 if the target is not reachable
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        common = self.cum[self._common_piece(self.home[sources], self.home[targets])]
+
+        # positions of the common prefixes of both labels, one segment per query
+        starts = np.cumsum(common) - common
+        offsets = np.arange(common.sum()) - np.repeat(starts, common)
+        sums = (self.labels[np.repeat(self.ptr[sources], common) + offsets].astype(np.int64)
+                + self.labels[np.repeat(self.ptr[targets], common) + offsets])
+        # without common separator nodes (disconnected graphs are split along their components) there is no path
+        distances = np.full(len(common), self.unreachable, dtype=np.int64)
+        distances[common > 0] = np.minimum.reduceat(sums, starts[common > 0])
+        return np.where(distances >= self.unreachable, -1, distances)
+
+    @property
+    def nbytes(self):
+        """
+        :return: memory of the labels and the index structures in bytes
+        """
+        return (self.labels.nbytes + self.ptr.nbytes + self.home.nbytes + self.cum.nbytes + self.depth.nbytes
+                + sum(up.nbytes for up in self.up))
+
+
+def benchmark(oracle, graph, queries, batch_size, singles, checked, seed=0):
+    """
+    Measures the query times and verifies the answers against BFS.
+
+    :param oracle: the DistanceOracle
+    :param graph: the CSRGraph
+    :param queries: number of random queries answered in batches
+    :param batch_size: number of queries per batch
+    :param singles: number of random queries answered one by one
+    :param checked: number of random sources whose queries (to batch_size random targets) are verified
+    :param seed: random seed of the queries
+    :return: dictionary with query_time (microseconds per single query), batch_query_time (microseconds per query in
+             batches), throughput (queries per second in batches), checked (number of verified queries) and errors
+    """
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(graph.n, size=(2, queries))
+
+    start = time.perf_counter()
+    for begin in range(0, queries, batch_size):
+        oracle.query(pairs[0, begin:begin + batch_size], pairs[1, begin:begin + batch_size])
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for u, v in rng.integers(graph.n, size=(singles, 2)):
+        oracle.query([u], [v])
+    single_time = time.perf_counter() - start
+
+    errors = 0
+    for u in rng.integers(graph.n, size=checked):
+        targets = rng.integers(graph.n, size=batch_size)
+        expected = bfs(graph, u)[0][targets]
+        errors += int(np.count_nonzero(oracle.query(np.full(batch_size, u), targets) != expected))
+
+    return {'query_time': round(single_time / max(singles, 1) * 1e6, 3),
+            'batch_query_time': round(batch_time / max(queries, 1) * 1e6, 3),
+            'throughput': int(queries / batch_time) if batch_time > 0 else 0,
+            'checked': checked * batch_size,
+            'errors': errors}
+
+
+def main(instance_dirs, algorithms, binary, leaf_size, max_leaf, processes, queries, batch_size, checked, target):
+    """
+    Builds and benchmarks the distance oracles for all instances and algorithms.
+
+    :param instance_dirs: list of directories with instances
+    :param algorithms: list of separator names (see separators.py)
+    :param binary: path to the separate binary
+    :param leaf_size: pieces with at most this many nodes are not separated any further
+    :param max_leaf: oracles with larger leaves (pieces the separator could not divide) are skipped, the labels of a
+                     leaf grow quadratically with its size
+    :param processes: number of worker processes
+    :param queries: number of random queries answered in batches
+    :param batch_size: number of queries per batch
+    :param checked: number of random sources whose queries are verified against BFS
+    :param target: path to the resulting csv-file
+    """
+    separators = [Separator(algo, binary) for algo in algorithms]
+    if not os.path.exists(binary):
+        skipped = [sep.name for sep in separators if sep.is_ogdf()]
+        if skipped:
+            print(f"WARNING: {binary} not found, skipping {skipped}")
+        separators = [sep for sep in separators if not sep.is_ogdf()]
+
+    directory = os.path.dirname(target)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    rows = []
+    with open(target, 'w') as file:
+        file.write(CSV_HEAD)
+
+        for path in [path for directory in instance_dirs for path in list_instances(directory)]:
+            instance = extract_full_file_name(path)
+            graph = read_embedded_graph(path)
+            print(f"Working on {instance}")
+
+            for sep in separators:
+                start = time.perf_counter()
+                pieces = decompose(graph, RetryingSeparator(sep), leaf_size, processes)
+                largest = max(len(piece.nodes) for piece in pieces if not piece.children)
+                if largest > max_leaf:
+                    print(f"\twith {sep.name}: skipped, could not divide a piece of {largest} nodes")
+                    continue
+                oracle = DistanceOracle(graph, pieces, processes)
+                duration = int((time.perf_counter() - start) * 1e6)
+
+                lengths = np.diff(oracle.ptr)
+                row = {'algorithm': sep.name, 'instance': instance, 'nodes': graph.n, 'edges': graph.m,
+                       'time': duration, 'label_entries': len(oracle.labels), 'label_bytes': oracle.nbytes,
+                       'mean_label': round(float(lengths.mean()), 2) if graph.n else 0,
+                       'max_label': int(lengths.max(initial=0)), 'tree_depth': int(oracle.depth.max(initial=0))}
+                row.update(benchmark(oracle, graph, queries, batch_size, min(queries, 1000), checked))
+                rows.append(row)
+                file.write(",".join(str(row[col]) for col in CSV_HEAD.strip().split(",")) + "\n")
+                print(f"\twith {sep.name}: {row['label_bytes'] / 1e6:.2f} MB, mean label {row['mean_label']}, "
+                      f"{row['batch_query_time']:.2f} us/query in batches, {row['query_time']:.1f} us/single query, "
+                      f"{row['errors']} errors in {row['checked']} checked queries")
+                if row['errors']:
+                    print(f"WARNING: {sep.name} answered {row['errors']} queries on {instance} wrong")
+
+    for metric in ['label_bytes', 'batch_query_time', 'time']:
+        print(f"Ranking by {metric} (relative to the best oracle per instance):")
+        for algo, value in rank_algorithms(rows, metric):
+            print(f"\t{algo}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Separator-based distance oracle benchmark.')
+    parser.add_argument('--instances', type=str, nargs='+', default=["../instances/europe"],
+                        help='Directories with instances')
+    parser.add_argument('--algorithms', type=str,
+                        default=",".join(utils.all_algs_and_post + utils.reference_algorithms),
+                        help='Comma-separated separators, e.g. Dual_NE_DMD or module:function (default: all '
+                             'algorithms with all combinations of postprocessors)')
+    parser.add_argument('--binary', type=str, default=DEFAULT_BINARY, help='Path to the separate binary')
+    parser.add_argument('--leaf', type=int, default=32, help='Maximum size of leaf pieces')
+    parser.add_argument('--max-leaf', type=int, default=2048, help='Skip oracles with larger (undivided) leaves')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--queries', type=int, default=100000, help='Number of random queries')
+    parser.add_argument('--batch', type=int, default=1000, help='Number of queries per batch')
+    parser.add_argument('--check', type=int, default=20, help='Number of sources whose queries are verified by BFS')
+    parser.add_argument('--target', type=str, default="../results/distance_oracle.csv",
+                        help='Path to resulting csv-file')
+    args = parser.parse_args()
+
+    main(args.instances, args.algorithms.split(","), args.binary, args.leaf, args.max_leaf, args.processes,
+         args.queries, args.batch, args.check, args.target)
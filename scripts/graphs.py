@@ -0,0 +1,601 @@
+"""
+Lightweight graph handling for the Python side of the benchmark.
+Graphs are stored as CSR arrays (indptr, indices) and read from the same instance files that the experiments use
+(.gml, .chaco, .stp). Node indices follow the order in which the nodes appear in the file, which is the same order
+in which OGDF creates them, so node indices can be compared directly with the C++ side.
+"""
+
+import os
+import re
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Simple undirected graph in compressed sparse row format.
+    Every undirected edge is stored twice (once per direction). If the graph is embedded, the neighbours of each node
+    are stored in the cyclic order of the embedding (rotation system), otherwise they are sorted by index.
+    """
+
+    def __init__(self, indptr, indices, embedded=False):
+        """
+        Constructor.
+
+        :param indptr: array of length n+1, the neighbours of node v are indices[indptr[v]:indptr[v+1]]
+        :param indices: array of length 2m containing the neighbours of all nodes
+        :param embedded: whether the order of the neighbours is a planar rotation system
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.embedded = embedded
+
+    @property
+    def n(self):
+        return len(self.indptr) - 1
+
+    @property
+    def m(self):
+        return len(self.indices) // 2
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def sources(self):
+        """
+        :return: array of length 2m containing the source node of every directed edge (dart)
+        """
+        return np.repeat(np.arange(self.n), self.degrees())
+
+
+def from_edges(n, sources, targets):
+    """
+    Builds a simple undirected CSR graph from an edge list, dropping self-loops and multi-edges
+    (equivalent to OGDF's makeSimpleUndirected).
+
+    :param n: number of nodes
+    :param sources: array of edge sources
+    :param targets: array of edge targets
+    :return: the CSRGraph
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+
+    us = np.concatenate([sources, targets])
+    vs = np.concatenate([targets, sources])
+    keep = us != vs
+    keys = np.unique(us[keep] * n + vs[keep])
+
+    us = keys // n
+    indices = keys % n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(us, minlength=n), out=indptr[1:])
+
+    return CSRGraph(indptr, indices)
+
+
+def _read_gml(path):
+    with open(path, 'r') as file:
+        text = file.read()
+
+    # node ids appear as "id", edges as "source"/"target" pairs - in the order of the file
+    tokens = re.findall(r'\b(id|source|target)\s+(-?\d+)', text)
+    ids = np.array([int(val) for key, val in tokens if key == 'id'], dtype=np.int64)
+    sources = np.array([int(val) for key, val in tokens if key == 'source'], dtype=np.int64)
+    targets = np.array([int(val) for key, val in tokens if key == 'target'], dtype=np.int64)
+
+    if len(ids) == 0 or not np.array_equal(ids, np.arange(len(ids))):
+        order = np.argsort(ids)
+        sources = order[np.searchsorted(ids, sources, sorter=order)]
+        targets = order[np.searchsorted(ids, targets, sorter=order)]
+
+    return from_edges(len(ids), sources, targets)
+
+
+def _read_chaco(path):
+    with open(path, 'r') as file:
+        header = file.readline().split()
+        n = int(header[0])
+        sources = []
+        targets = []
+        for v in range(n):
+            line = file.readline()
+            neighbours = [int(x) - 1 for x in line.split()]
+            sources += [v] * len(neighbours)
+            targets += neighbours
+
+    return from_edges(n, sources, targets)
+
+
+def _read_stp(path):
+    n = 0
+    sources = []
+    targets = []
+    with open(path, 'r') as file:
+        for line in file:
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == 'Nodes':
+                n = int(parts[1])
+            elif parts[0] == 'E' and len(parts) >= 3:
+                sources.append(int(parts[1]) - 1)
+                targets.append(int(parts[2]) - 1)
+
+    return from_edges(n, sources, targets)
+
+
+def is_graph_file(path):
+    """
+    Tests if a file is a graph-file that we can parse (only by checking the file extension).
+
+    :param path: the path to be tested
+    :return: True if the file is a .gml, .stp or .chaco file
+    """
+    return path.endswith(".gml") or path.endswith(".chaco") or path.endswith(".stp")
+
+
+def read_graph(path):
+    """
+    Reads a graph from a .gml, .chaco or .stp file into a simple undirected CSR graph.
+
+    :param path: path to the instance file
+    :return: the CSRGraph
+    """
+    if path.endswith(".gml"):
+        return _read_gml(path)
+    if path.endswith(".chaco"):
+        return _read_chaco(path)
+    if path.endswith(".stp"):
+        return _read_stp(path)
+    raise ValueError(f"Could not understand graph format of {path}")
+
+
+def read_coordinates(path):
+    """
+    Reads the node coordinates of an instance, if there are any: graphics entries of .gml files, DD lines of .stp
+    files or, for any format, a sidecar file with the extension .xy (one line "x y" per node, as written by
+    map_generator.py).
+
+    :param path: path to the instance file
+    :return: array of shape (n, 2), or None if the instance has no coordinates
+    """
+    sidecar = path[:path.rfind(".")] + ".xy"
+    if os.path.exists(sidecar):
+        return np.loadtxt(sidecar, dtype=np.float64, ndmin=2)
+
+    if path.endswith(".gml"):
+        with open(path, 'r') as file:
+            text = file.read()
+        xs = re.findall(r'\bx\s+(-?[\d.eE+-]+)', text)
+        ys = re.findall(r'\by\s+(-?[\d.eE+-]+)', text)
+        n = len(re.findall(r'\bid\s+-?\d+', text))
+        if n > 0 and len(xs) == len(ys) == n:
+            return np.array([xs, ys], dtype=np.float64).T
+
+    if path.endswith(".stp"):
+        with open(path, 'r') as file:
+            entries = [line.split()[1:4] for line in file if line.startswith("DD ")]
+        if entries:
+            entries = np.array(entries, dtype=np.float64)
+            coordinates = np.full((int(entries[:, 0].max()), 2), np.nan)
+            coordinates[entries[:, 0].astype(np.int64) - 1] = entries[:, 1:3]
+            return coordinates
+
+    return None
+
+
+def read_permutation(path):
+    """
+    Reads the permutation that was saved when an instance was reordered (see reorder.py).
+
+    :param path: path to the instance file
+    :return: array original, node v of the stored graph is node original[v] of the original graph, or None if the
+             instance was not reordered
+    """
+    perm = path[:path.rfind(".")] + ".perm"
+    if not os.path.exists(perm):
+        return None
+    return np.loadtxt(perm, dtype=np.int64, ndmin=1)
+
+
+# default location of the embedding cache of the experiment (see load in main.cpp), relative to the scripts directory
+DEFAULT_EMBEDDING_CACHE = "../instances/.embeddings"
+
+_HASH_MUL = (0xc6a4a793 << 32) + 0x5bd1e995
+_HASH_MASK = (1 << 64) - 1
+
+
+def std_hash(data):
+    """
+    Hash of a byte string as computed by std::hash<std::string> of libstdc++ (64 bit), which keys the embedding cache.
+
+    :param data: the bytes
+    :return: the hash as int
+    """
+    length = len(data)
+    aligned = length & ~7
+    value = (0xc70f6907 ^ (length * _HASH_MUL)) & _HASH_MASK
+    with np.errstate(over='ignore'):
+        words = np.frombuffer(data[:aligned], dtype='<u8') * np.uint64(_HASH_MUL)
+        words = (words ^ (words >> np.uint64(47))) * np.uint64(_HASH_MUL)
+    for word in words.tolist():
+        value = ((value ^ word) * _HASH_MUL) & _HASH_MASK
+    if length & 7:
+        value = ((value ^ int.from_bytes(data[aligned:], 'little')) * _HASH_MUL) & _HASH_MASK
+    value = ((value ^ (value >> 47)) * _HASH_MUL) & _HASH_MASK
+    return value ^ (value >> 47)
+
+
+def read_rotation_system(path, cache=DEFAULT_EMBEDDING_CACHE):
+    """
+    Reads the planar embedding of an instance from the embedding cache of the experiment (see writeRotationSystem in
+    utils.cpp), the cache file is named after the hash of the instance file.
+
+    :param path: path to the instance file
+    :param cache: directory of the embedding cache
+    :return: pair (indptr, indices) of the rotation system, or None if the instance is not in the cache
+    """
+    with open(path, 'rb') as file:
+        rot = os.path.join(cache, f"{std_hash(file.read()):x}.rot")
+    if not os.path.exists(rot):
+        return None
+
+    data = np.fromfile(rot, dtype='<u4', offset=4)
+    with open(rot, 'rb') as file:
+        if file.read(4) != b'ROT1' or len(data) < 2:
+            return None
+    n = int(data[0])
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indices = []
+    position = 2
+    for v in range(n):
+        degree = int(data[position])
+        indices.append(data[position + 1:position + 1 + degree])
+        indptr[v + 1] = indptr[v] + degree
+        position += degree + 1
+    return indptr, np.concatenate(indices).astype(np.int64) if indices else np.zeros(0, dtype=np.int64)
+
+
+def embed_by_coordinates(graph, coordinates):
+    """
+    Orders the neighbours of every node counterclockwise around it, which is a planar embedding if the coordinates
+    form a planar straight-line drawing.
+
+    :param graph: the CSRGraph
+    :param coordinates: array of shape (n, 2)
+    :return: the embedded CSRGraph
+    """
+    sources = graph.sources()
+    delta = coordinates[graph.indices] - coordinates[sources]
+    order = np.lexsort((np.arctan2(delta[:, 1], delta[:, 0]), sources))
+    return CSRGraph(graph.indptr, graph.indices[order], embedded=True)
+
+
+def _outerplanar_cycle(adjacency):
+    """
+    Finds the hamiltonian cycle of a biconnected outerplanar graph by repeatedly removing nodes of degree 2: their
+    edges lie on the cycle, the path over a removed node is replaced by an edge between its neighbours.
+
+    :param adjacency: dictionary mapping node to the set of its neighbours (modified)
+    :return: dictionary mapping node to the list of its two neighbours on the cycle, or None if there is no such cycle
+    """
+    cycle = {node: [] for node in adjacency}
+    replaced = set()  # edges that stand for a path over removed nodes
+
+    def keep(u, w):
+        if (min(u, w), max(u, w)) not in replaced:
+            cycle[u].append(w)
+            cycle[w].append(u)
+
+    queue = [node for node, neighbours in adjacency.items() if len(neighbours) == 2]
+    while len(adjacency) > 3 and queue:
+        x = queue.pop()
+        if x not in adjacency or len(adjacency[x]) != 2:
+            continue
+        y, z = adjacency.pop(x)
+        keep(x, y)
+        keep(x, z)
+        adjacency[y].discard(x)
+        adjacency[z].discard(x)
+        adjacency[y].add(z)
+        adjacency[z].add(y)
+        replaced.add((min(y, z), max(y, z)))
+        queue += [u for u in (y, z) if len(adjacency[u]) == 2]
+
+    if len(adjacency) != 3:
+        return None
+    y, z, w = adjacency
+    keep(y, z)
+    keep(z, w)
+    keep(w, y)
+    return cycle if all(len(neighbours) == 2 for neighbours in cycle.values()) else None
+
+
+def embed_maximal_planar(graph):
+    """
+    Computes the planar embedding of a maximal planar graph (m = 3n - 6, e.g. delaunay triangulations of the sphere),
+    which is unique up to mirroring: the neighbours of every node form a cycle of facial triangles in the subgraph they
+    induce (the link of the node). Separating triangles add chords to the links, the cycle is then the unique
+    hamiltonian cycle of the (outerplanar) link. The links are oriented consistently by a BFS over the nodes.
+
+    :param graph: the CSRGraph (not embedded, i.e. with sorted neighbour lists)
+    :return: the embedded CSRGraph, or None if the graph is not maximal planar
+    """
+    n = graph.n
+    if n < 4 or graph.m != 3 * n - 6:
+        return None
+
+    sources = graph.sources()
+    targets = graph.indices
+    keys = sources * n + targets
+    twin = np.searchsorted(keys, targets * n + sources)
+
+    # all wedges v -> a -> b, the wedge closes a triangle if (v, b) is an edge as well
+    degrees = graph.degrees()
+    wedge_darts = np.repeat(np.arange(len(targets)), degrees[targets])
+    _, second = expand(graph, targets)
+    closing = np.minimum(np.searchsorted(keys, sources[wedge_darts] * n + second), len(keys) - 1)
+    closed = keys[closing] == sources[wedge_darts] * n + second
+
+    counts = np.bincount(wedge_darts[closed], minlength=len(targets))
+    if (counts < 2).any():
+        return None
+
+    # the two darts that are adjacent to every dart in the link of its source
+    pairs = closing[closed]
+    starts = np.cumsum(counts) - counts
+    link = np.stack([pairs[starts], pairs[starts + 1]], axis=1).tolist()
+
+    # an edge in more than two triangles lies on a separating triangle, which is a chord of the links of its nodes
+    pairs = pairs.tolist()
+    for v in np.unique(sources[counts > 2]).tolist():
+        darts = range(graph.indptr[v], graph.indptr[v + 1])
+        cycle = _outerplanar_cycle({d: set(pairs[starts[d]:starts[d] + counts[d]]) for d in darts})
+        if cycle is None:
+            return None
+        for d in darts:
+            link[d] = cycle[d]
+
+    twin = twin.tolist()
+    targets_list = targets.tolist()
+    indptr = graph.indptr.tolist()
+
+    def walk(start, previous):
+        """
+        :return: the darts of the link of the source of start, beginning with start and ending with previous
+        """
+        order = [start]
+        current = start
+        while True:
+            first, second = link[current]
+            following = second if first == previous else first
+            previous, current = current, following
+            if current == start:
+                return order
+            order.append(current)
+            if len(order) > len(link):
+                return order
+
+    rotation = [None] * n
+    rotation[0] = walk(indptr[0], link[indptr[0]][0])
+    queue = [0]
+    for v in queue:
+        darts = rotation[v]
+        if len(darts) != indptr[v + 1] - indptr[v]:  # the link is not a single cycle
+            return None
+        for position, dart in enumerate(darts):
+            a = targets_list[dart]
+            if rotation[a] is not None:
+                continue
+            # triangle v -> b -> a: at a, the dart to b precedes the dart to v
+            b = targets_list[darts[(position + 1) % len(darts)]]
+            back = twin[dart]
+            first, second = link[back]
+            rotation[a] = walk(back, first if targets_list[first] == b else second)
+            queue.append(a)
+
+    if len(queue) < n:
+        return None
+    return CSRGraph(graph.indptr, targets[np.concatenate(rotation)], embedded=True)
+
+
+def read_embedded_graph(path, cache=DEFAULT_EMBEDDING_CACHE):
+    """
+    Reads a graph together with a planar embedding, if one is available: from the embedding cache of the experiment,
+    for instances with coordinates from the drawing (which may not be planar, see reference_separators.cycle_separator)
+    or, for maximal planar graphs, from the links of the nodes (see embed_maximal_planar).
+
+    :param path: path to the instance file
+    :param cache: directory of the embedding cache
+    :return: the CSRGraph, embedded if possible
+    """
+    graph = read_graph(path)
+
+    rotation = read_rotation_system(path, cache) if cache else None
+    if rotation is not None and np.array_equal(rotation[0], graph.indptr):
+        indptr, indices = rotation
+        sources = graph.sources()
+        # the cached rotation has to contain exactly the neighbours of every node
+        if np.array_equal(np.sort(sources * graph.n + indices), sources * graph.n + graph.indices):
+            return CSRGraph(indptr, indices, embedded=True)
+
+    coordinates = read_coordinates(path)
+    if coordinates is not None and len(coordinates) == graph.n and not np.isnan(coordinates).any():
+        return embed_by_coordinates(graph, coordinates)
+
+    embedded = embed_maximal_planar(graph)
+    return embedded if embedded is not None else graph
+
+
+def list_instances(instance_dir):
+    """
+    Lists all graph files below a directory, with paths composed the same way the C++ experiment composes them
+    (so that they can be used as identifiers in the property file).
+
+    :param instance_dir: the instance directory
+    :return: sorted list of paths
+    """
+    paths = []
+    for directory, _, files in os.walk(instance_dir):
+        for file in files:
+            path = os.path.join(directory, file)
+            if is_graph_file(path):
+                paths.append(path)
+    return sorted(paths)
+
+
+def extract_full_file_name(path):
+    """
+    Extracts the instance name from a path, including subdirectories (same as extractFullFileName in utils.cpp).
+
+    :param path: the path to the file
+    :return: the name between "instances/" and the extension
+    """
+    start = path.rfind("instances/")
+    start = start + len("instances/") if start != -1 else path.rfind("/") + 1
+    return path[start:path.rfind(".")]
+
+
+def expand(graph, frontier):
+    """
+    Gathers the neighbourhoods of all nodes in the frontier in one vectorized step.
+
+    :param graph: the CSRGraph
+    :param frontier: array of nodes
+    :return: pair (sources, targets) of arrays, one entry per dart leaving the frontier
+    """
+    starts = graph.indptr[frontier]
+    lengths = graph.indptr[frontier + 1] - starts
+    total = lengths.sum()
+    if total == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    positions = offsets + np.arange(total)
+    return np.repeat(frontier, lengths), graph.indices[positions]
+
+
+def bfs(graph, roots, mask=None):
+    """
+    Frontier-based breadth first search, every level is expanded with one vectorized step.
+
+    :param graph: the CSRGraph
+    :param roots: a single root or an array of roots (multi-source BFS)
+    :param mask: optional boolean array, nodes with mask[v] == False are never visited
+    :return: pair (level, parent), level[v] == -1 for unreached nodes, parent[root] == -1
+    """
+    level = np.full(graph.n, -1, dtype=np.int64)
+    parent = np.full(graph.n, -1, dtype=np.int64)
+
+    frontier = np.unique(np.atleast_1d(np.asarray(roots, dtype=np.int64)))
+    level[frontier] = 0
+    depth = 0
+
+    while frontier.size > 0:
+        depth += 1
+        srcs, tgts = expand(graph, frontier)
+        new = level[tgts] == -1
+        if mask is not None:
+            new &= mask[tgts]
+        tgts, first = np.unique(tgts[new], return_index=True)
+        level[tgts] = depth
+        parent[tgts] = srcs[new][first]
+        frontier = tgts
+
+    return level, parent
+
+
+def induced_subgraph(graph, nodes):
+    """
+    Creates the subgraph induced by a set of nodes. The relative order of the neighbours is kept, so the subgraph of
+    an embedded graph is embedded as well.
+
+    :param graph: the CSRGraph
+    :param nodes: array of nodes of the subgraph, subgraph node i corresponds to nodes[i]
+    :return: the induced CSRGraph
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    new_index = np.full(graph.n, -1, dtype=np.int64)
+    new_index[nodes] = np.arange(len(nodes))
+
+    srcs, tgts = expand(graph, nodes)
+    keep = new_index[tgts] != -1
+    srcs = new_index[srcs[keep]]
+    indices = new_index[tgts[keep]]
+
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(srcs, minlength=len(nodes)), out=indptr[1:])
+
+    return CSRGraph(indptr, indices, graph.embedded)
+
+
+def connected_components(graph, mask=None):
+    """
+    Labels the connected components of a graph (optionally restricted to the nodes in mask).
+
+    :param graph: the CSRGraph
+    :param mask: optional boolean array of nodes to consider
+    :return: array of component labels, -1 for masked nodes
+    """
+    comp = np.full(graph.n, -1, dtype=np.int64)
+    candidates = np.arange(graph.n) if mask is None else np.flatnonzero(mask)
+    label = 0
+    for v in candidates:
+        if comp[v] == -1:
+            level, _ = bfs(graph, v, mask)
+            comp[level >= 0] = label
+            label += 1
+    return comp
+
+
+def permute(graph, order):
+    """
+    Renumbers the nodes of a graph, the neighbours of each node are sorted by their new index.
+
+    :param graph: the CSRGraph
+    :param order: array, order[i] is the node that becomes node i
+    :return: the permuted CSRGraph
+    """
+    order = np.asarray(order, dtype=np.int64)
+    new_index = np.empty(graph.n, dtype=np.int64)
+    new_index[order] = np.arange(graph.n)
+    return from_edges(graph.n, new_index[graph.sources()], new_index[graph.indices])
+
+
+def write_gml(graph, path, coordinates=None):
+    """
+    Writes a graph to a .gml file in the layout of OGDF's writeGML (every undirected edge once).
+
+    :param graph: the CSRGraph
+    :param path: the target path
+    :param coordinates: optional array of shape (n, 2), written as graphics entries of the nodes
+    """
+    with open(path, 'w') as file:
+        file.write('Creator "ogdf::GraphIO::writeGML"\ngraph\n[\n\tdirected\t1\n')
+        for v in range(graph.n):
+            file.write(f"\tnode\n\t[\n\t\tid\t{v}\n")
+            if coordinates is not None:
+                x, y = float(coordinates[v, 0]), float(coordinates[v, 1])
+                file.write(f"\t\tgraphics\n\t\t[\n\t\t\tx\t{x!r}\n\t\t\ty\t{y!r}\n\t\t]\n")
+            file.write("\t]\n")
+        sources = graph.sources()
+        once = sources < graph.indices
+        for u, v in zip(sources[once], graph.indices[once]):
+            file.write(f"\tedge\n\t[\n\t\tsource\t{u}\n\t\ttarget\t{v}\n\t]\n")
+        file.write("]\n")
+
+
+def write_chaco(graph, path):
+    """
+    Writes a graph to a .chaco file (1-based neighbour lists), the node order is kept.
+
+    :param graph: the CSRGraph
+    :param path: the target path
+    """
+    with open(path, 'w') as file:
+        file.write(f"{graph.n} {graph.m}")
+        for v in range(graph.n):
+            neighbours = graph.indices[graph.indptr[v]:graph.indptr[v + 1]] + 1
+            file.write("\n" + " ".join(str(w) for w in neighbours))
+        file.write("\n")
@@ -2,11 +2,10 @@
 This script compares THM and tri-BFS and combinations thereof.
 (essentially data_analysis.py, I thought I'd need to change more stuff)
 """
-import pandas as pd
 import argparse
 import utils
 import os
-from utils import analyze_separator_size, analyze_instance_performance, analyze_separator_speed, \
+from utils import read_results, analyze_separator_size, analyze_instance_performance, analyze_separator_speed, \
     analyze_separator_balance, analyze_runtime_development
 
 
@@ -19,7 +18,7 @@ def main(path, target):
     """
 
     # read csv file
-    df = pd.read_csv(path, sep=r'\s*,\s*', encoding='utf-8', engine='python')
+    df = read_results(path)
 
     print(f"Analyzing instances ranging in size from {df['nodes'].min()} nodes to {df['nodes'].max()} nodes.")
 
@@ -35,12 +34,30 @@ def main(path, target):
     analyze_instance_performance(df, "per_instance", instances, algorithms, target)
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
+def add_arguments(parser):
+    """
+    Adds the command line arguments to a parser (shared with cli.py).
+
+    :param parser: the argument parser
+    """
     parser.add_argument('--path', type=str, help='Path to data file')
     parser.add_argument('--target', type=str, help='Path to folder with plots')
-    args = parser.parse_args()
+    parser.add_argument('--force', action='store_true', help='Render all plots, even those that are up to date')
+
 
+def run(args):
+    """
+    Runs the script with the parsed command line arguments.
+
+    :param args: the parsed arguments
+    """
+    utils.memoize_plots = not args.force
     if not os.path.exists(args.target):
         os.mkdir(args.target)
     main(args.path, args.target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
+    add_arguments(parser)
+    run(parser.parse_args())
@@ -22,6 +22,20 @@ def write_chaco(filename, nodes, edges, graph_dict, corr_func):
             file.write("\n" + " ".join(str(corr_func(v)) for v in graph_dict[key]))
 
 
+def write_coordinates(filename, graph_dict, coordinates):
+    """
+    Writes the coordinates of the nodes to a .xy file (one line "longitude latitude" per node, in the order of the
+    .chaco file), they are used for the Hilbert ordering (see reorder.py).
+
+    :param filename: the name of the resulting file (without extension)
+    :param graph_dict: the adjacency dictionary, its keys are the nodes in the order of the .chaco file
+    :param coordinates: dictionary mapping node to (longitude, latitude)
+    """
+    with open(filename+".xy", 'w') as file:
+        for key in graph_dict:
+            file.write(f"{coordinates[key][0]} {coordinates[key][1]}\n")
+
+
 def query_osm(path):
     """
     Queries OSM and writes results to path.
@@ -48,6 +62,7 @@ def query_osm(path):
         edges = 0
         osm_to_id = {}
         neighbours = {}
+        coordinates = {}
 
         print("Query successful, extracting nodes...")
 
@@ -61,6 +76,7 @@ def query_osm(path):
                 if node.id not in osm_to_id:
                     osm_to_id[node.id] = id_max
                     neighbours[id_max] = []
+                    coordinates[id_max] = (node.lon, node.lat)
                     id_max += 1
 
                 # if this node was not the first on the path, connect it to its neighbour and vice versa
@@ -110,6 +126,7 @@ def query_osm(path):
             edge_count += len(neighbours[key])
 
         write_chaco(os.path.join(path, city), correction_idx-1, edge_count, neighbours, lambda x: correction_dict[x])
+        write_coordinates(os.path.join(path, city), neighbours, coordinates)
 
 
 if __name__ == "__main__":
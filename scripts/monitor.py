@@ -0,0 +1,343 @@
+"""
+Follows the progress events of a running experiment (main binary with -e <file>, json lines) and reports the progress,
+the throughput, a breakdown per algorithm and the estimated time until the queue of instances is finished, e.g.
+    mkfifo /tmp/events   (or use a regular file)
+    ../cmake-build-release/main -e /tmp/events ... &
+    python monitor.py /tmp/events --follow
+
+Events (every event has the field "elapsed", the seconds since the experiment started):
+    start       time (unix), results, algorithms, attempts, postprocessing, threads,
+                queue (list of instance, nodes, edges, solves - the planned solves per algorithm)
+    instance    instance, position (in the queue), nodes, edges, load (seconds to read and embed the instance)
+    progress    instance, algorithm, attempt (solves done), solves
+    algorithm   instance, algorithm, nodes, solves, duration (seconds for all solves of the algorithm)
+    skip        instance, nodes
+    done
+
+The ETA is based on a power law per algorithm, time per solve = c * nodes^e, fitted (in log-log space) to the units
+that are done, i.e. all solves of one algorithm on one instance. Algorithms with too few units use the exponent of all
+algorithms. The remaining time is the predicted time of the rest of the current instance and of all instances in the
+queue that were not started yet (including loading them).
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+
+def fit_power_law(samples, exponent=None):
+    """
+    Fits time = c * nodes^e by least squares in log-log space.
+
+    :param samples: list of (nodes, time) with nodes > 0 and time > 0
+    :param exponent: fixed exponent e, only c is fitted if given
+    :return: (log(c), e), or None if there are no samples
+    """
+    points = [(math.log(n), math.log(t)) for n, t in samples if n > 0 and t > 0]
+    if not points:
+        return None
+    mean_x = statistics.fmean(x for x, _ in points)
+    mean_y = statistics.fmean(y for _, y in points)
+    if exponent is None:
+        variance = sum((x - mean_x) ** 2 for x, _ in points)
+        if variance < 1e-9:  # all instances have the same size
+            return None
+        exponent = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+    return mean_y - exponent * mean_x, exponent
+
+
+def format_duration(seconds):
+    """
+    :return: the duration in a short human readable format, e.g. "2d 3h", "3h 12m" or "4m 10s"
+    """
+    if seconds is None or math.isnan(seconds):
+        return "unknown"
+    seconds = int(round(seconds))
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {seconds:02d}s"
+
+
+class Progress:
+    """
+    State of an experiment, as far as known from its events.
+    """
+
+    # seconds of the recent throughput window
+    RECENT = 600
+
+    def __init__(self):
+        self.start = None             # the start event
+        self.queue = []               # list of queued instances (dictionaries from the start event)
+        self.position = -1            # position of the current instance in the queue
+        self.current = None           # the instance event of the current instance
+        self.finished = []            # algorithms that are done with the current instance
+        self.unit = None              # the last progress event of the current algorithm
+        self.units = dict()           # maps algorithm to list of (nodes, solves, duration) of its finished units
+        self.loads = []               # list of (nodes, load time)
+        self.solves = []              # list of (elapsed, solves done in total)
+        self.instances_done = 0
+        self.skipped = 0
+        self.elapsed = 0.0            # elapsed time of the last event
+        self.done = False
+
+    def update(self, event):
+        """
+        Updates the state with the next event.
+
+        :param event: the event (dictionary)
+        """
+        kind = event.get("event")
+        if kind == "start":
+            self.__init__()  # the event file may hold several runs, only the last one is monitored
+            self.start = event
+            self.queue = event["queue"]
+        elif self.start is None:
+            return
+        self.elapsed = event.get("elapsed", self.elapsed)
+
+        if kind == "instance":
+            self._finish_instance()
+            self.position = event["position"]
+            self.current = event
+            self.finished = []
+            self.unit = None
+            self.loads.append((event["nodes"], event["load"]))
+        elif kind == "progress":
+            self.unit = event
+        elif kind == "algorithm":
+            self.units.setdefault(event["algorithm"], []).append((event["nodes"], event["solves"], event["duration"]))
+            self.finished.append(event["algorithm"])
+            self.unit = None
+            self.solves.append((self.elapsed, self.total_solves()))
+        elif kind == "skip":
+            self.skipped += 1
+        elif kind == "done":
+            self._finish_instance()
+            self.done = True
+
+    def _finish_instance(self):
+        if self.current is not None:
+            self.instances_done += 1
+            self.current = None
+
+    def total_solves(self):
+        """
+        :return: number of solves of all finished units
+        """
+        return sum(solves for units in self.units.values() for _, solves, _ in units)
+
+    def models(self):
+        """
+        Fits the time per solve of every algorithm (see fit_power_law).
+
+        :return: dictionary mapping algorithm to (log(c), e), and the model of loading an instance (or None)
+        """
+        pooled = fit_power_law([(n, d / s) for units in self.units.values() for n, s, d in units if s > 0])
+        exponent = pooled[1] if pooled is not None else 1.0
+        models = dict()
+        for algorithm in self.start["algorithms"]:
+            samples = [(n, d / s) for n, s, d in self.units.get(algorithm, []) if s > 0]
+            if len({n for n, _ in samples}) >= 3:
+                models[algorithm] = fit_power_law(samples)
+            if models.get(algorithm) is None:
+                models[algorithm] = fit_power_law(samples, exponent) if samples else pooled
+        load = fit_power_law(self.loads) or fit_power_law(self.loads, 1.0)
+        return models, load
+
+    @staticmethod
+    def predict(model, nodes):
+        """
+        :return: the predicted time for an instance with the given number of nodes, None without a model
+        """
+        if model is None:
+            return None
+        return math.exp(model[0] + model[1] * math.log(max(nodes, 1)))
+
+    def remaining(self):
+        """
+        Predicts the remaining time.
+
+        :return: the remaining seconds, None if it cannot be predicted yet
+        """
+        models, load = self.models()
+        known = [entry["nodes"] for entry in self.queue if entry["nodes"] > 0]
+        typical = statistics.median(known) if known else (self.current["nodes"] if self.current else 1)
+        sweep = self.start["attempts"] <= 0
+
+        total = 0.0
+        # the rest of the current instance
+        if self.current is not None:
+            nodes = self.current["nodes"]
+            for algorithm in self.start["algorithms"]:
+                if algorithm in self.finished:
+                    continue
+                solves = self.queue[self.position]["solves"] if self.position < len(self.queue) else 0
+                if sweep and solves == 0:
+                    solves = nodes
+                if self.unit is not None and self.unit["algorithm"] == algorithm:
+                    solves = self.unit["solves"] - self.unit["attempt"]
+                per_solve = self.predict(models[algorithm], nodes)
+                if per_solve is None:
+                    return None
+                total += solves * per_solve
+
+        # the instances that were not started yet
+        for entry in self.queue[self.position + 1:]:
+            nodes = entry["nodes"] if entry["nodes"] > 0 else typical
+            solves = nodes if sweep and entry["solves"] == 0 else entry["solves"]
+            for algorithm in self.start["algorithms"]:
+                per_solve = self.predict(models[algorithm], nodes)
+                if per_solve is None:
+                    return None
+                total += solves * per_solve
+            total += self.predict(load, nodes) or 0.0
+        return total
+
+    def throughput(self, window=None):
+        """
+        :param window: only consider the last window seconds, all if None
+        :return: solves per second
+        """
+        if not self.solves:
+            return 0.0
+        points = [(0.0, 0)] + self.solves
+        end_time, end_solves = points[-1]
+        begin_time, begin_solves = points[0]
+        if window is not None:
+            begin_time, begin_solves = next((t, s) for t, s in points if t >= end_time - window)
+            if begin_time == end_time:
+                begin_time, begin_solves = points[-2] if len(points) > 1 else points[0]
+        return (end_solves - begin_solves) / (end_time - begin_time) if end_time > begin_time else 0.0
+
+    def report(self, now=None):
+        """
+        :param now: the current elapsed time (e.g. while following a running experiment), that of the last event if
+                    None
+        :return: the report as string
+        """
+        if self.start is None:
+            return "No experiment started yet."
+        now = self.elapsed if now is None else now
+        lines = []
+        total = len(self.queue)
+        share = self.instances_done / total if total else 1.0
+        lines.append(f"results: {self.start['results']}, {len(self.start['algorithms'])} algorithms, "
+                     f"{'all start nodes' if self.start['attempts'] <= 0 else str(self.start['attempts']) + ' attempts'}, "
+                     f"{self.start['threads']} threads")
+        lines.append(f"elapsed {format_duration(now)}, instances {self.instances_done}/{total} ({100 * share:.1f}%)"
+                     + (f", {self.skipped} skipped" if self.skipped else ""))
+        lines.append(f"throughput: {self.throughput():.1f} solves/s overall, "
+                     f"{self.throughput(self.RECENT):.1f} solves/s in the last {self.RECENT // 60} minutes, "
+                     f"{3600 * self.instances_done / now if now > 0 else 0:.1f} instances/h")
+        if self.current is not None:
+            detail = ""
+            if self.unit is not None:
+                detail = f" with {self.unit['algorithm']} ({self.unit['attempt']}/{self.unit['solves']} solves)"
+            lines.append(f"current: {self.current['instance']} ({self.current['nodes']} nodes){detail}, "
+                         f"{len(self.finished)}/{len(self.start['algorithms'])} algorithms done")
+
+        models, _ = self.models()
+        spent = sum(d for units in self.units.values() for _, _, d in units)
+        lines.append("")
+        lines.append(f"{'algorithm':<20} {'units':>6} {'solves':>9} {'time':>10} {'share':>6} "
+                     f"{'ms/solve (10k)':>15} {'exponent':>9}")
+        for algorithm in self.start["algorithms"]:
+            units = self.units.get(algorithm, [])
+            duration = sum(d for _, _, d in units)
+            model = models.get(algorithm)
+            at_10k = self.predict(model, 10000)
+            lines.append(f"{algorithm:<20} {len(units):>6} {sum(s for _, s, _ in units):>9} "
+                         f"{format_duration(duration):>10} {100 * duration / spent if spent else 0:>5.1f}% "
+                         f"{1000 * at_10k if at_10k is not None else float('nan'):>15.3f} "
+                         f"{model[1] if model is not None else float('nan'):>9.2f}")
+        lines.append("")
+
+        if self.done:
+            lines.append(f"done after {format_duration(self.elapsed)}")
+        else:
+            remaining = self.remaining()
+            if remaining is None:
+                lines.append("ETA: unknown (no finished units yet)")
+            else:
+                # time since the last event counts towards the prediction of the running unit
+                remaining = max(0.0, remaining - (now - self.elapsed))
+                finish = datetime.fromtimestamp(time.time() + remaining).strftime("%Y-%m-%d %H:%M")
+                lines.append(f"ETA: {format_duration(remaining)} remaining, finishes around {finish}")
+        return "\n".join(lines)
+
+
+def read_events(path, follow=False, interval=1.0):
+    """
+    Reads the events of an event file (or pipe).
+
+    :param path: path to the event file
+    :param follow: whether to wait for new events at the end of the file (until the done event)
+    :param interval: seconds to wait for new events
+    :return: generator of events, yields None whenever the end of the file is reached while following
+    """
+    with open(path) as file:
+        partial = ""
+        while True:
+            line = file.readline()
+            if line.endswith("\n"):
+                line, partial = partial + line, ""
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Ignoring malformed event: {line.strip()}", file=sys.stderr)
+                    continue
+                yield event
+                if follow and event.get("event") == "done":
+                    return
+            else:
+                partial += line  # incomplete last line, the rest is not written yet
+                if not follow:
+                    return
+                yield None
+                time.sleep(interval)
+
+
+def main(path, follow=False, interval=10.0):
+    """
+    Reports the progress of an experiment, either once or repeatedly while it runs.
+
+    :param path: path to the event file
+    :param follow: whether to follow the event file until the experiment is done
+    :param interval: seconds between reports when following
+    """
+    progress = Progress()
+    last_report = 0.0
+    last_event = time.time()
+    for event in read_events(path, follow, min(1.0, interval)):
+        if event is not None:
+            progress.update(event)
+            last_event = time.time()
+            continue
+        if time.time() - last_report >= interval:
+            # the experiment also advances between events (the clock of the monitor is used, it may run on another host)
+            print(progress.report(progress.elapsed + time.time() - last_event), end="\n\n", flush=True)
+            last_report = time.time()
+    print(progress.report())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reports the progress of a running experiment.')
+    parser.add_argument('events', type=str, help='Path to the event file (option -e of the experiment)')
+    parser.add_argument('--follow', action='store_true', help='Follow the events until the experiment is done')
+    parser.add_argument('--interval', type=float, default=10.0, help='Seconds between reports when following')
+    args = parser.parse_args()
+    if not os.path.exists(args.events):
+        print(f"{args.events} does not exist!")
+        sys.exit(1)
+    main(args.events, args.follow, args.interval)
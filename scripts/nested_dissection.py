@@ -0,0 +1,199 @@
+"""
+This script computes nested dissection orderings with the different separators and evaluates them by the quantities
+that matter when factorizing sparse systems:
+    1. fill-in and number of nonzeros of the Cholesky factor L (symbolic factorization)
+    2. factorization operation count
+    3. height of the elimination tree (critical path of a parallel factorization)
+Afterwards, the algorithms are ranked by the chosen metric relative to the best ordering per instance.
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+
+from graphs import read_embedded_graph, list_instances, extract_full_file_name
+from separators import Separator, decompose, DEFAULT_BINARY
+
+CSV_HEAD = "algorithm,instance,nodes,edges,time,nnz_L,fill,ops,etree_height\n"
+
+metrics = ["fill", "ops", "etree_height"]
+
+
+def elimination_order(pieces):
+    """
+    Derives the nested dissection ordering from a separator tree: both halves are eliminated before their separator,
+    the nodes of leaf pieces are eliminated in their natural order.
+
+    :param pieces: list of pieces as returned by separators.decompose (without boundary)
+    :return: array order, order[i] is the node that is eliminated in step i
+    """
+    order = []
+    stack = [(0, False)]
+    while stack:
+        idx, expanded = stack.pop()
+        piece = pieces[idx]
+        if not piece.children:
+            order.append(piece.nodes)
+        elif expanded:
+            order.append(piece.separator)
+        else:
+            stack.append((idx, True))
+            stack += [(child, False) for child in reversed(piece.children)]
+    return np.concatenate(order) if order else np.zeros(0, dtype=np.int64)
+
+
+def symbolic_cholesky(graph, order):
+    """
+    Symbolic Cholesky factorization of the graph's adjacency structure under the given elimination order.
+    The elimination tree is computed with Liu's algorithm (path compression), the column counts by traversing the
+    row subtrees, which takes O(|L|) time.
+
+    :param graph: the CSRGraph
+    :param order: the elimination order
+    :return: dictionary with nnz_L, fill, ops and etree_height
+    """
+    n = graph.n
+    pos = np.empty(n, dtype=np.int64)
+    pos[order] = np.arange(n)
+
+    # lower triangular structure of the permuted matrix, row by row
+    rows = pos[graph.sources()]
+    cols = pos[graph.indices]
+    lower = cols < rows
+    rows, cols = rows[lower], cols[lower]
+    sorting = np.lexsort((cols, rows))
+    cols = cols[sorting].tolist()
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))]).tolist()
+
+    parent = [-1] * n
+    ancestor = [-1] * n
+    for i in range(n):
+        for k in range(indptr[i], indptr[i + 1]):
+            j = cols[k]
+            while ancestor[j] != -1 and ancestor[j] != i:
+                following = ancestor[j]
+                ancestor[j] = i
+                j = following
+            if ancestor[j] == -1:
+                ancestor[j] = i
+                parent[j] = i
+
+    # every node visited on the way up from j to i is a nonzero L[i, x]
+    mark = [-1] * n
+    count = [1] * n  # diagonal
+    for i in range(n):
+        mark[i] = i
+        for k in range(indptr[i], indptr[i + 1]):
+            j = cols[k]
+            while mark[j] != i:
+                mark[j] = i
+                count[j] += 1
+                j = parent[j]
+
+    height = [1] * n
+    for j in range(n - 1, -1, -1):
+        if parent[j] != -1:
+            height[j] = height[parent[j]] + 1
+
+    count = np.array(count, dtype=np.int64)
+    nnz = int(count.sum())
+    return {'nnz_L': nnz,
+            'fill': nnz - n - len(cols),
+            'ops': int(np.sum((count - 1) ** 2)),
+            'etree_height': max(height) if n > 0 else 0}
+
+
+def rank_algorithms(rows, metric):
+    """
+    Ranks the algorithms by the average of the metric relative to the best algorithm on each instance.
+
+    :param rows: list of result dictionaries
+    :param metric: the metric to rank by
+    :return: list of pairs (algorithm, relative average), best first
+    """
+    best = dict()
+    for row in rows:
+        best[row['instance']] = min(best.get(row['instance'], np.inf), row[metric])
+
+    relative = dict()
+    for row in rows:
+        if best[row['instance']] > 0:
+            relative.setdefault(row['algorithm'], []).append(row[metric] / best[row['instance']])
+
+    return sorted(((algo, float(np.mean(values))) for algo, values in relative.items()), key=lambda x: x[1])
+
+
+def main(instance_dirs, algorithms, binary, leaf_size, processes, target, orderings, metric):
+    """
+    Computes and evaluates nested dissection orderings for all instances and algorithms.
+
+    :param instance_dirs: list of directories with instances
+    :param algorithms: list of separator names (see separators.py)
+    :param binary: path to the separate binary
+    :param leaf_size: pieces with at most this many nodes are not separated any further
+    :param processes: number of worker processes
+    :param target: path to the resulting csv-file
+    :param orderings: directory to store the orderings in, or None
+    :param metric: metric to rank the algorithms by
+    """
+    separators = [Separator(algo, binary) for algo in algorithms]
+    if not os.path.exists(binary):
+        skipped = [sep.name for sep in separators if sep.is_ogdf()]
+        if skipped:
+            print(f"WARNING: {binary} not found, skipping {skipped}")
+        separators = [sep for sep in separators if not sep.is_ogdf()]
+
+    for directory in [os.path.dirname(target), orderings]:
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    rows = []
+    with open(target, 'w') as file:
+        file.write(CSV_HEAD)
+
+        for path in [path for directory in instance_dirs for path in list_instances(directory)]:
+            instance = extract_full_file_name(path)
+            graph = read_embedded_graph(path)
+            print(f"Working on {instance}")
+
+            for sep in separators:
+                start = time.perf_counter()
+                pieces = decompose(graph, sep, leaf_size, processes)
+                order = elimination_order(pieces)
+                duration = int((time.perf_counter() - start) * 1e6)
+
+                if orderings is not None:
+                    np.savetxt(os.path.join(orderings, instance.replace("/", "_") + "." + sep.name + ".order"),
+                               order, fmt="%d")
+
+                row = {'algorithm': sep.name, 'instance': instance, 'nodes': graph.n, 'edges': graph.m,
+                       'time': duration}
+                row.update(symbolic_cholesky(graph, order))
+                rows.append(row)
+                file.write(",".join(str(row[col]) for col in CSV_HEAD.strip().split(",")) + "\n")
+                print(f"\twith {sep.name}: fill {row['fill']}, ops {row['ops']}, height {row['etree_height']}")
+
+    print(f"Ranking by {metric} (relative to the best ordering per instance):")
+    for algo, value in rank_algorithms(rows, metric):
+        print(f"\t{algo}: {value:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Nested dissection orderings.')
+    parser.add_argument('--instances', type=str, nargs='+',
+                        default=["../instances/delaunay_small", "../instances/table/grid", "../instances/europe"],
+                        help='Directories with instances')
+    parser.add_argument('--algorithms', type=str, default="LT,Dual,HPN,Dual_NE_DMD,HPN_NE_DMD,RefLevel,RefCycle",
+                        help='Comma-separated separators, e.g. Dual_NE_DMD or module:function')
+    parser.add_argument('--binary', type=str, default=DEFAULT_BINARY, help='Path to the separate binary')
+    parser.add_argument('--leaf', type=int, default=64, help='Maximum size of leaf pieces')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--target', type=str, default="../results/nested_dissection.csv",
+                        help='Path to resulting csv-file')
+    parser.add_argument('--orderings', type=str, default=None, help='Directory to store orderings in')
+    parser.add_argument('--metric', type=str, default="fill", choices=metrics, help='Metric to rank algorithms by')
+    args = parser.parse_args()
+
+    main(args.instances, args.algorithms.split(","), args.binary, args.leaf, args.processes, args.target,
+         args.orderings, args.metric)
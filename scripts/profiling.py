@@ -0,0 +1,272 @@
+"""
+Instrumentation of the analysis pipeline. The stages (loading, analyze_*, analysis_core, create_*_plot, savefig) are
+wrapped with traced, which does nothing unless tracing was switched on by session, e.g. through
+    python -m cli --profile trace.json [--cprofile analysis.prof] analysis ...
+or the environment variables ANALYSIS_PROFILE=trace.json and ANALYSIS_CPROFILE=analysis.prof.
+
+Per call of a stage, the trace records the wall time (also without nested stages), the peak memory during the stage (in
+total and above the memory at the start of the stage) and the number of rows that went in and came out. The memory is
+the resident set size, sampled every few milliseconds by a background thread, which does not slow down the pipeline
+(unlike tracemalloc, which is used where /proc is not available). The trace is a json file with the individual calls (in the order they finished) and a summary per stage, sorted by total time:
+    {"command": [...], "wall_time": 12.3, "max_rss": ..., "summary": [{"stage": "utils.create_violin_plot",
+     "calls": 3, "wall_time": 4.2, "self_time": 1.1, "peak_memory": ..., "rows_in": ..., "rows_out": ...}, ...],
+     "calls": [{"stage": ..., "depth": 1, "start": 0.5, "wall_time": ..., ...}, ...]}
+The optional cProfile dump can be inspected with pstats or snakeviz.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PROFILE_ENV = "ANALYSIS_PROFILE"
+CPROFILE_ENV = "ANALYSIS_CPROFILE"
+
+# interval of the memory samples in seconds
+SAMPLE_INTERVAL = 0.005
+
+# the calls recorded by the current session, None if tracing is switched off
+_calls = None
+# the stages that are currently running,
+# each [name, start, time in nested stages, peak memory of nested stages, memory at start]
+_stack = []
+# measures the memory while tracing
+_meter = None
+
+
+class _RssSampler(threading.Thread):
+    """
+    Samples the resident set size of the process (linux).
+    """
+
+    STATM = "/proc/self/statm"
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+        self._stopped = threading.Event()
+        self.peak = self.current()
+        self.start()
+
+    def current(self):
+        with open(self.STATM) as file:
+            return int(file.read().split()[1]) * self._page_size
+
+    def peak_since_reset(self):
+        self.peak = max(self.peak, self.current())
+        return self.peak
+
+    def reset_peak(self):
+        self.peak = self.current()
+
+    def run(self):
+        while not self._stopped.wait(SAMPLE_INTERVAL):
+            self.peak = max(self.peak, self.current())
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class _TracemallocMeter:
+    """
+    Measures the memory allocated by python and numpy (fallback without /proc, slows down allocation-heavy code).
+    """
+
+    def __init__(self):
+        tracemalloc.start()
+
+    def current(self):
+        return tracemalloc.get_traced_memory()[0]
+
+    def peak_since_reset(self):
+        return tracemalloc.get_traced_memory()[1]
+
+    def reset_peak(self):
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        tracemalloc.stop()
+
+
+def count_rows(value):
+    """
+    Number of rows of the data passed to or returned by a stage: the length of dataframes and arrays, the total length
+    of the values of dictionaries (e.g. algorithm to list of results).
+
+    :param value: any value
+    :return: the number of rows, or None if the value holds no rows
+    """
+    if hasattr(value, 'shape') and len(getattr(value, 'shape')) > 0:
+        return int(value.shape[0])
+    if isinstance(value, dict) and value and all(hasattr(v, '__len__') for v in value.values()):
+        return sum(len(v) for v in value.values())
+    return None
+
+
+def _input_rows(values):
+    # the largest argument is the data, the others are parameters (e.g. the list of instances)
+    counts = [count for count in map(count_rows, values) if count is not None]
+    return max(counts) if counts else None
+
+
+def _begin(name):
+    if _stack:
+        # nested stages reset the peak, the enclosing stage keeps the maximum of its own and the nested peaks
+        _stack[-1][3] = max(_stack[-1][3], _meter.peak_since_reset())
+    _meter.reset_peak()
+    _stack.append([name, time.perf_counter(), 0.0, 0, _meter.current()])
+
+
+def _end(rows_in, rows_out):
+    name, start, nested, nested_peak, memory = _stack.pop()
+    wall_time = time.perf_counter() - start
+    peak = max(nested_peak, _meter.peak_since_reset())
+    if _stack:
+        _stack[-1][2] += wall_time
+        _stack[-1][3] = max(_stack[-1][3], peak)
+    _calls.append({"stage": name, "depth": len(_stack), "start": round(start - _session_start, 6),
+                   "wall_time": round(wall_time, 6), "self_time": round(wall_time - nested, 6),
+                   "peak_memory": peak, "peak_increase": peak - memory, "rows_in": rows_in, "rows_out": rows_out})
+
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Traces a block of code as a stage (if tracing is switched on).
+
+    :param name: the name of the stage
+    :param rows: number of rows that go into the stage, or None
+    """
+    if _calls is None:
+        yield
+        return
+    _begin(name)
+    try:
+        yield
+    finally:
+        _end(rows, None)
+
+
+def traced(function):
+    """
+    Decorator that traces every call of a function as stage "<module>.<function>" (if tracing is switched on). The rows
+    that go in are those of the largest argument (see count_rows), the rows that come out those of the return value.
+
+    :param function: the function
+    :return: the wrapped function
+    """
+    name = f"{function.__module__}.{function.__name__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _calls is None:
+            return function(*args, **kwargs)
+        _begin(name)
+        result = None
+        try:
+            result = function(*args, **kwargs)
+            return result
+        finally:
+            _end(_input_rows(list(args) + list(kwargs.values())), count_rows(result))
+
+    return wrapper
+
+
+def summarize(calls):
+    """
+    Aggregates the calls per stage.
+
+    :param calls: the recorded calls
+    :return: list of dictionaries (stage, calls, wall_time, self_time, peak_memory, peak_increase, rows_in, rows_out),
+             sorted by decreasing total wall time
+    """
+    summary = dict()
+    for call in calls:
+        entry = summary.setdefault(call["stage"], {"stage": call["stage"], "calls": 0, "wall_time": 0.0,
+                                                   "self_time": 0.0, "peak_memory": 0, "peak_increase": 0,
+                                                   "rows_in": 0, "rows_out": 0})
+        entry["calls"] += 1
+        entry["wall_time"] += call["wall_time"]
+        entry["self_time"] += call["self_time"]
+        entry["peak_memory"] = max(entry["peak_memory"], call["peak_memory"])
+        entry["peak_increase"] = max(entry["peak_increase"], call["peak_increase"])
+        entry["rows_in"] += call["rows_in"] or 0
+        entry["rows_out"] += call["rows_out"] or 0
+    for entry in summary.values():
+        entry["wall_time"] = round(entry["wall_time"], 6)
+        entry["self_time"] = round(entry["self_time"], 6)
+    return sorted(summary.values(), key=lambda entry: -entry["wall_time"])
+
+
+def print_summary(summary, limit=15):
+    """
+    Prints the most expensive stages.
+
+    :param summary: the summary as returned by summarize
+    :param limit: the number of stages to print
+    """
+    print(f"{'stage':<45} {'calls':>6} {'wall [s]':>10} {'self [s]':>10} {'peak [MB]':>10} {'+peak [MB]':>10} {'rows in':>10}")
+    for entry in summary[:limit]:
+        print(f"{entry['stage']:<45} {entry['calls']:>6} {entry['wall_time']:>10.3f} {entry['self_time']:>10.3f} "
+              f"{entry['peak_memory'] / 1e6:>10.1f} {entry['peak_increase'] / 1e6:>10.1f} {entry['rows_in']:>10}")
+
+
+@contextmanager
+def session(trace=None, cprofile=None):
+    """
+    Switches tracing on for a block of code (usually a whole command) and writes the trace afterwards, also if the
+    command fails.
+
+    :param trace: path to the json trace, defaults to the environment variable ANALYSIS_PROFILE, no tracing if neither
+                  is given
+    :param cprofile: path to the cProfile dump, defaults to the environment variable ANALYSIS_CPROFILE, no profiling if
+                     neither is given
+    """
+    global _calls, _meter, _session_start
+    trace = trace or os.environ.get(PROFILE_ENV)
+    cprofile = cprofile or os.environ.get(CPROFILE_ENV)
+    if not trace and not cprofile:
+        yield
+        return
+
+    profiler = cProfile.Profile() if cprofile else None
+    if trace:
+        _calls = []
+        _stack.clear()
+        _meter = _RssSampler() if os.path.exists(_RssSampler.STATM) else _TracemallocMeter()
+    _session_start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile)
+            print(f"Wrote cProfile dump to {cprofile}")
+        if trace:
+            calls, _calls = _calls, None
+            _meter.stop()
+            summary = summarize(calls)
+            # ru_maxrss is in kilobytes on linux
+            result = {"command": sys.argv, "wall_time": round(time.perf_counter() - _session_start, 6),
+                      "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None,
+                      "summary": summary, "calls": calls}
+            with open(trace, 'w') as file:
+                json.dump(result, file, indent=1)
+            print_summary(summary)
+            print(f"Wrote trace to {trace}")
+
+
+_session_start = time.perf_counter()
@@ -0,0 +1,178 @@
+"""
+This script builds r-divisions (Frederickson) with the different separators and evaluates them by the quantities that
+matter for shortest path preprocessing:
+    1. number of pieces (every piece has at most r nodes)
+    2. total boundary size, i.e. the number of nodes that belong to more than one piece, and the boundary per piece
+    3. build time
+An r-division is built by recursively separating the graph, with the separator nodes added to both halves, until
+every piece has at most r nodes and at most c * sqrt(r) boundary nodes (see separators.decompose). Independent pieces
+are separated concurrently. Afterwards, the algorithms are ranked by the total boundary size relative to the best
+r-division per instance and r, among the valid r-divisions (see is_valid).
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+
+import utils
+from graphs import read_embedded_graph, list_instances, extract_full_file_name
+from nested_dissection import rank_algorithms
+from separators import Separator, decompose, leaves, DEFAULT_BINARY
+
+CSV_HEAD = "algorithm,instance,nodes,edges,r,time,pieces,boundary,boundary_sum,max_piece,max_boundary,oversized\n"
+
+
+class RetryingSeparator:
+    """
+    Calls a separator again with other start nodes (seeds) if it leaves one half empty, otherwise the piece could not
+    be divided any further. Can be pickled, like the separator.
+    """
+
+    def __init__(self, separator, attempts=4):
+        """
+        Constructor.
+
+        :param separator: the Separator
+        :param attempts: maximum number of calls per piece
+        """
+        self.separator = separator
+        self.attempts = attempts
+
+    def __call__(self, graph):
+        result = None
+        for attempt in range(self.attempts):
+            separator = Separator(self.separator.name, self.separator.binary, self.separator.seed + attempt)
+            result = separator(graph)
+            if len(result[1]) > 0 and len(result[2]) > 0:
+                break
+        return result
+
+
+def r_division(graph, separator, r, c=4.0, processes=None):
+    """
+    Builds an r-division.
+
+    :param graph: the CSRGraph
+    :param separator: the Separator, it is called again with other start nodes if it fails on a piece
+    :param r: maximum number of nodes per piece
+    :param c: pieces may have at most c * sqrt(r) boundary nodes
+    :param processes: number of worker processes (default: number of cores, 1 = no pool)
+    :return: list of arrays, the nodes of each piece (pieces that could not be divided may have more than r nodes)
+    """
+    pieces = decompose(graph, RetryingSeparator(separator), r, processes, boundary=True,
+                       max_boundary=int(c * np.sqrt(r)))
+    return [pieces[idx].nodes for idx in leaves(pieces)]
+
+
+def evaluate(n, pieces, r):
+    """
+    Evaluates an r-division.
+
+    :param n: number of nodes of the graph
+    :param pieces: list of arrays, the nodes of each piece
+    :param r: maximum number of nodes per piece
+    :return: dictionary with pieces, boundary (number of nodes in more than one piece), boundary_sum (boundary nodes
+             summed over the pieces), max_piece, max_boundary (largest number of boundary nodes of a piece) and
+             oversized (number of pieces with more than r nodes)
+    """
+    occurrences = np.bincount(np.concatenate(pieces), minlength=n) if pieces else np.zeros(n, dtype=np.int64)
+    on_boundary = occurrences > 1
+    per_piece = [int(np.count_nonzero(on_boundary[nodes])) for nodes in pieces]
+    return {'pieces': len(pieces),
+            'boundary': int(np.count_nonzero(on_boundary)),
+            'boundary_sum': sum(per_piece),
+            'max_piece': max((len(nodes) for nodes in pieces), default=0),
+            'max_boundary': max(per_piece, default=0),
+            'oversized': sum(len(nodes) > r for nodes in pieces)}
+
+
+def is_valid(row, c):
+    """
+    :param row: the evaluation of an r-division (see evaluate), including r
+    :param c: pieces may have at most c * sqrt(r) boundary nodes
+    :return: True if every piece has at most r nodes and at most c * sqrt(r) boundary nodes
+    """
+    return row['oversized'] == 0 and row['max_boundary'] <= int(c * np.sqrt(row['r']))
+
+
+def main(instance_dirs, algorithms, binary, sizes, c, processes, target):
+    """
+    Builds and evaluates r-divisions for all instances, algorithms and sizes r.
+
+    :param instance_dirs: list of directories with instances
+    :param algorithms: list of separator names (see separators.py)
+    :param binary: path to the separate binary
+    :param sizes: list of maximum piece sizes r
+    :param c: pieces may have at most c * sqrt(r) boundary nodes
+    :param processes: number of worker processes
+    :param target: path to the resulting csv-file
+    """
+    separators = [Separator(algo, binary) for algo in algorithms]
+    if not os.path.exists(binary):
+        skipped = [sep.name for sep in separators if sep.is_ogdf()]
+        if skipped:
+            print(f"WARNING: {binary} not found, skipping {skipped}")
+        separators = [sep for sep in separators if not sep.is_ogdf()]
+
+    directory = os.path.dirname(target)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    rows = []
+    with open(target, 'w') as file:
+        file.write(CSV_HEAD)
+
+        for path in [path for directory in instance_dirs for path in list_instances(directory)]:
+            instance = extract_full_file_name(path)
+            graph = read_embedded_graph(path)
+            print(f"Working on {instance}")
+
+            for r in sizes:
+                for sep in separators:
+                    start = time.perf_counter()
+                    pieces = r_division(graph, sep, r, c, processes)
+                    duration = int((time.perf_counter() - start) * 1e6)
+
+                    row = {'algorithm': sep.name, 'instance': instance, 'nodes': graph.n, 'edges': graph.m, 'r': r,
+                           'time': duration}
+                    row.update(evaluate(graph.n, pieces, r))
+                    # the instance is ranked separately for every r
+                    row['instance_r'] = f"{instance}@{r}"
+                    rows.append(row)
+                    file.write(",".join(str(row[col]) for col in CSV_HEAD.strip().split(",")) + "\n")
+                    print(f"\tr = {r} with {sep.name}: {row['pieces']} pieces, boundary {row['boundary']}, "
+                          f"max boundary per piece {row['max_boundary']}, {duration / 1e6:.2f}s"
+                          + (f", {row['oversized']} pieces with more than r nodes" if row['oversized'] else ""))
+
+    # pieces that could not be divided have little boundary, so invalid r-divisions would rank best
+    valid = [row for row in rows if is_valid(row, c)]
+    print("Ranking by total boundary size (relative to the best valid r-division per instance and r):")
+    for algo, value in rank_algorithms([dict(row, instance=row['instance_r']) for row in valid], 'boundary'):
+        print(f"\t{algo}: {value:.3f}")
+    if len(valid) < len(rows):
+        invalid = dict()
+        for row in rows:
+            if not is_valid(row, c):
+                invalid[row['algorithm']] = invalid.get(row['algorithm'], 0) + 1
+        print(f"Excluded {len(rows) - len(valid)} invalid r-divisions (pieces with more than r nodes or more than "
+              f"c * sqrt(r) boundary nodes): " + ", ".join(f"{algo} {count}" for algo, count in invalid.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Frederickson r-divisions.')
+    parser.add_argument('--instances', type=str, nargs='+',
+                        default=["../instances/europe", "../instances/delaunay_small", "../instances/delaunay_large"],
+                        help='Directories with instances')
+    parser.add_argument('--algorithms', type=str,
+                        default=",".join(utils.all_algs_and_post + utils.reference_algorithms),
+                        help='Comma-separated separators, e.g. Dual_NE_DMD or module:function (default: all '
+                             'algorithms with all combinations of postprocessors)')
+    parser.add_argument('--binary', type=str, default=DEFAULT_BINARY, help='Path to the separate binary')
+    parser.add_argument('--r', type=int, nargs='+', default=[256, 4096], help='Maximum piece sizes')
+    parser.add_argument('--c', type=float, default=4.0, help='Pieces have at most c * sqrt(r) boundary nodes')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--target', type=str, default="../results/r_division.csv", help='Path to resulting csv-file')
+    args = parser.parse_args()
+
+    main(args.instances, args.algorithms.split(","), args.binary, args.r, args.c, args.processes, args.target)
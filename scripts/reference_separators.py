@@ -0,0 +1,564 @@
+"""
+Pure NumPy reference implementations of the two simplest planar separators, to get baseline results without OGDF:
+    1. RefLevel: the Lipton-Tarjan level separator, i.e. the smallest BFS level that leaves both halves balanced
+    2. RefCycle: a fundamental cycle separator on a BFS tree, exact if a planar embedding is available (from the
+       embedding cache of the experiment, the coordinates of the instance or the links of a maximal planar graph, see
+       graphs.read_embedded_graph), sampled otherwise (exit point cycle_sampled). Both only accept cycles that leave
+       at most 2/3 of the nodes on either side and fall back to RefLevel otherwise (exit point level or median)
+
+The results are written in the same csv format as the experiments (see Result::to_csv in main.cpp), so that they can
+be analyzed alongside the results of LT, Dual and HPN.
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+
+from catalog import read_properties, compile_expression, catalog_row
+from deduplicate import read_aliases
+from root_index import read_roots
+from graphs import read_embedded_graph, list_instances, extract_full_file_name, from_edges, bfs, induced_subgraph, \
+    connected_components
+
+CSV_HEAD = "algorithm,instance,nodes,edges,diameter,diam_lB,diam_uB,radius,time,sep_size,balance,ratio,exit\n"
+
+
+def _assign_rest(n, component, first, second):
+    """
+    Assigns all nodes that are not part of the component that was separated to the smaller half.
+
+    :param n: number of nodes of the graph
+    :param component: array of nodes that were handled by the separator
+    :param first: array of nodes of the first half
+    :param second: array of nodes of the second half
+    :return: pair (first, second)
+    """
+    if len(component) == n:
+        return first, second
+
+    rest = np.ones(n, dtype=bool)
+    rest[component] = False
+    rest = np.flatnonzero(rest)
+    if len(first) <= len(second):
+        return np.concatenate([first, rest]), second
+    return first, np.concatenate([second, rest])
+
+
+def level_separator(graph, root):
+    """
+    Lipton-Tarjan level separator: computes the BFS levels from root and picks the smallest level such that both
+    remaining halves contain at most 2/3 of the nodes. If no such level exists, the median level is used.
+
+    :param graph: the CSRGraph
+    :param root: the root of the BFS
+    :return: tuple (separator, first, second, exit point)
+    """
+    n = graph.n
+    level, _ = bfs(graph, root)
+    reached = level >= 0
+    rest = n - np.count_nonzero(reached)
+
+    widths = np.bincount(level[reached])
+    before = np.cumsum(widths) - widths
+    after = before[-1] + widths[-1] - before - widths
+
+    # unreached nodes end up on the smaller side
+    larger = np.maximum(np.maximum(before, after), np.minimum(before, after) + rest)
+    feasible = np.flatnonzero(larger <= 2.0 / 3.0 * n)
+
+    if len(feasible) > 0:
+        best = feasible[np.argmin(widths[feasible])]
+        exit_point = "level"
+    else:
+        best = np.searchsorted(np.cumsum(widths), (n - rest) / 2.0)
+        exit_point = "median"
+
+    separator = np.flatnonzero(level == best)
+    first = np.flatnonzero(reached & (level < best))
+    second = np.flatnonzero(level > best)
+    first, second = _assign_rest(n, np.flatnonzero(reached), first, second)
+
+    return separator, first, second, exit_point
+
+
+def _tree_paths(parent, depth, us, vs):
+    """
+    Climbs from both endpoints of each non-tree edge to their lowest common ancestor, for all edges at once.
+
+    :param parent: BFS parent array
+    :param depth: BFS level array
+    :param us: array of first endpoints
+    :param vs: array of second endpoints
+    :return: array with the number of nodes on the fundamental cycle of every edge
+    """
+    us = us.copy()
+    vs = vs.copy()
+    length = np.ones(len(us), dtype=np.int64)
+    active = us != vs
+    while active.any():
+        up_u = active & (depth[us] >= depth[vs])
+        up_v = active & ~up_u
+        us[up_u] = parent[us[up_u]]
+        vs[up_v] = parent[vs[up_v]]
+        length += active
+        active = us != vs
+    return length
+
+
+def _cycle_nodes(parent, depth, u, v):
+    """
+    :return: array of nodes on the fundamental cycle closed by the non-tree edge (u, v)
+    """
+    nodes = []
+    while u != v:
+        if depth[u] >= depth[v]:
+            nodes.append(u)
+            u = parent[u]
+        else:
+            nodes.append(v)
+            v = parent[v]
+    nodes.append(u)
+    return np.array(nodes, dtype=np.int64)
+
+
+def _faces(indptr, sources, twin):
+    """
+    Labels the faces of an embedding, i.e. the orbits of the permutation dart -> successor of its twin in the rotation
+    of its target node, by pointer jumping.
+
+    :param indptr: array of length n+1, the darts of node v are indptr[v], ..., indptr[v+1]-1 in cyclic order
+    :param sources: array containing the source node of every dart
+    :param twin: array containing the reverse dart of every dart
+    :return: pair (face label per dart, number of faces)
+    """
+    darts = len(sources)
+    if darts == 0:
+        return np.zeros(0, dtype=np.int64), 0
+
+    # successor of a dart in the cyclic order of its source node
+    succ = np.arange(1, darts + 1)
+    row_end = indptr[1:][sources]
+    wrap = succ == row_end
+    succ[wrap] = indptr[:-1][sources[wrap]]
+
+    nxt = succ[twin]
+    label = np.arange(darts)
+    jump = nxt.copy()
+    for _ in range(int(np.ceil(np.log2(max(darts, 2)))) + 1):
+        np.minimum(label, label[jump], out=label)
+        jump = jump[jump]
+
+    _, face = np.unique(label, return_inverse=True)
+    return face, face.max() + 1
+
+
+def _dart_structure(graph):
+    """
+    Computes the twin of every dart (directed edge) and the faces of an embedded graph.
+
+    :param graph: an embedded CSRGraph
+    :return: tuple (sources, twin, face label per dart, number of faces)
+    """
+    n = graph.n
+    sources = graph.sources()
+    targets = graph.indices
+
+    keys = sources * n + targets
+    order = np.argsort(keys)
+    twin = order[np.searchsorted(keys, targets * n + sources, sorter=order)]
+
+    face, faces = _faces(graph.indptr, sources, twin)
+    return sources, twin, face, faces
+
+
+def _triangulate(indptr, sources, targets, twin, face, faces):
+    """
+    Triangulates all faces of an embedding (including the outer face) by virtual edges, which may be parallel to other
+    edges: every face v0, v1, ..., vk-1 with k > 3 gets the chords (v0, v2), ..., (v0, vk-2), where v0 is a node that
+    appears only once on the face (faces without such a node are kept).
+    In the rotation of v0, the chords are inserted in front of the dart to v1, in the rotation of vi in front of the
+    dart to vi+1, so that every chord closes a triangle.
+
+    :param indptr: array of length n+1, the darts of node v are indptr[v], ..., indptr[v+1]-1 in cyclic order
+    :param sources: array containing the source node of every dart
+    :param targets: array containing the target node of every dart
+    :param twin: array containing the reverse dart of every dart
+    :param face: face label per dart
+    :param faces: number of faces
+    :return: tuple (indptr, sources, targets, twin, real) of the triangulated embedding, real[d] == False for the darts
+             of virtual edges
+    """
+    n = len(indptr) - 1
+    darts = len(sources)
+    degree = np.bincount(face, minlength=faces)
+    position = np.arange(darts) - indptr[sources]
+
+    # start every face at its first dart whose source appears only once on the face
+    corners = face * n + sources
+    _, inverse, occurrences = np.unique(corners, return_inverse=True, return_counts=True)
+    candidates = np.flatnonzero((occurrences[inverse.ravel()] == 1) & (degree[face] > 3))
+    start = np.full(faces, -1, dtype=np.int64)
+    start[face[candidates[::-1]]] = candidates[::-1]
+
+    # rank the darts of every face from its start dart (list ranking by pointer jumping)
+    succ = np.arange(1, darts + 1)
+    wrap = succ == indptr[1:][sources]
+    succ[wrap] = indptr[:-1][sources[wrap]]
+    nxt = succ[twin]
+    last = nxt == start[face]
+    remaining = np.where(last, 0, 1)
+    jump = np.where(last, np.arange(darts), nxt)
+    for _ in range(int(np.ceil(np.log2(max(darts, 2)))) + 1):
+        remaining += remaining[jump]
+        jump = jump[jump]
+    rank = degree[face] - 1 - remaining
+
+    # darts of the faces that get chords, at positions 2, ..., k-2
+    inner = np.flatnonzero((start[face] >= 0) & (rank >= 2) & (rank <= degree[face] - 2))
+    first = start[face[inner]]
+    scale = max(degree.max(initial=0), 1)
+
+    chord_sources = np.concatenate([sources[first], sources[inner]])
+    chord_targets = np.concatenate([sources[inner], sources[first]])
+    chord_keys = np.concatenate([position[first] * scale - (rank[inner] - 1), position[inner] * scale - 1])
+
+    all_sources = np.concatenate([sources, chord_sources])
+    order = np.lexsort((np.concatenate([position * scale, chord_keys]), all_sources))
+    new_index = np.empty(len(order), dtype=np.int64)
+    new_index[order] = np.arange(len(order))
+
+    chords = len(inner)
+    all_twin = np.concatenate([twin, np.arange(chords) + darts + chords, np.arange(chords) + darts])
+    new_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(all_sources, minlength=n), out=new_indptr[1:])
+
+    return (new_indptr, all_sources[order], np.concatenate([targets, chord_targets])[order],
+            new_index[all_twin[order]], order < darts)
+
+
+def _balanced(inside, outside, rest, n):
+    """
+    :param inside: array of the numbers of nodes on one side of each candidate
+    :param outside: array of the numbers of nodes on the other side
+    :param rest: number of nodes that are not part of the separated component (they end up on the smaller side)
+    :param n: number of nodes of the separated component
+    :return: boolean array, whether neither side (including the rest) exceeds 2/3 of all nodes
+    """
+    larger = np.maximum(np.maximum(inside, outside), np.minimum(inside, outside) + rest)
+    return larger <= 2.0 / 3.0 * (n + rest)
+
+
+def _embedded_cycle_separator(graph, parent, depth, rest=0):
+    """
+    Exact fundamental cycle separator on a connected, embedded graph (Lipton-Tarjan): all faces are triangulated by
+    virtual edges first (see _triangulate), which guarantees a fundamental cycle with at most 2/3 of the nodes on
+    either side. The non-tree edges form a spanning tree of the dual graph. Cutting the dual edge of a non-tree edge e
+    splits the faces into the two sides of the fundamental cycle of e, and Euler's formula gives the number of nodes
+    inside: V_in = 1 + (D - L) / 2 - F, where F is the number of faces, D the sum of their degrees and L the cycle
+    length. The nodes of the cycle separate the original graph as well, since virtual edges do not cross real edges.
+
+    :param graph: connected embedded CSRGraph
+    :param parent: BFS parent array
+    :param depth: BFS level array
+    :param rest: number of nodes that are not part of the graph (they end up on the smaller side)
+    :return: tuple (separator, first, second) or None if the embedding is not planar or no cycle is balanced
+    """
+    n = graph.n
+    sources, twin, face, faces = _dart_structure(graph)
+
+    if n - graph.m + faces != 2:  # not a planar embedding
+        return None
+
+    indptr, sources, targets, twin, real = _triangulate(graph.indptr, sources, graph.indices, twin, face, faces)
+    face, faces = _faces(indptr, sources, twin)
+
+    tree = real & ((parent[targets] == sources) | (parent[sources] == targets))
+    cotree = np.flatnonzero(~tree & (np.arange(len(targets)) < twin))
+    if len(cotree) == 0:  # the graph is a tree with at most two nodes, there is no fundamental cycle
+        return None
+
+    # root the dual spanning tree and accumulate face counts and face degrees bottom-up
+    dual = from_edges(faces, face[cotree], face[twin[cotree]])
+    dual_level, dual_parent = bfs(dual, 0)
+    face_count = np.ones(faces, dtype=np.int64)
+    face_degree = np.bincount(face, minlength=faces)
+    for lev in range(dual_level.max(), 0, -1):
+        at_level = np.flatnonzero(dual_level == lev)
+        np.add.at(face_count, dual_parent[at_level], face_count[at_level])
+        np.add.at(face_degree, dual_parent[at_level], face_degree[at_level])
+
+    f1 = face[cotree]
+    f2 = face[twin[cotree]]
+    child = np.where(dual_parent[f1] == f2, f1, f2)
+
+    length = _tree_paths(parent, depth, sources[cotree], targets[cotree])
+    inside = 1 + (face_degree[child] - length) // 2 - face_count[child]
+    outside = n - length - inside
+
+    feasible = np.flatnonzero(_balanced(inside, outside, rest, n))
+    if len(feasible) == 0:
+        return None
+    best = feasible[np.argmin(length[feasible])]
+
+    dart = cotree[best]
+    separator = _cycle_nodes(parent, depth, sources[dart], targets[dart])
+
+    # the inside consists of all nodes on the faces below the cut dual edge (except for the cycle itself)
+    blocked = np.ones(faces, dtype=bool)
+    blocked[dual_parent[child[best]]] = False
+    inside_level, _ = bfs(dual, child[best], blocked)
+    inside_mask = np.zeros(n, dtype=bool)
+    inside_mask[sources[inside_level[face] >= 0]] = True
+    inside_mask[separator] = False
+
+    outside_mask = ~inside_mask
+    outside_mask[separator] = False
+
+    return separator, np.flatnonzero(inside_mask), np.flatnonzero(outside_mask)
+
+
+def _sampled_cycle_separator(graph, parent, depth, candidates, rest=0):
+    """
+    Fundamental cycle separator without an embedding: evaluates fundamental cycles through the median BFS level by
+    removing them from the graph and distributing the remaining components among the two halves. The first cycle
+    (from short to long) that leaves at most 2/3 of the nodes on either side is used.
+
+    :param graph: connected CSRGraph
+    :param parent: BFS parent array
+    :param depth: BFS level array
+    :param candidates: how many cycles to evaluate at most
+    :param rest: number of nodes that are not part of the graph (they end up on the smaller side)
+    :return: tuple (separator, first, second) or None if the graph is a tree or no evaluated cycle is balanced
+    """
+    n = graph.n
+    sources = graph.sources()
+    targets = graph.indices
+    tree = (parent[targets] == sources) | (parent[sources] == targets)
+    cotree = np.flatnonzero(~tree & (sources < targets))
+    if len(cotree) == 0:
+        return None
+
+    # only cycles reaching the median level can split the graph evenly, try them from short to long
+    widths = np.bincount(depth)
+    median = np.searchsorted(np.cumsum(widths), n / 2.0)
+    reaching = cotree[np.maximum(depth[sources[cotree]], depth[targets[cotree]]) >= median]
+    if len(reaching) > 0:
+        cotree = reaching
+
+    length = _tree_paths(parent, depth, sources[cotree], targets[cotree])
+    order = np.argsort(length, kind='stable')
+
+    for idx in order[np.unique(np.linspace(0, len(order) - 1, candidates).astype(np.int64))]:
+        dart = cotree[idx]
+        separator = _cycle_nodes(parent, depth, sources[dart], targets[dart])
+
+        mask = np.ones(n, dtype=bool)
+        mask[separator] = False
+        comp = connected_components(graph, mask)
+        sizes = np.bincount(comp[mask])
+
+        # greedily put the largest components onto the smaller side
+        first_comps = []
+        first_size = second_size = 0
+        for c in np.argsort(-sizes):
+            if first_size <= second_size:
+                first_comps.append(c)
+                first_size += sizes[c]
+            else:
+                second_size += sizes[c]
+
+        if _balanced(first_size, second_size, rest, n):
+            in_first = np.isin(comp, first_comps) & mask
+            return separator, np.flatnonzero(in_first), np.flatnonzero(mask & ~in_first)
+
+    return None
+
+
+def cycle_separator(graph, root, candidates=32):
+    """
+    Fundamental cycle separator on the BFS tree from root. If the graph is embedded (the neighbour lists form a
+    rotation system, see graphs.read_embedded_graph) and the embedding is planar, the shortest fundamental cycle of the
+    triangulated graph that leaves at most 2/3 of the nodes on either side is found exactly via the dual tree,
+    otherwise the shortest cycles are evaluated explicitly. Falls back to the level separator if no cycle is balanced.
+
+    :param graph: the CSRGraph
+    :param root: the root of the BFS tree
+    :param candidates: number of cycles to evaluate if the graph is not embedded
+    :return: tuple (separator, first, second, exit point)
+    """
+    n = graph.n
+    level, _ = bfs(graph, root)
+    component = np.flatnonzero(level >= 0)
+    sub = induced_subgraph(graph, component) if len(component) < n else graph
+    sub_root = np.searchsorted(component, root)
+    depth, parent = bfs(sub, sub_root)
+    rest = n - len(component)
+
+    result = None
+    exit_point = "cycle"
+    if sub.embedded:
+        result = _embedded_cycle_separator(sub, parent, depth, rest)
+    if result is None:
+        result = _sampled_cycle_separator(sub, parent, depth, candidates, rest)
+        exit_point = "cycle_sampled"
+    if result is None:
+        return level_separator(graph, root)
+
+    separator, first, second = (component[part] for part in result)
+    first, second = _assign_rest(n, component, first, second)
+    return separator, first, second, exit_point
+
+
+# maps algorithm name (see utils.reference_algorithms) to separator function
+separators = {"RefLevel": level_separator,
+              "RefCycle": cycle_separator}
+
+
+def to_csv(algorithm, prop, nodes, edges, duration, separator, first, second, exit_point):
+    """
+    Formats one result exactly like Result::to_csv in main.cpp.
+
+    :return: one line of the result-csv
+    """
+    short_list = min(len(first), len(second))
+    long_list = max(len(first), len(second))
+    balance = short_list / long_list if long_list > 0 else float('nan')
+    ratio = len(separator) / short_list if short_list > 0 else (float('nan') if len(separator) == 0 else float('inf'))
+
+    data = [algorithm, prop['name'], nodes, edges, prop['diameter'], prop['diameter_lB'], prop['diameter_uB'],
+            prop['radius'], duration, len(separator), f"{balance:f}", f"{ratio:f}", exit_point]
+    return ",".join(str(val) for val in data) + "\n"
+
+
+def relabel(line, prop):
+    """
+    Copies a csv-line to another instance with the same graph, only the instance columns change.
+
+    :param line: csv-line as returned by to_csv
+    :param prop: properties of the other instance
+    :return: the new csv-line
+    """
+    columns = line.split(",")
+    columns[1] = prop['name']
+    columns[4:8] = [str(prop[key]) for key in ['diameter', 'diameter_lB', 'diameter_uB', 'radius']]
+    return ",".join(columns)
+
+
+def instance_properties(props, path):
+    """
+    :param props: properties as returned by read_properties
+    :param path: path to an instance
+    :return: the properties of the instance, placeholders (-1) if it was not recorded
+    """
+    default = {'name': extract_full_file_name(path), 'nodes': -1, 'diameter': -1, 'diameter_lB': -1,
+               'diameter_uB': -1, 'radius': -1}
+    return props.get(path, default)
+
+
+def solve_instance(path, algorithms, attempts, prop, window=None, start_nodes=None):
+    """
+    Solves one instance with all given reference separators.
+
+    :param path: path to the instance
+    :param algorithms: list of algorithm names (keys of separators)
+    :param attempts: number of random start nodes, or every start node if attempts <= 0
+    :param prop: properties of the instance
+    :param window: pair (first, count), only the solves first, ..., first+count-1 are run (like the -w option of
+                   main.cpp), or None to run all solves
+    :param start_nodes: dictionary mapping algorithm name to a list of start nodes that the attempts use instead of
+                        random ones (e.g. predicted by root_index.py), or None
+    :return: list of csv-lines
+    """
+    graph = read_embedded_graph(path)
+    solves = graph.n if attempts <= 0 else attempts
+    first, count = window if window is not None else (0, solves)
+    positions = range(min(first, solves), min(first + count, solves))
+    if attempts <= 0:
+        roots = np.array(positions, dtype=np.int64)
+    else:
+        roots = [np.random.default_rng(seed).integers(graph.n) for seed in positions]
+
+    lines = []
+    for algo in algorithms:
+        algo_roots = roots
+        if attempts > 0 and start_nodes is not None and algo in start_nodes:
+            algo_roots = [start_nodes[algo][i] for i in positions if i < len(start_nodes[algo])]
+        for root in algo_roots:
+            start = time.perf_counter()
+            separator, first, second, exit_point = separators[algo](graph, root)
+            duration = int((time.perf_counter() - start) * 1e6)
+            lines.append(to_csv(algo, prop, graph.n, graph.m, duration, separator, first, second, exit_point))
+    return lines
+
+
+def main(instance_dir, property_file, target, limit, attempts, algorithms, alias_file=None, selection=None,
+         roots_file=None):
+    """
+    Applies the reference separators to all instances. Duplicate instances (see deduplicate.py) are solved once, their
+    results are copied to all aliases.
+
+    :param instance_dir: path to directory with instances
+    :param property_file: path to property file
+    :param target: path to the resulting csv-file
+    :param limit: size limit (in nodes) of the instances
+    :param attempts: number of attempts per instance (every start node if <= 0)
+    :param algorithms: list of algorithm names
+    :param alias_file: path to alias file as generated by deduplicate.py, ignored if it does not exist
+    :param selection: expression to select instances by (see catalog.py), or None
+    :param roots_file: path to file with the start nodes to use per instance (see root_index.py), or None
+    """
+    props = read_properties(property_file)
+    roots = read_roots(roots_file) if roots_file is not None else dict()
+    selected = compile_expression(selection)
+
+    aliases = dict()
+    if alias_file is not None and os.path.exists(alias_file):
+        for canonical, duplicates in read_aliases(alias_file).items():
+            aliases[os.path.normpath(canonical)] = [os.path.normpath(path) for path in duplicates]
+    canonical_of = {path: canonical for canonical, duplicates in aliases.items() for path in duplicates}
+
+    directory = os.path.dirname(target)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    with open(target, 'w') as file:
+        file.write(CSV_HEAD)
+
+        paths = {os.path.normpath(path): path for path in list_instances(instance_dir)}
+
+        for key, path in paths.items():
+            if canonical_of.get(key) in paths:
+                continue
+
+            prop = instance_properties(props, path)
+            if int(prop['nodes']) > limit or not selected(catalog_row(path, prop, with_hash=False)):
+                continue
+
+            print(f"Working on {prop['name']}")
+            lines = solve_instance(path, algorithms, attempts, prop,
+                                   start_nodes=roots.get(extract_full_file_name(path)))
+            file.writelines(lines)
+
+            for alias in aliases.get(key, []):
+                if alias in paths:
+                    file.writelines(relabel(line, instance_properties(props, paths[alias])) for line in lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reference separators (pure NumPy).')
+    parser.add_argument('--instances', type=str, default="../instances/", help='Path to directory with instances')
+    parser.add_argument('--properties', type=str, default="../instances/properties.xml", help='Path to property file')
+    parser.add_argument('--target', type=str, default="../results/reference.csv", help='Path to resulting csv-file')
+    parser.add_argument('--limit', type=int, default=1000000, help='Size limit (in nodes) of the instances')
+    parser.add_argument('--attempts', type=int, default=20, help='Attempts per instance, every start node if <= 0')
+    parser.add_argument('--algorithms', type=str, default="RefLevel,RefCycle", help='Comma-separated algorithms')
+    parser.add_argument('--aliases', type=str, default="../instances/aliases.xml", help='Path to alias file')
+    parser.add_argument('--select', type=str, default=None,
+                        help='Expression to select instances, e.g. "family in (grid, delaunay) and nodes < 50k"')
+    parser.add_argument('--roots', type=str, default=None,
+                        help='Path to file with predicted start nodes (see root_index.py), used instead of random ones')
+    args = parser.parse_args()
+
+    main(args.instances, args.properties, args.target, args.limit, args.attempts, args.algorithms.split(","),
+         args.aliases, args.select, args.roots)
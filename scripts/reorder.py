@@ -0,0 +1,360 @@
+"""
+This script renumbers the nodes of the instances so that neighbours get close indices, which makes the adjacency
+accesses of BFS-heavy separators (and of the Python analysis) cache-friendly. The instance files store the nodes in
+the order in which they were created (generator order for the OGDF-written .gml files, OSM way-traversal order for
+the road graphs from map_generator.py), which scatters the neighbourhoods over the whole node range.
+
+Orderings:
+    * bfs: breadth first search order, starting at a pseudo-peripheral node of every component
+    * rcm: reverse Cuthill-McKee (BFS order with the new nodes of every parent sorted by degree, reversed)
+    * hilbert: order of the node coordinates along a Hilbert curve (only for instances with coordinates, see
+      graphs.read_coordinates, other instances fall back to rcm)
+
+The convert command rewrites the instance files in the new order and saves the permutation next to them (<name>.perm,
+line i holds the original index of node i, see graphs.read_permutation), so that results can be mapped back to the
+original node ids. Reordering an instance again composes the permutations.
+The benchmark command compares the runtime of BFS and of the separators for every ordering, per instance family.
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+
+from catalog import family_of
+from graphs import read_graph, list_instances, extract_full_file_name, read_coordinates, read_permutation, \
+    permute, write_gml, write_chaco, expand, bfs
+from separators import Separator, DEFAULT_BINARY
+import reference_separators
+
+CSV_HEAD = "algorithm,instance,family,nodes,edges,order,mean_span,bandwidth,time,speedup\n"
+
+
+def _pseudo_peripheral(graph, start, degrees, iterations=8):
+    """
+    Finds a node of (almost) maximum eccentricity in the component of start (George and Liu): repeatedly moves to a
+    node of minimum degree on the last BFS level, as long as the eccentricity grows.
+
+    :return: the pseudo-peripheral node
+    """
+    level = bfs(graph, start)[0]
+    for _ in range(iterations):
+        last = np.flatnonzero(level == level.max())
+        candidate = last[np.argmin(degrees[last])]
+        candidate_level = bfs(graph, candidate)[0]
+        if candidate_level.max() <= level.max():
+            break
+        start, level = candidate, candidate_level
+    return start
+
+
+def _level_order(graph, by_degree):
+    """
+    Numbers the nodes level by level in BFS order, every component starting at a pseudo-peripheral node.
+    New nodes are numbered in the order of their parents, with the new nodes of each parent in the order of the
+    adjacency list or, if by_degree, by increasing degree (Cuthill-McKee).
+
+    :return: array order, order[i] is the node that becomes node i
+    """
+    degrees = graph.degrees()
+    position = np.full(graph.n, -1, dtype=np.int64)
+    count = 0
+
+    for start in np.argsort(degrees, kind='stable'):
+        if position[start] != -1:
+            continue
+        root = _pseudo_peripheral(graph, start, degrees) if degrees[start] > 0 else start
+        frontier = np.array([root])
+        while frontier.size > 0:
+            position[frontier] = count + np.arange(frontier.size)
+            count += frontier.size
+
+            # sources are in the order of the frontier, i.e. of their positions
+            srcs, tgts = expand(graph, frontier)
+            new = position[tgts] == -1
+            srcs, tgts = srcs[new], tgts[new]
+            if by_degree:
+                tgts = tgts[np.lexsort((degrees[tgts], position[srcs]))]
+            tgts, first = np.unique(tgts, return_index=True)
+            frontier = tgts[np.argsort(first)]
+
+    return np.argsort(position)
+
+
+def bfs_order(graph, coordinates=None):
+    """
+    :return: the BFS ordering (see module docstring), order[i] is the node that becomes node i
+    """
+    return _level_order(graph, False)
+
+
+def cuthill_mckee(graph, coordinates=None):
+    """
+    :return: the reverse Cuthill-McKee ordering, order[i] is the node that becomes node i
+    """
+    return _level_order(graph, True)[::-1]
+
+
+def hilbert_order(graph, coordinates, bits=16):
+    """
+    Sorts the nodes along a Hilbert curve through the bounding box of their coordinates.
+
+    :param graph: the CSRGraph
+    :param coordinates: array of shape (n, 2)
+    :param bits: resolution of the curve, the coordinates are rounded to a grid of 2^bits x 2^bits cells
+    :return: order, order[i] is the node that becomes node i
+    """
+    low = coordinates.min(axis=0)
+    extent = np.maximum(coordinates.max(axis=0) - low, 1e-300)
+    side = 1 << bits
+    x, y = ((coordinates - low) / extent * (side - 1)).round().astype(np.int64).T
+
+    index = np.zeros(graph.n, dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        # rotate the quadrant, so that the curve in it starts and ends at the right corners
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+
+    return np.argsort(index, kind='stable')
+
+
+orderings = {"bfs": bfs_order,
+             "rcm": cuthill_mckee,
+             "hilbert": hilbert_order}
+
+
+def compute_order(graph, name, coordinates=None):
+    """
+    Computes an ordering, hilbert falls back to rcm for graphs without (complete) coordinates.
+
+    :param graph: the CSRGraph
+    :param name: the name of the ordering (see orderings) or "original"
+    :param coordinates: array of shape (n, 2) or None
+    :return: pair (name, order) of the ordering that was actually used and the order
+    """
+    if name == "original":
+        return name, np.arange(graph.n)
+    if name == "hilbert" and (coordinates is None or len(coordinates) != graph.n or np.isnan(coordinates).any()):
+        name = "rcm"
+    return name, orderings[name](graph, coordinates)
+
+
+def edge_span(graph):
+    """
+    :return: pair (mean, maximum) of the index differences |u - v| over all edges, the maximum is the bandwidth
+    """
+    span = np.abs(graph.sources() - graph.indices)
+    return (round(float(span.mean()), 2), int(span.max())) if len(span) > 0 else (0, 0)
+
+
+def _write_stp(source, target, new_index):
+    """
+    Rewrites an .stp file with renumbered nodes, everything else (weights, terminals, comments) is kept.
+
+    :param source: path to the .stp file
+    :param target: path to the resulting file (may be the same)
+    :param new_index: array, node v (0-based) becomes node new_index[v]
+    """
+    with open(source, 'r') as file:
+        lines = file.readlines()
+
+    with open(target, 'w') as file:
+        for line in lines:
+            parts = line.split()
+            if parts and parts[0] in ("E", "A") and len(parts) >= 3:
+                parts[1:3] = [str(new_index[int(v) - 1] + 1) for v in parts[1:3]]
+            elif parts and parts[0] in ("DD", "T") and len(parts) >= 2:
+                parts[1] = str(new_index[int(parts[1]) - 1] + 1)
+            else:
+                file.write(line)
+                continue
+            file.write(" ".join(parts) + "\n")
+
+
+def reorder_instance(path, name, target):
+    """
+    Rewrites an instance in a new node order and saves the permutation (composed with the saved permutation of an
+    earlier reordering).
+
+    :param path: path to the instance file
+    :param name: the name of the ordering (see orderings)
+    :param target: path to the resulting instance file (may be the same)
+    :return: the name of the ordering that was actually used
+    """
+    graph = read_graph(path)
+    coordinates = read_coordinates(path)
+    name, order = compute_order(graph, name, coordinates)
+    new_index = np.empty(graph.n, dtype=np.int64)
+    new_index[order] = np.arange(graph.n)
+
+    sidecar = path[:path.rfind(".")] + ".xy"
+    has_sidecar = os.path.exists(sidecar)
+    if coordinates is not None and len(coordinates) == graph.n:
+        coordinates = coordinates[order]
+
+    if path.endswith(".stp"):
+        _write_stp(path, target, new_index)
+    elif path.endswith(".gml"):
+        write_gml(permute(graph, order), target, None if has_sidecar else coordinates)
+    else:
+        write_chaco(permute(graph, order), target)
+
+    base = target[:target.rfind(".")]
+    if has_sidecar:
+        np.savetxt(base + ".xy", coordinates)
+    original = read_permutation(path)
+    np.savetxt(base + ".perm", order if original is None else original[order], fmt="%d")
+    return name
+
+
+def convert(instance_dirs, name, target):
+    """
+    Reorders all instances in the given directories.
+
+    :param instance_dirs: list of directories with instances
+    :param name: the name of the ordering (see orderings)
+    :param target: directory of the reordered instances (mirroring the source directories), None to rewrite the
+                   instances in place
+    """
+    for directory in instance_dirs:
+        for path in list_instances(directory):
+            if target is None:
+                target_path = path
+            else:
+                target_path = os.path.join(target, os.path.relpath(path, os.path.dirname(os.path.normpath(directory))))
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+            graph = read_graph(path)
+            before = edge_span(graph)
+            used = reorder_instance(path, name, target_path)
+            after = edge_span(read_graph(target_path))
+            print(f"{extract_full_file_name(path)}: {used}, mean edge span {before[0]} -> {after[0]}, "
+                  f"bandwidth {before[1]} -> {after[1]}")
+
+
+def _measure(function, repetitions):
+    """
+    :return: the fastest of several runs of function in microseconds
+    """
+    best = float("inf")
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return int(best * 1e6)
+
+
+def benchmark(instance_dirs, names, algorithms, binary, roots, repetitions, target, seed=42):
+    """
+    Measures the runtime of BFS (from a fixed set of roots) and of the separators for every ordering.
+    The reference separators are started at the same (renumbered) root for every ordering, OGDF separators are
+    called through the separate binary with the same seed.
+
+    :param instance_dirs: list of directories with instances
+    :param names: list of orderings (see orderings), the original order is always included
+    :param algorithms: list of separator names (see separators.py)
+    :param binary: path to the separate binary
+    :param roots: number of BFS roots per instance
+    :param repetitions: every measurement is the fastest of this many runs
+    :param target: path to the resulting csv-file
+    :param seed: random seed of the roots
+    """
+    separators = [Separator(algo, binary, seed) for algo in algorithms]
+    if not os.path.exists(binary):
+        skipped = [sep.name for sep in separators if sep.is_ogdf()]
+        if skipped:
+            print(f"WARNING: {binary} not found, skipping {skipped}")
+        separators = [sep for sep in separators if not sep.is_ogdf()]
+
+    directory = os.path.dirname(target)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    speedups = dict()  # (family, order, algorithm) -> list of speedups
+    with open(target, 'w') as file:
+        file.write(CSV_HEAD)
+
+        for path in [path for directory in instance_dirs for path in list_instances(directory)]:
+            instance = extract_full_file_name(path)
+            family = family_of(instance)
+            graph = read_graph(path)
+            coordinates = read_coordinates(path)
+            sources = np.random.default_rng(seed).integers(graph.n, size=roots)
+            print(f"Working on {instance}")
+
+            baseline = dict()
+            for name in ["original"] + [name for name in names if name != "original"]:
+                used, order = compute_order(graph, name, coordinates)
+                if used != name:
+                    print(f"\t{name}: no coordinates, skipped")
+                    continue
+                permuted = permute(graph, order)
+                new_index = np.empty(graph.n, dtype=np.int64)
+                new_index[order] = np.arange(graph.n)
+                mean_span, bandwidth = edge_span(permuted)
+
+                times = {"BFS": _measure(lambda: [bfs(permuted, v) for v in new_index[sources]], repetitions)}
+                for sep in separators:
+                    if sep.name in reference_separators.separators:
+                        root = new_index[sources[0]]
+                        call = lambda: reference_separators.separators[sep.name](permuted, root)
+                    else:
+                        call = lambda: sep(permuted)
+                    times[sep.name] = _measure(call, repetitions)
+
+                for algorithm, duration in times.items():
+                    baseline.setdefault(algorithm, duration)
+                    speedup = round(baseline[algorithm] / duration, 4) if duration > 0 else 1.0
+                    speedups.setdefault((family, name, algorithm), []).append(speedup)
+                    row = {'algorithm': algorithm, 'instance': instance, 'family': family, 'nodes': graph.n,
+                           'edges': graph.m, 'order': name, 'mean_span': mean_span, 'bandwidth': bandwidth,
+                           'time': duration, 'speedup': speedup}
+                    file.write(",".join(str(row[col]) for col in CSV_HEAD.strip().split(",")) + "\n")
+                print(f"\t{name}: mean edge span {mean_span}, "
+                      + ", ".join(f"{algorithm} {duration / 1e3:.1f}ms" for algorithm, duration in times.items()))
+
+    print("Speedup over the original order (geometric mean per family):")
+    for (family, name, algorithm), values in sorted(speedups.items()):
+        if name != "original":
+            print(f"\t{family:<12} {name:<8} {algorithm:<12} {np.exp(np.mean(np.log(values))):.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Locality-improving node orderings of the instances.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = commands.add_parser('convert', help='Rewrites the instances in a new node order')
+    convert_parser.add_argument('instances', type=str, nargs='+', help='Directories with instances')
+    convert_parser.add_argument('--order', type=str, choices=sorted(orderings), default="rcm", help='The ordering')
+    convert_parser.add_argument('--target', type=str, default=None,
+                                help='Directory of the reordered instances, the instances are rewritten in place if '
+                                     'not given')
+
+    benchmark_parser = commands.add_parser('benchmark', help='Compares BFS and separator runtimes of the orderings')
+    benchmark_parser.add_argument('--instances', type=str, nargs='+',
+                                  default=["../instances/europe", "../instances/delaunay_large", "../instances/random",
+                                           "../instances/table", "../instances/vlsi"],
+                                  help='Directories with instances')
+    benchmark_parser.add_argument('--orders', type=str, default="bfs,rcm,hilbert", help='Comma-separated orderings')
+    benchmark_parser.add_argument('--algorithms', type=str, default="RefLevel,RefCycle,LT,Dual,HPN",
+                                  help='Comma-separated separators')
+    benchmark_parser.add_argument('--binary', type=str, default=DEFAULT_BINARY, help='Path to the separate binary')
+    benchmark_parser.add_argument('--roots', type=int, default=8, help='Number of BFS roots per instance')
+    benchmark_parser.add_argument('--repetitions', type=int, default=3, help='Runs per measurement (fastest counts)')
+    benchmark_parser.add_argument('--target', type=str, default="../results/reorder.csv",
+                                  help='Path to resulting csv-file')
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        convert(args.instances, args.order, args.target)
+    else:
+        benchmark(args.instances, args.orders.split(","), args.algorithms.split(","), args.binary, args.roots,
+                  args.repetitions, args.target)
@@ -0,0 +1,657 @@
+"""
+Generates a self-contained static HTML report of the results (no server needed, open the file in a browser):
+    1. relative separator size per instance (mean separator size of an algorithm / smallest separator of the instance)
+    2. runtime development (instance size against mean runtime)
+    3. exit point distributions
+The instances are sorted by size. Everything is aggregated per instance and algorithm in advance and downsampled
+into buckets of factor^l consecutive instances for l = 0, 1, 2, ... (levels of detail, with the min, mean and max
+of every bucket). The report draws the coarsest level that still resolves the visible range, so it stays responsive
+with tens of thousands of instances and all algorithm/postprocessor combinations. Zooming in on a range switches to
+finer levels down to single instances, and clicking an instance shows all of its results.
+
+The data is embedded as zlib-compressed typed arrays (decompressed by the browser).
+"""
+
+import argparse
+import base64
+import html
+import json
+import os
+import warnings
+import zlib
+
+import catalog
+import utils
+from profiling import traced
+from utils import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _encode(array, dtype):
+    """
+    :return: the array as base64 string of the zlib-compressed little endian bytes
+    """
+    data = np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()
+    return base64.b64encode(zlib.compress(data, 6)).decode('ascii')
+
+
+@traced
+def aggregate(df, algorithms=None):
+    """
+    Aggregates the results per instance and algorithm.
+
+    :param df: the results
+    :param algorithms: list of algorithm names to include, all algorithms if None
+    :return: dictionary with the instances (sorted by size), algorithms, exit points and arrays of shape
+             (instances, algorithms) for count, mean/min/max separator size, mean time and mean balance, the exit
+             point counts of shape (instances, algorithms, exit points) and the best separator size per instance
+    """
+    if algorithms is not None:
+        df = df[df['algorithm'].isin(algorithms)]
+
+    info = df.groupby('instance', observed=True).agg(nodes=('nodes', 'first'), edges=('edges', 'first'))
+    info = info.sort_values(['nodes', 'edges'], kind='stable')
+    instances = list(info.index)
+
+    present = set(df['algorithm'].unique())
+    ordered = [algo for algo in utils.all_algs_and_post + utils.reference_algorithms if algo in present]
+    algorithms = ordered + sorted(present - set(ordered))
+    exits = sorted(str(ex) for ex in df['exit'].unique())
+
+    n_inst, n_algo, n_exit = len(instances), len(algorithms), len(exits)
+    flat = (pd.Categorical(df['instance'], categories=instances).codes.astype(np.int64) * n_algo
+            + pd.Categorical(df['algorithm'], categories=algorithms).codes)
+    exit_codes = pd.Categorical(df['exit'].astype(str), categories=exits).codes
+
+    grouped = pd.DataFrame({'flat': flat, 'sep': df['sep_size'].to_numpy(), 'time': df['time'].to_numpy(),
+                            'balance': df['balance'].to_numpy()}).groupby('flat')
+    stats = grouped.agg(count=('sep', 'size'), mean_sep=('sep', 'mean'), min_sep=('sep', 'min'),
+                        max_sep=('sep', 'max'), time=('time', 'mean'), balance=('balance', 'mean'))
+
+    result = {"instances": instances, "nodes": info['nodes'].to_numpy(), "edges": info['edges'].to_numpy(),
+              "algorithms": algorithms, "exits": exits}
+    for column in stats.columns:
+        values = np.full(n_inst * n_algo, 0 if column == 'count' else np.nan)
+        values[stats.index.to_numpy()] = stats[column].to_numpy()
+        result[column] = values.reshape(n_inst, n_algo)
+
+    result["exit_counts"] = np.bincount(flat * n_exit + exit_codes,
+                                        minlength=n_inst * n_algo * n_exit).reshape(n_inst, n_algo, n_exit)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)  # instances without results
+        result["best"] = np.nanmin(result["min_sep"], axis=1)
+    return result
+
+
+@traced
+def levels_of_detail(data, factor=4):
+    """
+    Downsamples the per-instance data into buckets of factor^l consecutive instances, until one bucket holds all
+    instances.
+
+    :param data: aggregated data as returned by aggregate
+    :param factor: growth of the bucket size from one level to the next
+    :return: list of levels, each a dictionary with the bucket size and arrays of shape (buckets, algorithms) for the
+             min, mean and max relative separator size and the mean time, and the mean instance size per bucket
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = data["mean_sep"] / np.where(data["best"] > 0, data["best"], np.nan)[:, None]
+    n_inst = len(data["instances"])
+
+    levels = []
+    size = 1
+    while True:
+        buckets = -(-n_inst // size)
+        pad = buckets * size - n_inst
+
+        def bucketed(values):
+            padded = np.concatenate([values, np.full((pad,) + values.shape[1:], np.nan)])
+            return padded.reshape((buckets, size) + values.shape[1:])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)  # buckets without results
+            levels.append({"size": size,
+                           "rel_min": np.nanmin(bucketed(relative), axis=1),
+                           "rel_mean": np.nanmean(bucketed(relative), axis=1),
+                           "rel_max": np.nanmax(bucketed(relative), axis=1),
+                           "time": np.nanmean(bucketed(data["time"]), axis=1),
+                           "nodes": np.nanmean(bucketed(data["nodes"].astype(np.float64)), axis=1)})
+        if buckets <= 1:
+            return levels
+        size *= factor
+
+
+@traced
+def build_report(data, levels, title):
+    """
+    :param data: aggregated data as returned by aggregate
+    :param levels: levels of detail as returned by levels_of_detail
+    :param title: title of the report
+    :return: the html document
+    """
+    payload = {"title": title,
+               "instances": data["instances"],
+               "algorithms": data["algorithms"],
+               "colors": [utils.color_of(algo) for algo in data["algorithms"]],
+               "core": [algo for algo in data["algorithms"]
+                        if algo in utils.core_algorithms or algo in utils.reference_algorithms],
+               "exits": data["exits"],
+               "arrays": {"nodes": _encode(data["nodes"], 'u4'),
+                          "edges": _encode(data["edges"], 'u4'),
+                          "count": _encode(data["count"], 'u4'),
+                          "mean_sep": _encode(data["mean_sep"], 'f4'),
+                          "min_sep": _encode(data["min_sep"], 'f4'),
+                          "max_sep": _encode(data["max_sep"], 'f4'),
+                          "time": _encode(data["time"], 'f4'),
+                          "balance": _encode(data["balance"], 'f4'),
+                          "best": _encode(data["best"], 'f4'),
+                          "exit_counts": _encode(data["exit_counts"], 'u4')},
+               "levels": [{"size": level["size"],
+                           "arrays": {key: _encode(level[key], 'f4')
+                                      for key in ["rel_min", "rel_mean", "rel_max", "time", "nodes"]}}
+                          for level in levels]}
+    # "</" must not appear inside the script element
+    embedded = json.dumps(payload, separators=(',', ':')).replace("</", "<\\/")
+    return _TEMPLATE.replace("__TITLE__", html.escape(title)).replace("__DATA__", embedded)
+
+
+def main(paths, target, selection=None, algorithms=None, factor=4):
+    """
+    Writes the report.
+
+    :param paths: path (or list of paths) to result files (csv or .psr)
+    :param target: path to the resulting html-file
+    :param selection: expression to select instances by (see catalog.py), or None
+    :param algorithms: list of algorithm names to include, all algorithms if None
+    :param factor: growth of the bucket size from one level of detail to the next
+    """
+    df = utils.read_results(paths)
+    if selection is not None:
+        df = df[df['instance'].isin(catalog.selected_names(selection))]
+
+    data = aggregate(df, algorithms)
+    levels = levels_of_detail(data, factor)
+    html = build_report(data, levels, os.path.basename(target).rsplit(".", 1)[0])
+
+    directory = os.path.dirname(target)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(target, 'w', encoding='utf-8') as file:
+        file.write(html)
+    print(f"Wrote report on {len(data['instances'])} instances and {len(data['algorithms'])} algorithms "
+          f"({len(levels)} levels of detail, {len(html) / 1e6:.1f} MB) to {target}")
+
+
+def add_arguments(parser):
+    """
+    Adds the command line arguments to a parser (shared with cli.py).
+
+    :param parser: the argument parser
+    """
+    parser.add_argument('--source', type=str, nargs='+', help='Path(s) to data file(s)')
+    parser.add_argument('--target', type=str, default="../plots/report.html", help='Path to resulting html-file')
+    parser.add_argument('--select', type=str, default=None,
+                        help='Expression to select instances, e.g. "family in (grid, delaunay) and nodes < 50k"')
+    parser.add_argument('--algorithms', type=str, default=None, help='Comma-separated algorithms, all if not given')
+    parser.add_argument('--factor', type=int, default=4, help='Growth of the bucket size between levels of detail')
+
+
+def run(args):
+    """
+    Runs the script with the parsed command line arguments.
+
+    :param args: the parsed arguments
+    """
+    main(args.source, args.target, args.select, args.algorithms.split(",") if args.algorithms else None, args.factor)
+
+
+_TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  body { font-family: sans-serif; font-size: 13px; margin: 12px; color: #222; }
+  h1 { font-size: 18px; margin: 0 0 8px 0; }
+  h2 { font-size: 14px; margin: 14px 0 4px 0; }
+  #layout { display: flex; gap: 16px; }
+  #sidebar { width: 230px; flex-shrink: 0; }
+  #main { flex-grow: 1; min-width: 0; }
+  #algorithms { max-height: 420px; overflow-y: auto; border: 1px solid #ddd; padding: 4px; }
+  #algorithms label { display: block; white-space: nowrap; }
+  .swatch { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+  canvas { border: 1px solid #ddd; width: 100%; display: block; cursor: crosshair; }
+  #tooltip { position: fixed; pointer-events: none; background: rgba(255,255,255,0.95); border: 1px solid #aaa;
+             padding: 4px 6px; display: none; font-size: 12px; max-width: 360px; }
+  table { border-collapse: collapse; }
+  td, th { border-bottom: 1px solid #eee; padding: 2px 8px; text-align: right; }
+  td:first-child, th:first-child { text-align: left; }
+  .hint { color: #777; }
+  button { margin: 2px 2px 2px 0; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div id="layout">
+  <div id="sidebar">
+    <div><input id="search" list="instance-names" placeholder="find instance" style="width: 100%"></div>
+    <datalist id="instance-names"></datalist>
+    <h2>Algorithms</h2>
+    <button id="select-core">core</button><button id="select-all">all</button><button id="select-none">none</button>
+    <div id="algorithms"></div>
+    <h2>View</h2>
+    <div id="view-info"></div>
+    <p class="hint">Wheel: zoom, drag: pan, click: zoom into a bucket or show an instance, double click: reset.</p>
+  </div>
+  <div id="main">
+    <h2>Relative separator size per instance (instances sorted by size)</h2>
+    <canvas id="relative" height="320"></canvas>
+    <h2>Runtime development</h2>
+    <canvas id="runtime" height="260"></canvas>
+    <h2>Exit points (visible instances)</h2>
+    <canvas id="exits" height="220"></canvas>
+    <h2>Instance</h2>
+    <div id="detail" class="hint">Click on a single instance to see its results.</div>
+  </div>
+</div>
+<div id="tooltip"></div>
+<script id="data" type="application/json">__DATA__</script>
+<script>
+"use strict";
+const DATA = JSON.parse(document.getElementById("data").textContent);
+const EXIT_COLORS = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#edc948", "#b07aa1", "#ff9da7",
+                     "#9c755f", "#bab0ac"];
+
+async function decode(base64, type) {
+  const bytes = Uint8Array.from(atob(base64), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("deflate"));
+  return new type(await new Response(stream).arrayBuffer());
+}
+
+const state = { lo: 0, hi: 0, selected: new Set(), drag: null };
+let A = {};       // per instance arrays
+let LEVELS = [];  // levels of detail
+const nInst = DATA.instances.length, nAlgo = DATA.algorithms.length, nExit = DATA.exits.length;
+
+function fmt(value, digits) {
+  if (value === undefined || Number.isNaN(value)) return "-";
+  return value.toFixed(digits);
+}
+
+function esc(text) {
+  return String(text).replace(/[&<>"']/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"})[c]);
+}
+
+// ---------- levels of detail ----------
+
+function chooseLevel(width) {
+  // coarsest level that still has about one bucket per 3 pixels in the visible range
+  const wanted = Math.max(1, (state.hi - state.lo) / Math.max(1, width / 3));
+  let best = LEVELS[0];
+  for (const level of LEVELS) if (level.size <= wanted) best = level;
+  return best;
+}
+
+function visibleBuckets(level) {
+  const first = Math.floor(state.lo / level.size), last = Math.ceil(state.hi / level.size);
+  const buckets = [];
+  for (let b = first; b < last; b++) {
+    buckets.push({ index: b, lo: b * level.size, hi: Math.min(nInst, (b + 1) * level.size) });
+  }
+  return buckets;
+}
+
+// ---------- drawing helpers ----------
+
+function setupCanvas(canvas) {
+  const ratio = window.devicePixelRatio || 1;
+  const width = canvas.clientWidth, height = canvas.height / (canvas.dataset.ratio || 1);
+  canvas.dataset.ratio = ratio;
+  canvas.width = width * ratio;
+  canvas.height = height * ratio;
+  canvas.style.height = height + "px";
+  const ctx = canvas.getContext("2d");
+  ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+  ctx.clearRect(0, 0, width, height);
+  ctx.font = "11px sans-serif";
+  return { ctx, width, height, left: 56, right: width - 10, top: 10, bottom: height - 28 };
+}
+
+function niceTicks(lo, hi, count) {
+  const span = hi - lo || 1, step0 = span / count;
+  const magnitude = Math.pow(10, Math.floor(Math.log10(step0)));
+  const step = [1, 2, 5, 10].map(f => f * magnitude).find(s => span / s <= count) || magnitude * 10;
+  const ticks = [];
+  for (let t = Math.ceil(lo / step) * step; t <= hi + 1e-9; t += step) ticks.push(t);
+  return ticks;
+}
+
+function drawAxes(g, yTicks, yLabel, xTicks, xLabel) {
+  const ctx = g.ctx;
+  ctx.strokeStyle = "#999"; ctx.fillStyle = "#444";
+  ctx.beginPath(); ctx.moveTo(g.left, g.top); ctx.lineTo(g.left, g.bottom); ctx.lineTo(g.right, g.bottom); ctx.stroke();
+  ctx.textAlign = "right"; ctx.textBaseline = "middle";
+  for (const [y, label] of yTicks) {
+    ctx.fillText(label, g.left - 4, y);
+    ctx.strokeStyle = "#eee"; ctx.beginPath(); ctx.moveTo(g.left + 1, y); ctx.lineTo(g.right, y); ctx.stroke();
+  }
+  ctx.textAlign = "center"; ctx.textBaseline = "top";
+  for (const [x, label] of xTicks) ctx.fillText(label, x, g.bottom + 4);
+  ctx.fillText(xLabel, (g.left + g.right) / 2, g.bottom + 15);
+  ctx.save(); ctx.translate(10, (g.top + g.bottom) / 2); ctx.rotate(-Math.PI / 2);
+  ctx.textBaseline = "middle"; ctx.fillText(yLabel, 0, 0); ctx.restore();
+}
+
+function selectedAlgorithms() {
+  return DATA.algorithms.map((_, a) => a).filter(a => state.selected.has(a));
+}
+
+// ---------- relative separator size ----------
+
+let relativeGeometry = null;
+
+function drawRelative() {
+  const canvas = document.getElementById("relative");
+  const g = setupCanvas(canvas);
+  const level = chooseLevel(g.right - g.left);
+  const buckets = visibleBuckets(level);
+  const algos = selectedAlgorithms();
+  const B = LEVELS.indexOf(level);
+
+  // y range: 1 to the 98th percentile of the visible means (outliers are drawn at the top)
+  const means = [];
+  for (const b of buckets) for (const a of algos) {
+    const v = level.rel_mean[b.index * nAlgo + a];
+    if (!Number.isNaN(v)) means.push(v);
+  }
+  means.sort((x, y) => x - y);
+  const yMax = Math.max(1.05, means.length ? means[Math.floor(0.98 * (means.length - 1))] * 1.05 : 2);
+  const xOf = i => g.left + (i - state.lo) / (state.hi - state.lo) * (g.right - g.left);
+  const yOf = v => g.bottom - (Math.min(v, yMax) - 1) / (yMax - 1) * (g.bottom - g.top);
+
+  const xTicks = niceTicks(state.lo, state.hi, 8).filter(t => t < nInst).map(t => [xOf(t), String(Math.round(t))]);
+  const yTicks = niceTicks(1, yMax, 6).map(t => [yOf(t), t.toFixed(2)]);
+  drawAxes(g, yTicks, "relative separator size", xTicks, "instance (by size)");
+
+  const ctx = g.ctx;
+  ctx.save(); ctx.beginPath(); ctx.rect(g.left, g.top - 2, g.right - g.left, g.bottom - g.top + 4); ctx.clip();
+  for (const a of algos) {
+    const color = DATA.colors[a];
+    // min-max band per bucket
+    if (level.size > 1) {
+      ctx.strokeStyle = color; ctx.globalAlpha = 0.25; ctx.lineWidth = Math.max(1, (xOf(level.size) - xOf(0)) * 0.6);
+      ctx.beginPath();
+      for (const b of buckets) {
+        const lo = level.rel_min[b.index * nAlgo + a], hi = level.rel_max[b.index * nAlgo + a];
+        if (Number.isNaN(lo)) continue;
+        const x = xOf((b.lo + b.hi) / 2);
+        ctx.moveTo(x, yOf(lo)); ctx.lineTo(x, yOf(hi));
+      }
+      ctx.stroke();
+    }
+    // means
+    ctx.globalAlpha = 1; ctx.fillStyle = color; ctx.strokeStyle = color; ctx.lineWidth = 1;
+    const radius = buckets.length > 400 ? 1.5 : 2.5;
+    for (const b of buckets) {
+      const v = level.rel_mean[b.index * nAlgo + a];
+      if (Number.isNaN(v)) continue;
+      ctx.beginPath(); ctx.arc(xOf((b.lo + b.hi) / 2), yOf(v), radius, 0, 2 * Math.PI); ctx.fill();
+    }
+  }
+  ctx.restore();
+
+  relativeGeometry = { g, level, buckets, xOf };
+  document.getElementById("view-info").textContent =
+    `instances ${state.lo}-${state.hi - 1} of ${nInst}, level ${B} (${level.size} instance${level.size > 1 ? "s" : ""} per point), ` +
+    `${algos.length} algorithms`;
+}
+
+function bucketAt(x) {
+  if (!relativeGeometry) return null;
+  const { g, level } = relativeGeometry;
+  if (x < g.left || x > g.right) return null;
+  const i = state.lo + (x - g.left) / (g.right - g.left) * (state.hi - state.lo);
+  const b = Math.floor(i / level.size);
+  if (b < 0 || b * level.size >= nInst) return null;
+  return { index: b, lo: b * level.size, hi: Math.min(nInst, (b + 1) * level.size), level };
+}
+
+// ---------- runtime development ----------
+
+function drawRuntime() {
+  const canvas = document.getElementById("runtime");
+  const g = setupCanvas(canvas);
+  const level = chooseLevel(g.right - g.left);
+  const buckets = visibleBuckets(level);
+  const algos = selectedAlgorithms();
+
+  let xMin = Infinity, xMax = -Infinity, yMin = Infinity, yMax = -Infinity;
+  for (const b of buckets) {
+    const n = level.nodes[b.index];
+    if (!(n > 0)) continue;
+    xMin = Math.min(xMin, Math.log10(n)); xMax = Math.max(xMax, Math.log10(n));
+    for (const a of algos) {
+      const t = level.time[b.index * nAlgo + a] / 1000;
+      if (t > 0) { yMin = Math.min(yMin, Math.log10(t)); yMax = Math.max(yMax, Math.log10(t)); }
+    }
+  }
+  if (!Number.isFinite(xMin) || !Number.isFinite(yMin)) { drawAxes(g, [], "runtime (ms)", [], "nodes"); return; }
+  if (xMax - xMin < 0.1) { xMin -= 0.05; xMax += 0.05; }
+  if (yMax - yMin < 0.1) { yMin -= 0.05; yMax += 0.05; }
+  const xOf = v => g.left + (v - xMin) / (xMax - xMin) * (g.right - g.left);
+  const yOf = v => g.bottom - (v - yMin) / (yMax - yMin) * (g.bottom - g.top);
+  const powers = (lo, hi) => niceTicks(lo, hi, 6).map(t => [t, Math.pow(10, t)]);
+  drawAxes(g, powers(yMin, yMax).map(([t, v]) => [yOf(t), v < 10 ? v.toPrecision(2) : v.toFixed(0)]), "runtime (ms, log)",
+           powers(xMin, xMax).map(([t, v]) => [xOf(t), v.toFixed(0)]), "nodes (log)");
+
+  const ctx = g.ctx;
+  for (const a of algos) {
+    ctx.strokeStyle = DATA.colors[a]; ctx.lineWidth = 1.5; ctx.beginPath();
+    let started = false;
+    for (const b of buckets) {
+      const n = level.nodes[b.index], t = level.time[b.index * nAlgo + a] / 1000;
+      if (!(n > 0) || !(t > 0)) continue;
+      const x = xOf(Math.log10(n)), y = yOf(Math.log10(t));
+      if (started) ctx.lineTo(x, y); else { ctx.moveTo(x, y); started = true; }
+    }
+    ctx.stroke();
+  }
+}
+
+// ---------- exit points ----------
+
+function drawExits() {
+  const canvas = document.getElementById("exits");
+  const algos = selectedAlgorithms();
+  canvas.height = Math.max(80, 40 + 16 * algos.length) * (canvas.dataset.ratio || 1);
+  const g = setupCanvas(canvas);
+  const ctx = g.ctx;
+  const left = 130, right = g.width - 10;
+
+  algos.forEach((a, row) => {
+    const counts = new Float64Array(nExit);
+    for (let i = state.lo; i < state.hi; i++) {
+      const base = (i * nAlgo + a) * nExit;
+      for (let e = 0; e < nExit; e++) counts[e] += A.exit_counts[base + e];
+    }
+    const total = counts.reduce((s, c) => s + c, 0);
+    const y = 10 + 16 * row;
+    ctx.fillStyle = "#444"; ctx.textAlign = "right"; ctx.textBaseline = "middle";
+    ctx.fillText(DATA.algorithms[a], left - 6, y + 6);
+    let x = left;
+    for (let e = 0; e < nExit; e++) {
+      if (!total || !counts[e]) continue;
+      const w = counts[e] / total * (right - left);
+      ctx.fillStyle = EXIT_COLORS[e % EXIT_COLORS.length]; ctx.fillRect(x, y, w, 12);
+      x += w;
+    }
+  });
+
+  // legend
+  let x = left;
+  const y = 14 + 16 * algos.length;
+  ctx.textAlign = "left";
+  DATA.exits.forEach((name, e) => {
+    ctx.fillStyle = EXIT_COLORS[e % EXIT_COLORS.length]; ctx.fillRect(x, y, 10, 10);
+    ctx.fillStyle = "#444"; ctx.fillText(name, x + 14, y + 5);
+    x += 24 + ctx.measureText(name).width;
+  });
+}
+
+// ---------- instance detail ----------
+
+function showInstance(i) {
+  const rows = [];
+  for (let a = 0; a < nAlgo; a++) {
+    const k = i * nAlgo + a;
+    if (!A.count[k]) continue;
+    const exits = [];
+    for (let e = 0; e < nExit; e++) {
+      const c = A.exit_counts[k * nExit + e];
+      if (c) exits.push(`${DATA.exits[e]}: ${c}`);
+    }
+    const relative = A.best[i] > 0 ? A.mean_sep[k] / A.best[i] : NaN;
+    rows.push(`<tr><td><span class="swatch" style="background:${DATA.colors[a]}"></span>${esc(DATA.algorithms[a])}</td>` +
+      `<td>${A.count[k]}</td><td>${fmt(A.mean_sep[k], 1)}</td><td>${fmt(A.min_sep[k], 0)}</td><td>${fmt(A.max_sep[k], 0)}</td>` +
+      `<td>${fmt(relative, 3)}</td><td>${fmt(A.time[k] / 1000, 3)}</td><td>${fmt(A.balance[k], 3)}</td><td>${exits.join(", ")}</td></tr>`);
+  }
+  document.getElementById("detail").className = "";
+  document.getElementById("detail").innerHTML =
+    `<b>${esc(DATA.instances[i])}</b> (#${i}): ${A.nodes[i]} nodes, ${A.edges[i]} edges, smallest separator ${fmt(A.best[i], 0)}` +
+    `<table><tr><th>algorithm</th><th>runs</th><th>mean sep</th><th>min</th><th>max</th><th>relative</th>` +
+    `<th>time (ms)</th><th>balance</th><th>exit points</th></tr>${rows.join("")}</table>`;
+}
+
+// ---------- interaction ----------
+
+function redraw() {
+  drawRelative();
+  drawRuntime();
+  drawExits();
+}
+
+function setRange(lo, hi) {
+  const span = Math.max(1, Math.min(nInst, Math.round(hi - lo)));
+  lo = Math.round(Math.max(0, Math.min(nInst - span, lo)));
+  state.lo = lo; state.hi = lo + span;
+  redraw();
+}
+
+function installInteraction() {
+  const canvas = document.getElementById("relative");
+  const tooltip = document.getElementById("tooltip");
+  const offset = e => e.clientX - canvas.getBoundingClientRect().left;
+
+  canvas.addEventListener("wheel", e => {
+    e.preventDefault();
+    const { g } = relativeGeometry;
+    const fraction = Math.min(1, Math.max(0, (offset(e) - g.left) / (g.right - g.left)));
+    const span = state.hi - state.lo, center = state.lo + fraction * span;
+    const newSpan = Math.max(1, Math.min(nInst, span * (e.deltaY > 0 ? 1.25 : 0.8)));
+    setRange(center - fraction * newSpan, center - fraction * newSpan + newSpan);
+  }, { passive: false });
+
+  canvas.addEventListener("mousedown", e => { state.drag = { x: offset(e), lo: state.lo, hi: state.hi, moved: false }; });
+  window.addEventListener("mouseup", e => {
+    if (state.drag && !state.drag.moved && e.target === canvas) {
+      const bucket = bucketAt(offset(e));
+      if (bucket) {
+        if (bucket.hi - bucket.lo === 1) showInstance(bucket.lo);
+        else setRange(bucket.lo, bucket.hi);
+      }
+    }
+    state.drag = null;
+  });
+  window.addEventListener("mousemove", e => {
+    if (state.drag) {
+      const { g } = relativeGeometry;
+      const dx = offset(e) - state.drag.x;
+      if (Math.abs(dx) > 3) state.drag.moved = true;
+      if (state.drag.moved) {
+        const shift = -dx / (g.right - g.left) * (state.drag.hi - state.drag.lo);
+        setRange(state.drag.lo + shift, state.drag.hi + shift);
+      }
+    }
+    if (e.target !== canvas) { tooltip.style.display = "none"; return; }
+    const bucket = bucketAt(offset(e));
+    if (!bucket) { tooltip.style.display = "none"; return; }
+    const lines = selectedAlgorithms()
+      .map(a => [a, bucket.level.rel_mean[bucket.index * nAlgo + a]])
+      .filter(([, v]) => !Number.isNaN(v))
+      .sort((x, y) => x[1] - y[1]).slice(0, 12)
+      .map(([a, v]) => `<span class="swatch" style="background:${DATA.colors[a]}"></span>${esc(DATA.algorithms[a])}: ${v.toFixed(3)}`);
+    const name = bucket.hi - bucket.lo === 1 ? DATA.instances[bucket.lo]
+      : `${bucket.hi - bucket.lo} instances: ${DATA.instances[bucket.lo]} ... ${DATA.instances[bucket.hi - 1]}`;
+    tooltip.innerHTML = `<b>${esc(name)}</b><br>${lines.join("<br>")}`;
+    tooltip.style.display = "block";
+    tooltip.style.left = (e.clientX + 14) + "px";
+    tooltip.style.top = (e.clientY + 14) + "px";
+  });
+  canvas.addEventListener("mouseleave", () => { tooltip.style.display = "none"; });
+  canvas.addEventListener("dblclick", () => setRange(0, nInst));
+  window.addEventListener("resize", redraw);
+
+  const search = document.getElementById("search");
+  search.addEventListener("change", () => {
+    const i = DATA.instances.indexOf(search.value);
+    if (i < 0) return;
+    const span = Math.min(nInst, Math.max(50, state.hi - state.lo));
+    setRange(i - span / 2, i + span / 2);
+    showInstance(i);
+  });
+}
+
+function buildSidebar() {
+  const list = document.getElementById("algorithms");
+  const boxes = DATA.algorithms.map((name, a) => {
+    const label = document.createElement("label");
+    const box = document.createElement("input");
+    box.type = "checkbox"; box.checked = state.selected.has(a);
+    box.addEventListener("change", () => { if (box.checked) state.selected.add(a); else state.selected.delete(a); redraw(); });
+    label.appendChild(box);
+    label.insertAdjacentHTML("beforeend", `<span class="swatch" style="background:${DATA.colors[a]}"></span>${esc(name)}`);
+    list.appendChild(label);
+    return box;
+  });
+  const select = predicate => {
+    state.selected = new Set(DATA.algorithms.map((_, a) => a).filter(predicate));
+    boxes.forEach((box, a) => { box.checked = state.selected.has(a); });
+    redraw();
+  };
+  document.getElementById("select-core").onclick = () => select(a => DATA.core.includes(DATA.algorithms[a]));
+  document.getElementById("select-all").onclick = () => select(() => true);
+  document.getElementById("select-none").onclick = () => select(() => false);
+
+  const names = document.getElementById("instance-names");
+  names.innerHTML = DATA.instances.slice(0, 20000).map(name => `<option value="${esc(name)}">`).join("");
+}
+
+async function init() {
+  const types = { nodes: Uint32Array, edges: Uint32Array, count: Uint32Array, exit_counts: Uint32Array };
+  for (const [key, value] of Object.entries(DATA.arrays)) A[key] = await decode(value, types[key] || Float32Array);
+  for (const level of DATA.levels) {
+    const decoded = { size: level.size };
+    for (const [key, value] of Object.entries(level.arrays)) decoded[key] = await decode(value, Float32Array);
+    LEVELS.push(decoded);
+  }
+  const core = DATA.algorithms.map((_, a) => a).filter(a => DATA.core.includes(DATA.algorithms[a]));
+  state.selected = new Set(core.length ? core : DATA.algorithms.map((_, a) => a));
+  state.lo = 0; state.hi = nInst;
+  buildSidebar();
+  installInteraction();
+  redraw();
+}
+
+init();
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Static HTML report of the results.')
+    add_arguments(parser)
+    run(parser.parse_args())
@@ -0,0 +1,298 @@
+"""
+Predicts good start nodes (BFS roots) for the separators, so that near-best separators can be found without sweeping
+over all start nodes.
+
+For every instance, a few cheap features are computed per node and cached in a directory next to the property file
+(keyed by the hash of the instance file, like the embedding cache):
+    * eccentricity: estimated from a few BFS sweeps (the maximum distance to the sweep roots, a lower bound)
+    * degree
+    * level width: the mean width of the BFS level that contains the node, over all sweeps
+A least squares model is fitted per algorithm on the results of past sweeps (experiments with attempts <= 0, where the
+i-th result of an algorithm on an instance belongs to start node i). It predicts the separator size relative to the
+mean separator size of the instance from the features, standardized per instance.
+
+The predicted top-k start nodes of every instance are exported to a roots file, one line per algorithm and instance
+(separated by tabs, as instance names may contain spaces):
+    <algorithm>\t<instance>\t<node> <node> ...
+which is read by the experiment (-R, see main.cpp) and by reference_separators.py (--roots): the attempts then use the
+predicted start nodes, best first, instead of random ones.
+"""
+
+import argparse
+import json
+import os
+import numpy as np
+
+from deduplicate import file_hash
+from graphs import read_graph, list_instances, extract_full_file_name, bfs
+
+FEATURES = ["eccentricity", "degree", "level_width"]
+
+# terms of the model, as products of the standardized features (the empty product is the intercept)
+TERMS = [(), (0,), (1,), (2,), (0, 0), (2, 2), (0, 2)]
+
+
+def node_features(graph, sweeps=4, seed=0):
+    """
+    Computes the features of all nodes. The first sweep starts at a random node, every further sweep at the node that
+    is farthest away from all previous sweep roots (in sum).
+
+    :param graph: the CSRGraph
+    :param sweeps: number of BFS sweeps
+    :param seed: random seed for the first sweep root
+    :return: array of shape (n, len(FEATURES))
+    """
+    n = graph.n
+    eccentricity = np.zeros(n)
+    width = np.zeros(n)
+    reached = np.zeros(n)
+    total = np.zeros(n)
+
+    root = np.random.default_rng(seed).integers(n) if n > 0 else 0
+    for _ in range(sweeps if n > 0 else 0):
+        level, _ = bfs(graph, root)
+        mask = level >= 0
+        eccentricity[mask] = np.maximum(eccentricity[mask], level[mask])
+        width[mask] += np.bincount(level[mask])[level[mask]]
+        reached += mask
+        total[mask] += level[mask]
+        root = np.argmax(total)
+
+    width = np.divide(width, reached, out=np.zeros(n), where=reached > 0)
+    return np.column_stack([eccentricity, graph.degrees(), width])
+
+
+def load_features(path, cache="../instances/.root_index", sweeps=4):
+    """
+    Returns the features of all nodes of an instance, from the cache if possible.
+
+    :param path: path to the instance
+    :param cache: cache directory, no cache is used if empty
+    :param sweeps: number of BFS sweeps
+    :return: array of shape (n, len(FEATURES))
+    """
+    if not cache:
+        return node_features(read_graph(path), sweeps)
+
+    file = os.path.join(cache, f"{file_hash(path)}-{sweeps}.npy")
+    if os.path.exists(file):
+        return np.load(file)
+
+    features = node_features(read_graph(path), sweeps)
+    os.makedirs(cache, exist_ok=True)
+    tmp = f"{file}.{os.getpid()}.tmp.npy"
+    np.save(tmp, features)
+    os.replace(tmp, file)
+    return features
+
+
+def design(features, terms=TERMS):
+    """
+    Standardizes the features of an instance and evaluates the terms of the model.
+
+    :param features: array of shape (n, len(FEATURES))
+    :param terms: the terms, as tuples of feature indices
+    :return: array of shape (n, len(terms))
+    """
+    std = features.std(axis=0)
+    z = np.divide(features - features.mean(axis=0), std, out=np.zeros_like(features), where=std > 0)
+    return np.column_stack([np.prod(z[:, list(term)], axis=1) if term else np.ones(len(z)) for term in terms])
+
+
+def sweep_results(df):
+    """
+    Extracts the per-node results of sweeps from experiment results: groups of an algorithm and an instance with one
+    result per node, in node order.
+
+    :param df: dataframe with the results
+    :return: dictionary mapping (algorithm, instance) to the array of separator sizes per start node
+    """
+    sweeps = dict()
+    for (algo, instance), group in df.groupby(['algorithm', 'instance'], sort=False, observed=True):
+        if len(group) == group['nodes'].iloc[0]:
+            sweeps[(algo, instance)] = group['sep_size'].to_numpy(dtype=np.float64)
+    return sweeps
+
+
+def _samples(sweeps, features, max_nodes, seed=0):
+    """
+    :return: dictionary mapping algorithm to a list of (instance, design matrix, relative separator sizes)
+    """
+    rng = np.random.default_rng(seed)
+    samples = dict()
+    for (algo, instance), sizes in sweeps.items():
+        if instance not in features or len(features[instance]) != len(sizes) or sizes.mean() <= 0:
+            continue
+        nodes = np.arange(len(sizes))
+        if len(nodes) > max_nodes:
+            nodes = np.sort(rng.choice(nodes, max_nodes, replace=False))
+        samples.setdefault(algo, []).append((instance, design(features[instance])[nodes], sizes[nodes] / sizes.mean()))
+    return samples
+
+
+def _least_squares(samples):
+    """
+    :return: the coefficients of the model fitted to a list of (instance, design matrix, relative sizes)
+    """
+    X = np.concatenate([x for _, x, _ in samples])
+    y = np.concatenate([y for _, _, y in samples])
+    return np.linalg.lstsq(X, y, rcond=None)[0]
+
+
+def evaluate(samples, coefficients, k, draws=200, seed=0):
+    """
+    Compares the best separator among the top-k predicted start nodes with the best among k random start nodes.
+
+    :param samples: list of (instance, design matrix, relative sizes)
+    :param coefficients: coefficients of the model
+    :param k: number of start nodes
+    :param draws: number of random draws for the baseline
+    :return: pair (model, random) of ratios best-of-k / best-of-all, geometric means over all instances (a few
+             instances with a tiny best separator would dominate the arithmetic mean)
+    """
+    rng = np.random.default_rng(seed)
+    model, random = [], []
+    for _, x, y in samples:
+        best = y.min()
+        if best <= 0:  # the instance can be separated without any separator nodes
+            continue
+        top = np.argsort(x @ coefficients, kind='stable')[:k]
+        model.append(y[top].min() / best)
+        random.append(np.mean([y[rng.choice(len(y), min(k, len(y)), replace=False)].min() for _ in range(draws)]) / best)
+    return float(np.exp(np.mean(np.log(model)))), float(np.exp(np.mean(np.log(random))))
+
+
+def fit(result_files, instance_dir, target, cache="../instances/.root_index", sweeps=4, max_nodes=5000, k=10):
+    """
+    Fits one model per algorithm (and one pooled model, "*") to the sweeps in the results. Before fitting on all
+    instances, every model is validated on a quarter of the instances that it was not fitted on.
+
+    :param result_files: list of result files (csv or .psr) that contain sweeps
+    :param instance_dir: path to directory with instances
+    :param target: path to the resulting model (json)
+    :param cache: feature cache directory
+    :param sweeps: number of BFS sweeps of the features
+    :param max_nodes: maximum number of start nodes per instance that are used for fitting
+    :param k: number of start nodes for the validation
+    :return: the model
+    """
+    from utils import read_results
+    sweep_sizes = sweep_results(read_results(result_files))
+
+    names = {instance for _, instance in sweep_sizes}
+    features = {extract_full_file_name(path): load_features(path, cache, sweeps)
+                for path in list_instances(instance_dir) if extract_full_file_name(path) in names}
+
+    samples = _samples(sweep_sizes, features, max_nodes)
+    samples["*"] = [sample for algo in list(samples) for sample in samples[algo]]
+
+    model = {"features": FEATURES, "terms": [list(term) for term in TERMS], "sweeps": sweeps, "models": dict()}
+    print(f"{'algorithm':<16}{'instances':>10}{f'top-{k}':>10}{f'random-{k}':>12}")
+    for algo, algo_samples in samples.items():
+        if len(algo_samples) == 0:
+            continue
+        instances = sorted({instance for instance, _, _ in algo_samples})
+        test = set(instances[::4]) if len(instances) >= 4 else set()
+        train = [sample for sample in algo_samples if sample[0] not in test]
+        if test:
+            held_out = [sample for sample in algo_samples if sample[0] in test]
+            ratios = evaluate(held_out, _least_squares(train), k)
+            print(f"{algo:<16}{len(instances):>10}{ratios[0]:>10.3f}{ratios[1]:>12.3f}")
+        model["models"][algo] = _least_squares(algo_samples).tolist()
+
+    with open(target, 'w') as file:
+        json.dump(model, file, indent=2)
+    return model
+
+
+def predict(model, algorithm, features):
+    """
+    :param model: the model as returned by fit
+    :param algorithm: the name of the algorithm, the pooled model is used if there is no model for it
+    :param features: the features of an instance
+    :return: the predicted relative separator size of every start node
+    """
+    coefficients = model["models"].get(algorithm, model["models"]["*"])
+    return design(features, [tuple(term) for term in model["terms"]]) @ np.asarray(coefficients)
+
+
+def top_roots(model, algorithm, features, k):
+    """
+    :return: array of the k start nodes with the smallest predicted separators, best first
+    """
+    return np.argsort(predict(model, algorithm, features), kind='stable')[:k]
+
+
+def export(model_file, instance_dir, algorithms, k, target, cache="../instances/.root_index"):
+    """
+    Writes the predicted top-k start nodes of all instances for all algorithms to a roots file.
+
+    :param model_file: path to the model (json)
+    :param instance_dir: path to directory with instances
+    :param algorithms: list of algorithm names
+    :param k: number of start nodes per instance
+    :param target: path to the resulting roots file
+    :param cache: feature cache directory
+    """
+    with open(model_file) as file:
+        model = json.load(file)
+
+    with open(target, 'w') as file:
+        for path in list_instances(instance_dir):
+            features = load_features(path, cache, model["sweeps"])
+            for algo in algorithms:
+                roots = top_roots(model, algo, features, k)
+                file.write(f"{algo}\t{extract_full_file_name(path)}\t{' '.join(str(root) for root in roots)}\n")
+
+
+def read_roots(file):
+    """
+    Reads a roots file.
+
+    :param file: path to the roots file
+    :return: dictionary mapping instance name to a dictionary mapping algorithm to the list of start nodes
+    """
+    roots = dict()
+    with open(file) as lines:
+        for line in lines:
+            columns = line.rstrip("\n").split("\t")
+            if len(columns) == 3:
+                roots.setdefault(columns[1], dict())[columns[0]] = [int(root) for root in columns[2].split()]
+    return roots
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Predicts good start nodes for the separators.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = commands.add_parser('index', help='Computes the node features of all instances')
+    index_parser.add_argument('--instances', type=str, default="../instances/", help='Path to directory with instances')
+    index_parser.add_argument('--sweeps', type=int, default=4, help='Number of BFS sweeps')
+
+    fit_parser = commands.add_parser('fit', help='Fits the model to the results of sweeps')
+    fit_parser.add_argument('--results', type=str, nargs='+', required=True, help='Result files with sweeps')
+    fit_parser.add_argument('--instances', type=str, default="../instances/", help='Path to directory with instances')
+    fit_parser.add_argument('--model', type=str, default="../instances/root_model.json", help='Path to the model')
+    fit_parser.add_argument('--sweeps', type=int, default=4, help='Number of BFS sweeps')
+    fit_parser.add_argument('--k', type=int, default=10, help='Number of start nodes for the validation')
+
+    export_parser = commands.add_parser('export', help='Writes the predicted start nodes to a roots file')
+    export_parser.add_argument('--model', type=str, default="../instances/root_model.json", help='Path to the model')
+    export_parser.add_argument('--instances', type=str, default="../instances/", help='Path to directory with instances')
+    export_parser.add_argument('--algorithms', type=str, default="LT,LTFC,Dual,DualFC,HPN,RefLevel,RefCycle",
+                               help='Comma-separated algorithms')
+    export_parser.add_argument('--k', type=int, default=20, help='Number of start nodes per instance')
+    export_parser.add_argument('--target', type=str, default="../instances/roots.txt", help='Path to the roots file')
+
+    for sub in [index_parser, fit_parser, export_parser]:
+        sub.add_argument('--cache', type=str, default="../instances/.root_index", help='Feature cache directory')
+
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        for instance in list_instances(args.instances):
+            load_features(instance, args.cache, args.sweeps)
+    elif args.command == 'fit':
+        fit(args.results, args.instances, args.model, args.cache, args.sweeps, k=args.k)
+    else:
+        export(args.model, args.instances, args.algorithms.split(","), args.k, args.target, args.cache)
@@ -1,8 +1,10 @@
 """
 This script just aggregates the results of a run, so that I can look at absolute result values.
 """
-import pandas as pd
 import argparse
+from utils import lazy_import, read_results
+
+pd = lazy_import("pandas")
 
 
 def main(source, target):
@@ -14,7 +16,7 @@ def main(source, target):
     """
 
     # read csv file
-    df = pd.read_csv(source, sep=r'\s*,\s*', encoding='utf-8', engine='python')
+    df = read_results(source)
 
     instances = df['instance'].unique()
     algorithms = df['algorithm'].unique()
@@ -41,10 +43,26 @@ def main(source, target):
     res_df.to_csv(target)
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
+def add_arguments(parser):
+    """
+    Adds the command line arguments to a parser (shared with cli.py).
+
+    :param parser: the argument parser
+    """
     parser.add_argument('--source', type=str, help='Path to data file')
     parser.add_argument('--target', type=str, help='Path to data file')
-    args = parser.parse_args()
 
+
+def run(args):
+    """
+    Runs the script with the parsed command line arguments.
+
+    :param args: the parsed arguments
+    """
     main(args.source, args.target)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Data analysis and plotting.')
+    add_arguments(parser)
+    run(parser.parse_args())
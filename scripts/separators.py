@@ -0,0 +1,213 @@
+"""
+Uniform access to all separators and their recursive application to a graph.
+Separators are identified by the same names as in the result files:
+    * reference separators from reference_separators.py (RefLevel, RefCycle)
+    * OGDF separators with an optional chain of postprocessors (e.g. HPN or Dual_NE_DMD), these are called through
+      the separate binary (see src/separate.cpp)
+    * any Python function, given as module:function, that takes a CSRGraph and returns (separator, first, second)
+"""
+
+import importlib
+import os
+import subprocess
+import tempfile
+from collections import namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+
+from graphs import induced_subgraph, connected_components, write_chaco
+import reference_separators
+
+# default location of the separate binary, relative to the scripts directory
+DEFAULT_BINARY = "../cmake-build-release/separate"
+
+# maps core algorithm name (see utils.cmap) to the name understood by the -A option of the binaries
+ogdf_names = {"LT": "LipTar",
+              "LTFC": "LTFC",
+              "Dual": "Dual",
+              "DualFC": "DFC",
+              "HPN": "HP"}
+
+
+class Separator:
+    """
+    A callable separator that maps a CSRGraph to a separation (separator, first, second) of node arrays.
+    Instances can be pickled, so they can be sent to worker processes.
+    """
+
+    def __init__(self, name, binary=DEFAULT_BINARY, seed=42):
+        """
+        Constructor.
+
+        :param name: the name of the separator, e.g. "RefLevel", "Dual_NE_DMD" or "my_module:my_separator"
+        :param binary: path to the separate binary (only needed for OGDF separators)
+        :param seed: random seed, used to choose start nodes
+        """
+        self.name = name
+        self.binary = binary
+        self.seed = seed
+
+    def is_ogdf(self):
+        return self.name.split("_")[0] in ogdf_names
+
+    def __call__(self, graph):
+        if ":" in self.name:
+            module, function = self.name.split(":")
+            return getattr(importlib.import_module(module), function)(graph)[:3]
+
+        if self.name in reference_separators.separators:
+            root = np.random.default_rng(self.seed).integers(graph.n)
+            return reference_separators.separators[self.name](graph, root)[:3]
+
+        if self.is_ogdf():
+            return self._call_ogdf(graph)
+
+        raise ValueError(f"Unknown separator {self.name}")
+
+    def _call_ogdf(self, graph):
+        core, *postprocessors = self.name.split("_")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "piece.chaco")
+            write_chaco(graph, path)
+            command = [self.binary, "-i", path, "-A", ogdf_names[core], "-s", str(self.seed)]
+            if postprocessors:
+                command += ["-P", ",".join(postprocessors)]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+
+        lines = output.split("\n")
+        return tuple(np.array(line.split(), dtype=np.int64) for line in lines[:3])
+
+
+# one node of the separator tree, children are indices into the list of pieces
+Piece = namedtuple('Piece', ['nodes', 'separator', 'children', 'parent', 'depth'])
+
+# state of the worker processes
+_graph = None
+_separator = None
+
+
+def _init_worker(graph, separator):
+    global _graph, _separator
+    _graph = graph
+    _separator = separator
+
+
+def _split(nodes):
+    """
+    Separates the subgraph induced by nodes. Disconnected subgraphs are split along their components instead of
+    calling the separator, with the largest components distributed first.
+
+    :param nodes: array of nodes of the piece
+    :return: tuple (separator, first, second) of arrays of original node indices
+    """
+    sub = induced_subgraph(_graph, nodes)
+    comp = connected_components(sub)
+
+    if sub.n > 0 and comp.max() > 0:
+        sizes = np.bincount(comp)
+        in_first = np.zeros(len(sizes), dtype=bool)
+        first_size = second_size = 0
+        for c in np.argsort(-sizes):
+            if first_size <= second_size:
+                in_first[c] = True
+                first_size += sizes[c]
+            else:
+                second_size += sizes[c]
+        return np.zeros(0, dtype=np.int64), nodes[in_first[comp]], nodes[~in_first[comp]]
+
+    separator, first, second = _separator(sub)
+    return nodes[separator], nodes[first], nodes[second]
+
+
+class _InlineExecutor:
+    """
+    Stand-in for a process pool that runs every task immediately (used for processes == 1).
+    """
+
+    def __init__(self, graph, separator):
+        _init_worker(graph, separator)
+
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+    def shutdown(self):
+        pass
+
+
+def decompose(graph, separator, leaf_size, processes=None, boundary=False, max_boundary=None):
+    """
+    Recursively applies a separator until all pieces contain at most leaf_size nodes (and at most max_boundary
+    boundary nodes, if given).
+    Independent pieces are separated concurrently in a process pool.
+
+    :param graph: the CSRGraph
+    :param separator: callable mapping a CSRGraph to (separator, first, second), e.g. a Separator
+    :param leaf_size: pieces with at most this many nodes are not separated any further
+    :param processes: number of worker processes (default: number of cores, 1 = no pool)
+    :param boundary: if True, separator nodes are added to both children (as needed for r-divisions), otherwise they
+                     are removed (as needed for nested dissection)
+    :param max_boundary: if given (together with boundary), pieces with more boundary nodes, i.e. nodes of the
+                         separators of their ancestors, are separated further, regardless of their size
+    :return: list of pieces, the first one is the root
+    """
+    if processes == 1:
+        executor = _InlineExecutor(graph, separator)
+    else:
+        executor = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(graph, separator))
+
+    empty = np.zeros(0, dtype=np.int64)
+    pieces = [Piece(np.arange(graph.n), empty, [], -1, 0)]
+    on_separator = np.zeros(graph.n, dtype=bool)  # nodes that are on the separator of any piece so far
+
+    limit_boundary = boundary and max_boundary is not None
+
+    def boundary_size(nodes):
+        return np.count_nonzero(on_separator[nodes])
+
+    def too_large(nodes):
+        return len(nodes) > leaf_size or (limit_boundary and boundary_size(nodes) > max_boundary)
+
+    pending = dict()
+    if too_large(pieces[0].nodes):
+        pending[executor.submit(_split, pieces[0].nodes)] = 0
+
+    try:
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = pending.pop(future)
+                piece = pieces[idx]
+                sep, first, second = future.result()
+
+                parts = [np.concatenate([part, sep]) if boundary else part for part in (first, second) if len(part) > 0]
+                if any(len(part) >= len(piece.nodes) for part in parts):  # no progress, keep it as a leaf
+                    continue
+
+                # pieces that are only separated for their boundary have to pass fewer boundary nodes to each half
+                # (the boundary of a half grows by the separator)
+                if limit_boundary and len(piece.nodes) <= leaf_size and \
+                        any(boundary_size(part) + len(sep) >= boundary_size(piece.nodes)
+                            for part in (first, second) if len(part) > 0):
+                    continue
+
+                on_separator[sep] = True
+                children = []
+                for part in parts:
+                    children.append(len(pieces))
+                    pieces.append(Piece(np.sort(part), empty, [], idx, piece.depth + 1))
+                    if too_large(part):
+                        pending[executor.submit(_split, pieces[-1].nodes)] = children[-1]
+                pieces[idx] = piece._replace(separator=np.sort(sep), children=children)
+    finally:
+        executor.shutdown()
+
+    return pieces
+
+
+def leaves(pieces):
+    """
+    :return: indices of all pieces without children
+    """
+    return [idx for idx, piece in enumerate(pieces) if not piece.children]
@@ -0,0 +1,61 @@
+"""
+Checks that the reference separators return valid separations with at most 2/3 of the nodes on either side.
+Run with pytest from the scripts directory.
+"""
+
+import os
+import numpy as np
+import pytest
+
+from graphs import from_edges, embed_by_coordinates, read_embedded_graph
+from reference_separators import cycle_separator, level_separator
+
+INSTANCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "instances")
+
+
+def triangulated_grid(size):
+    """
+    :return: the embedded size x size grid with one diagonal per square
+    """
+    rows, cols = np.divmod(np.arange(size * size), size)
+    right = cols + 1 < size
+    down = rows + 1 < size
+    nodes = np.arange(size * size)
+    sources = np.concatenate([nodes[right], nodes[down], nodes[right & down]])
+    targets = np.concatenate([nodes[right] + 1, nodes[down] + size, nodes[right & down] + size + 1])
+    graph = from_edges(size * size, sources, targets)
+    return embed_by_coordinates(graph, np.stack([cols, rows], axis=1).astype(np.float64))
+
+
+def assert_balanced(graph, result):
+    separator, first, second, _ = result
+    assert np.array_equal(np.sort(np.concatenate([separator, first, second])), np.arange(graph.n))
+
+    side = np.zeros(graph.n, dtype=np.int64)
+    side[first] = 1
+    side[second] = 2
+    assert not np.any((side[graph.sources()] == 1) & (side[graph.indices] == 2))
+    assert max(len(first), len(second)) <= 2.0 / 3.0 * graph.n
+
+
+@pytest.mark.parametrize("root", [0, 760, 1520])
+def test_cycle_separator_grid(root):
+    graph = triangulated_grid(39)
+    result = cycle_separator(graph, root)
+    assert result[3] == "cycle"
+    assert_balanced(graph, result)
+
+
+@pytest.mark.parametrize("root", [0, 500, 999])
+def test_cycle_separator_delaunay(root):
+    graph = read_embedded_graph(os.path.join(INSTANCES, "delaunay_small", "delaunay_1000.gml"), cache=None)
+    assert graph.embedded
+    result = cycle_separator(graph, root)
+    assert result[3] == "cycle"
+    assert_balanced(graph, result)
+
+
+@pytest.mark.parametrize("separator", [cycle_separator, level_separator])
+def test_unembedded_grid(separator):
+    graph = read_embedded_graph(os.path.join(INSTANCES, "table", "grid", "grid_100.gml"), cache=None)
+    assert_balanced(graph, separator(graph, 0))
@@ -2,45 +2,184 @@
 Utility functions to analyze data.
 """
 
-import numpy as np
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib.colors import rgb_to_hsv, hsv_to_rgb, to_hex, to_rgb
+import colorsys
+import hashlib
+import importlib
+import inspect
+import json
 import os
+from itertools import permutations
 from zlib import crc32
 
+from profiling import traced
+
+
+class _LazyModule:
+    """
+    Stand-in for a module that is imported when one of its attributes is used for the first time.
+    """
+
+    def __init__(self, name, setup=None):
+        """
+        Constructor.
+
+        :param name: the name of the module
+        :param setup: function that is called with the module after importing it, or None
+        """
+        self._name = name
+        self._setup = setup
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            module = importlib.import_module(self._name)
+            if self._setup is not None:
+                self._setup(module)
+            self._module = module
+        return getattr(self._module, attribute)
+
+
+def lazy_import(name, setup=None):
+    """
+    Imports a module on first use. The plotting stack and pandas take most of the start-up time of the scripts, so
+    they are only loaded by the scripts (and subcommands of cli.py) that actually use them.
+
+    :param name: the name of the module
+    :param setup: function that is called with the module after importing it, or None
+    :return: the stand-in for the module
+    """
+    return _LazyModule(name, setup)
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
 # setting font properties
 font = {'size': 12}
 
-plt.rc('font', **font)
+plt = lazy_import("matplotlib.pyplot", setup=lambda module: module.rc('font', **font))
+sns = lazy_import("seaborn")
 
 # mapping core algorithm name to color
 cmap = {"LT": "#092cbe",
         "LTFC": "#be0986",
         "Dual": "#be9b09",
         "DualFC": "#09be40",
-        "HPN": "#df150e"}
+        "HPN": "#df150e",
+        "RefLevel": "#6b6b6b",
+        "RefCycle": "#21a6b8"}
 
 # maps core algorithm name to scatterplot marker
 mmap = {"LT": "o",
         "LTFC": "^",
         "Dual": "x",
         "DualFC": "s",
-        "HPN": "*"}
+        "HPN": "*",
+        "RefLevel": "D",
+        "RefCycle": "v"}
+
+# pure NumPy baselines from reference_separators.py, they are never postprocessed
+reference_algorithms = ["RefLevel", "RefCycle"]
 
 # generating all necessary combinations
-core_algorithms = list(mmap.keys())
-_postprocessors = ["", "_NE", "_DMD"]
+core_algorithms = [alg for alg in mmap.keys() if alg not in reference_algorithms]
+_postprocessors = ["", "_NE", "_DMD", "_FM"]
 
 simple_postprocessors = [alg + pp for alg in core_algorithms for pp in _postprocessors]
 
-_complex_all = [alg + pp for alg in simple_postprocessors for pp in _postprocessors if pp == "" or pp not in alg]
-all_algs_and_post = [_complex_all[i] for i in sorted(np.unique(_complex_all, return_index=True)[1])]
+# every chain of distinct postprocessors, in the order in which they were applied
+all_algs_and_post = [alg + "".join(chain) for alg in core_algorithms
+                     for length in range(len(_postprocessors))
+                     for chain in permutations(_postprocessors[1:], length)]
 
 dmd_ne = [alg+"_DMD_NE" for alg in core_algorithms]
 
 
+# layout of the binary result records, see result.h
+RESULT_MAGIC = b"PSRES01\n"
+RESULT_HEADER_SIZE = 16
+RESULT_FIELDS = [('instance', '<u4'), ('algorithm', '<u2'), ('exit', '<u2'), ('time', '<i8'),
+                 ('sep_size', '<i4'), ('short', '<i4'), ('long', '<i4')]
+
+
+def read_binary_results(path):
+    """
+    Reads a binary result file (.psr) and its dictionary (.psr.dict) as written by the experiment. The records are
+    memory-mapped, algorithm, instance and exit point become categorical columns.
+
+    :param path: path to the .psr-file
+    :return: dataframe with the same columns as a result-csv
+    """
+    result_record = np.dtype(RESULT_FIELDS)
+    with open(path, 'rb') as file:
+        header = file.read(RESULT_HEADER_SIZE)
+    if header[:8] != RESULT_MAGIC or int.from_bytes(header[8:12], 'little') != result_record.itemsize:
+        raise ValueError(f"{path} is not a binary result file")
+
+    dictionary = {'algorithm': dict(), 'exit': dict(), 'instance': dict()}
+    instance_data = dict()
+    with open(path + ".dict", 'r') as file:
+        for line in file:
+            kind, code, rest = line.rstrip("\n").split(" ", 2)
+            if kind == 'instance':
+                values = rest.split(" ", 6)
+                instance_data[int(code)] = [int(value) for value in values[:6]]
+                rest = values[6]
+            dictionary[kind][int(code)] = rest
+
+    size = os.path.getsize(path) - RESULT_HEADER_SIZE
+    count = size // result_record.itemsize
+    if count == 0:
+        records = np.zeros(0, dtype=result_record)
+    else:
+        records = np.memmap(path, dtype=result_record, mode='r', offset=RESULT_HEADER_SIZE, shape=(count,))
+
+    def categorical(kind):
+        codes = dictionary[kind]
+        categories = [codes[code] for code in range(len(codes))]
+        return pd.Categorical.from_codes(records[kind].astype(np.int64), categories=categories)
+
+    # per-instance columns are stored once per instance in the dictionary
+    table = np.array([instance_data[code] for code in range(len(instance_data))], dtype=np.int64).reshape(-1, 6)
+    per_instance = table[records['instance']]
+
+    short = records['short'].astype(np.float64)
+    long = records['long'].astype(np.float64)
+    sep_size = records['sep_size']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        balance = short / long
+        ratio = sep_size / short
+
+    return pd.DataFrame({'algorithm': categorical('algorithm'),
+                         'instance': categorical('instance'),
+                         'nodes': per_instance[:, 0],
+                         'edges': per_instance[:, 1],
+                         'diameter': per_instance[:, 2],
+                         'diam_lB': per_instance[:, 3],
+                         'diam_uB': per_instance[:, 4],
+                         'radius': per_instance[:, 5],
+                         'time': records['time'],
+                         'sep_size': sep_size,
+                         'balance': balance,
+                         'ratio': ratio,
+                         'exit': categorical('exit')})
+
+
+@traced
+def read_results(paths):
+    """
+    Reads one or more result files (e.g. OGDF results and reference results) into one dataframe.
+
+    :param paths: a path or a list of paths to csv-files or binary result files (.psr) generated by experiments
+    :return: the combined dataframe
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    frames = [read_binary_results(path) if path.endswith(".psr") else
+              pd.read_csv(path, sep=r'\s*,\s*', encoding='utf-8', engine='python') for path in paths]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
 def extract_short_instance_name(full_instance_name):
     """
     Extracts the short instance name from the full instance name with directory.
@@ -62,55 +201,55 @@ def extract_pure_algo_name(algo_name):
     return algo_name[0:algo_name.find("_")] if algo_name.find("_") != -1 else algo_name
 
 
-def brighten(hsv, factor):
-    """
-    Brightens a hsv-color by a certain amount of saturation.
+# saturation of a postprocessed result relative to the color of its core algorithm, by the chain of NE and DMD
+_chain_saturation = {(): 1.0,
+                     ("NE",): 0.8,
+                     ("DMD",): 0.6,
+                     ("DMD", "NE"): 0.4,
+                     ("NE", "DMD"): 0.2}
 
-    :param hsv: hue, saturation, value
-    :param factor: relative difference in saturation
-    :return: the new color
-    """
-    h, s, v = hsv
-    res = h, s * factor, v
-    res = hsv_to_rgb(res)
-    return to_hex(res)
+# brightness of a postprocessed result by the position of FM in its chain (None if FM was not applied)
+_fm_value = {None: 1.0,
+             "last": 0.7,
+             "middle": 0.55,
+             "first": 0.4}
 
 
-def get_color(algorithm):
+def color_of(algorithm):
     """
-    Gets the characteristic color for the core algorithms, random color otherwise.
+    Gets the characteristic color of an algorithm without matplotlib (so that report.py can use it as well): the color
+    of the core algorithm, with less saturation for chains of NE and DMD and less brightness if FM was applied, by the
+    position of FM in the chain, so that every chain of postprocessors gets its own shade. Core algorithms without a
+    color get one of 9 hues, derived from their name.
 
     :param algorithm: the name of the algorithm
-    :return: the characteristic color
+    :return: the color as hex string
     """
+    core = extract_pure_algo_name(algorithm)
+    if core in cmap:
+        h, s, v = colorsys.rgb_to_hsv(*(int(cmap[core][i:i + 2], 16) / 255.0 for i in (1, 3, 5)))
+    else:
+        h, s, v = int((crc32(core.encode("utf-8")) & 0xffffffff) / 2 ** 32 * 9) / 9.0, 1.0, 1.0
 
-    # overcomplicated default color mapping...
-    def bytes_to_float(b):
-        return float(crc32(b) & 0xffffffff) / 2**32
-
-    def str_to_float(s, encoding="utf-8"):
-        return bytes_to_float(s.encode(encoding))
-
-    default_map = plt.cm.get_cmap(plt.cm.hsv, 9)  # if we have more than 10 values, we need to change this
-
-    core_alg = algorithm[0:algorithm.find("_")] if algorithm.find("_") != -1 else algorithm
-    core_color = cmap[core_alg] if core_alg in cmap else default_map(str_to_float(core_alg))
-
-    hsv = rgb_to_hsv(to_rgb(core_color))
-
-    if "NE_DMD" in algorithm:
-        return brighten(hsv, 0.2)
+    chain = algorithm[len(core):].split("_")[1:]
+    fm = None
+    if "FM" in chain:
+        position = chain.index("FM")
+        fm = "last" if position == len(chain) - 1 else "first" if position == 0 else "middle"
+    s *= _chain_saturation.get(tuple(pp for pp in chain if pp != "FM"), 0.5)
+    v *= _fm_value[fm]
 
-    if "DMD_NE" in algorithm:
-        return brighten(hsv, 0.4)
+    return "#" + "".join(f"{round(c * 255):02x}" for c in colorsys.hsv_to_rgb(h, s, v))
 
-    if "DMD" in algorithm:
-        return brighten(hsv, 0.6)
 
-    if "NE" in algorithm:
-        return brighten(hsv, 0.8)
+def get_color(algorithm):
+    """
+    Gets the characteristic color for an algorithm (see color_of).
 
-    return to_hex(hsv_to_rgb(hsv))
+    :param algorithm: the name of the algorithm
+    :return: the characteristic color
+    """
+    return color_of(algorithm)
 
 
 def get_marker(algorithm):
@@ -131,19 +270,17 @@ def filter_instances(instance_names, dir_names):
     """
     Filter instances by directory name, i.e. given a list of instance names and a list of directory names,
     it only retains the instances that are in those directories.
+    (For selections by size, family etc., see catalog.py.)
 
     :param instance_names: list of all instance names
     :param dir_names: list of the names of the target directories
     :return: filtered list of instance names
     """
-    filtered = []
-    for instance in instance_names:
-        for directory in dir_names:
-            if instance.startswith(directory):
-                filtered.append(instance)
-    return filtered
+    prefixes = tuple(dir_names)
+    return [instance for instance in instance_names if instance.startswith(prefixes)]
 
 
+@traced
 def analysis_core(df, algorithms, instances, column_name):
     """
     Core of the analysis methods - creates a dictionary that maps algorithm name to list of relative performance values,
@@ -186,6 +323,7 @@ def analysis_core(df, algorithms, instances, column_name):
     return algo_results
 
 
+@traced
 def analysis_per_node(df, algorithms, instances, column_name):
     """
     Core of the analysis methods - creates a dictionary that maps algorithm name to list of relative performance values,
@@ -224,6 +362,7 @@ def analysis_per_node(df, algorithms, instances, column_name):
     return algo_results
 
 
+@traced
 def analyze_separator_speed(df, name, algorithms, instances, target):
     """
     Plots the average speed per node for core algorithms as violin plot, boxplot, and bar chart, across all instances.
@@ -248,6 +387,7 @@ def analyze_separator_speed(df, name, algorithms, instances, target):
                      "algorithm", u"average speed in \u03bcs per node", True, target)
 
 
+@traced
 def analyze_separator_size(df, name, algorithms, instances, target):
     """
     Plots the relative separator sizes for core algorithms as a bar chart, across all instances
@@ -264,6 +404,7 @@ def analyze_separator_size(df, name, algorithms, instances, target):
                      "algorithm", "relative average separator size", True, target)
 
 
+@traced
 def analyze_separator_balance(df, name, algorithms, target):
     """
     Plots the relative balance for core algorithms as a bar chart, across all instances
@@ -286,6 +427,59 @@ def analyze_separator_balance(df, name, algorithms, target):
                      "algorithm", "average balance", True, target)
 
 
+@traced
+def analyze_structure(df, name, algorithms, instances, structure, column, target):
+    """
+    Plots the relative separator size of the algorithms against a structural property of the instances (e.g. the
+    middle level width, see catalog.py) and prints the rank correlation between the two.
+
+    :param df: the main dataframe
+    :param name: the name of the resulting file
+    :param algorithms: list of strings, algorithm identifiers
+    :param instances: list of strings, instance identifiers
+    :param structure: dictionary mapping instance name to catalog row
+    :param column: the structural property, a numeric catalog column
+    :param target: path to folder to store plots in
+    """
+    points = dict()
+    for algo in algorithms:
+        xs = []
+        ys = []
+        for instance in instances:
+            if instance not in structure or structure[instance][column] < 0:
+                continue
+            inst_df = df[df['instance'] == instance]
+            mini = inst_df['sep_size'].min()
+            algo_df = inst_df[inst_df['algorithm'] == algo]
+            if mini == 0 or len(algo_df) == 0:
+                continue
+            xs.append(structure[instance][column])
+            ys.append(algo_df['sep_size'].mean() / mini)
+
+        if len(xs) > 1:
+            correlation = pd.Series(xs).corr(pd.Series(ys), method='spearman')
+            print(f"Rank correlation of {column} and relative separator size for {algo}: {correlation:.3f}")
+            points[algo] = (xs, ys)
+
+    path = os.path.join(target, name + ".png")
+    digest = plot_digest(analyze_structure, points, column)
+    if is_rendered(path, digest, show=True):
+        return
+
+    plt.figure()
+    plt.title(f"Relative separator size by {column}")
+    plt.xlabel(column)
+    plt.ylabel("relative average separator size")
+    for algo, (xs, ys) in points.items():
+        plt.scatter(xs, ys, c=get_color(algo), marker=get_marker(algo), label=algo)
+
+    plt.legend()
+    plt.tight_layout()
+    save_figure(path, digest)
+    plt.show()
+
+
+@traced
 def analyze_runtime_development(df, name, algorithms, instances, size_limit, measure, show, target):
     """
     Analyzes the runtime development, i.e. plots instance size against solving speed for the selected instances.
@@ -358,6 +552,7 @@ def analyze_runtime_development(df, name, algorithms, instances, size_limit, mea
         plt.show()
 
 
+@traced
 def analyze_instance_performance(df, name, instances, algorithms, target, use_pp=False):
     """
     Creates a scatter-plot to visualize relative algorithm performance for each instance.
@@ -370,7 +565,8 @@ def analyze_instance_performance(df, name, instances, algorithms, target, use_pp
     :param use_pp: whether to look at results after postprocessing
     """
     if use_pp:
-        algorithms = [algo + "_NE_DMD" for algo in algorithms] # analyse after postprocessing
+        # analyse after postprocessing (the reference algorithms are never postprocessed)
+        algorithms = [algo if algo in reference_algorithms else algo + "_NE_DMD" for algo in algorithms]
 
     clean_instances = []  # instances without those that have 0-separators
 
@@ -402,6 +598,95 @@ def analyze_instance_performance(df, name, instances, algorithms, target, use_pp
                         "instance", "relative average separator size", target)
 
 
+# figures are only rendered if their data changed, see plot_digest (can be switched off, e.g. to change the style)
+memoize_plots = True
+
+# keyword of the png text chunk that stores the digest of a figure
+PLOT_DIGEST_KEY = "PlotDigest"
+
+
+def _to_json(value):
+    """
+    Converts numpy arrays and scalars for json.dumps.
+    """
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Cannot hash {type(value)}")
+
+
+def plot_digest(function, *data):
+    """
+    Content hash of a figure, computed from everything that determines the png: the data and parameters that it is
+    rendered from, the source of the rendering function and the global style (colors, markers, font).
+
+    :param function: the function that renders the figure
+    :param data: the data and parameters of the figure (json-serializable, numpy values are allowed)
+    :return: hex digest
+    """
+    digest = hashlib.sha1(inspect.getsource(function).encode())
+    digest.update(json.dumps([cmap, mmap, font, data], default=_to_json).encode())
+    return digest.hexdigest()
+
+
+def read_png_text(path):
+    """
+    Reads the text chunks (tEXt) of a png-file.
+
+    :param path: path to the png-file
+    :return: dictionary mapping keyword to text, empty if the file is not a png-file
+    """
+    text = dict()
+    with open(path, 'rb') as file:
+        if file.read(8) != b'\x89PNG\r\n\x1a\n':
+            return text
+        while True:
+            header = file.read(8)
+            if len(header) < 8 or header[4:] == b'IEND':
+                break
+            length = int.from_bytes(header[:4], 'big')
+            if header[4:] == b'tEXt':
+                keyword, _, value = file.read(length).partition(b'\0')
+                text[keyword.decode('latin-1')] = value.decode('latin-1')
+                file.seek(4, os.SEEK_CUR)  # crc
+            else:
+                file.seek(length + 4, os.SEEK_CUR)
+    return text
+
+
+def is_rendered(path, digest, show=False):
+    """
+    Checks whether a figure is up to date. If so and the figure should be shown, the existing png-file is shown instead.
+
+    :param path: path to the png-file of a figure
+    :param digest: the digest of the figure, see plot_digest
+    :param show: whether the figure should be shown
+    :return: whether the png-file exists and was rendered from the same data, so rendering it again can be skipped
+    """
+    if memoize_plots and os.path.exists(path) and read_png_text(path).get(PLOT_DIGEST_KEY) == digest:
+        print(f"Skipping {os.path.basename(path)}, it is up to date")
+        if show:
+            image = plt.imread(path)
+            plt.figure(figsize=(image.shape[1] / 100, image.shape[0] / 100))
+            plt.imshow(image)
+            plt.axis('off')
+            plt.tight_layout(pad=0)
+            plt.show()
+        return True
+    return False
+
+
+@traced
+def save_figure(path, digest):
+    """
+    Saves the current figure as png-file, together with its digest.
+
+    :param path: path to the png-file
+    :param digest: the digest of the figure, see plot_digest
+    """
+    plt.savefig(path, metadata={PLOT_DIGEST_KEY: digest})
+
+
+@traced
 def create_algo_plot(results, name, title, xlabel, ylabel, show, target):
     """
     Plots a dictionary mapping algorithms to some value as a bar chart.
@@ -415,6 +700,11 @@ def create_algo_plot(results, name, title, xlabel, ylabel, show, target):
     :param target: path to plots-folder
     """
 
+    path = os.path.join(target, name + ".png")
+    digest = plot_digest(create_algo_plot, results, title, xlabel, ylabel)
+    if is_rendered(path, digest, show):
+        return
+
     colors = [get_color(alg) for alg in list(results)]
 
     data = [np.mean(results[alg]) for alg in results]
@@ -433,11 +723,12 @@ def create_algo_plot(results, name, title, xlabel, ylabel, show, target):
     else:
         plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.savefig(os.path.join(target, name+".png"))
+    save_figure(path, digest)
     if show:
         plt.show()
 
 
+@traced
 def create_violin_plot(results, algorithms, name, title, xlabel, ylabel, show, target):
     """
     Plots a dictionary mapping algorithms to some value as a boxplot chart.
@@ -452,6 +743,11 @@ def create_violin_plot(results, algorithms, name, title, xlabel, ylabel, show, t
     :param target: path to plots-folder
     """
 
+    path = os.path.join(target, name + "_violin.png")
+    digest = plot_digest(create_violin_plot, [results[algo] for algo in algorithms], algorithms, title, xlabel, ylabel)
+    if is_rendered(path, digest, show):
+        return
+
     # get data in proper shape for seaborn
     data = np.zeros(shape=(len(results), len(results[algorithms[0]])))
     for i, algo in enumerate(algorithms):
@@ -471,13 +767,14 @@ def create_violin_plot(results, algorithms, name, title, xlabel, ylabel, show, t
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
 
-    plt.savefig(os.path.join(target, name+"_violin.png"))
+    save_figure(path, digest)
 
     # show if desired
     if show:
         plt.show()
 
 
+@traced
 def create_boxplot(results, algorithms, name, title, xlabel, ylabel, show, target):
     """
     Plots a dictionary mapping algorithms to some value as a boxplot chart.
@@ -491,6 +788,10 @@ def create_boxplot(results, algorithms, name, title, xlabel, ylabel, show, targe
     :param show: whether to show the plot or not
     :param target: path to plots-folder
     """
+    path = os.path.join(target, name + "_box.png")
+    digest = plot_digest(create_boxplot, [results[algo] for algo in algorithms], algorithms, title, xlabel, ylabel)
+    if is_rendered(path, digest, show):
+        return
 
     plt.figure()
     plt.title(title)
@@ -503,12 +804,13 @@ def create_boxplot(results, algorithms, name, title, xlabel, ylabel, show, targe
 
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.savefig(os.path.join(target, name+"_box.png"))
+    save_figure(path, digest)
 
     if show:
         plt.show()
 
 
+@traced
 def create_scatter_plot(instances, algorithms, results, name, title, xlabel, ylabel, target):
     """
     Plots a dictionary mapping instance names to values for each algorithm.
@@ -522,6 +824,12 @@ def create_scatter_plot(instances, algorithms, results, name, title, xlabel, yla
     :param ylabel: labels of y-axis
     :param target: path to target directory with plots-folder
     """
+    path = os.path.join(target, name + ".png")
+    digest = plot_digest(create_scatter_plot, instances, algorithms,
+                         [[results[algo][inst] for inst in instances] for algo in algorithms], title, xlabel, ylabel)
+    if is_rendered(path, digest, show=True):
+        return
+
     plt.figure()
     plt.title(title)
     plt.ylabel(ylabel)
@@ -556,10 +864,11 @@ def create_scatter_plot(instances, algorithms, results, name, title, xlabel, yla
         plt.xticks(xs, [extract_short_instance_name(inst) for inst in instances], rotation=45, ha='right')
     plt.legend().set_zorder(20)
     plt.tight_layout()
-    plt.savefig(os.path.join(target, name + ".png"))
+    save_figure(path, digest)
     plt.show()
 
 
+@traced
 def create_table(dataframe, algorithms):
     """
     Creates a string representation of a latex table.
@@ -0,0 +1,410 @@
+"""
+Distributes an experiment campaign over several hosts without a coordinator: all state lives in a queue directory on
+a shared filesystem and workers claim units of work by atomically renaming files.
+
+A unit is one instance, one algorithm and a window of its solves (a range of attempts, or of start nodes if every
+start node is used). The queue directory looks like this:
+    config.json                     settings shared by all units (binary, property file, attempts, ...)
+    todo/<unit>.json                units that were not claimed yet
+    claimed/<unit>.json@<worker>    units that are being worked on, the mtime of the file is the lease
+    done/<unit>.json                finished units
+    shards/<unit>.csv               results of each finished unit
+
+A worker claims a unit by renaming it from todo/ to claimed/ and renews its lease while it works by touching the
+claimed file. A claim whose lease expired (the worker crashed or lost its host) is taken over by renaming it to the
+new worker, only one rename can succeed. Results are written to a temporary file and renamed into shards/, so shards
+are always complete. The merge step concatenates all shards in unit order into the usual result csv (with the results
+copied to all duplicates of an instance, see deduplicate.py).
+
+Reference separators run in the worker process, OGDF separators through the main binary (options -i, -A and -w).
+Paths in the queue are stored as given, so all workers have to run from the same relative location (e.g. scripts/).
+
+Example, with three local workers:
+    python work_queue.py create --queue /tmp/queue --algorithms RefLevel,RefCycle --attempts 20 --chunk 5
+    for i in 1 2 3; do python work_queue.py worker --queue /tmp/queue & done; wait
+    python work_queue.py merge --queue /tmp/queue --target ../results/campaign.csv
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from catalog import read_properties, compile_expression, catalog_row
+from deduplicate import read_aliases
+from graphs import read_graph, list_instances
+import reference_separators
+from separators import ogdf_names
+
+DEFAULT_BINARY = "../cmake-build-release/main"
+
+
+def _directories(queue):
+    """
+    :return: dictionary mapping the state of a unit to its directory
+    """
+    return {state: os.path.join(queue, state) for state in ["todo", "claimed", "done", "shards"]}
+
+
+def _unit_id(file_name):
+    """
+    :return: the id of a unit, given the name of its file in any of the directories
+    """
+    return file_name.split(".")[0]
+
+
+def _write_atomic(path, text):
+    """
+    Writes a file under a temporary name and renames it, so that other hosts never see a partial file.
+    """
+    tmp = f"{path}.{socket.gethostname()}-{os.getpid()}.tmp"
+    with open(tmp, 'w') as file:
+        file.write(text)
+    os.replace(tmp, path)
+
+
+def create(queue, instance_dir, property_file, algorithms, attempts, chunk, limit=1000000, alias_file=None,
+           selection=None, binary=DEFAULT_BINARY, postprocessing=False, cache="../instances/.embeddings"):
+    """
+    Creates the queue directory and one unit per instance, algorithm and window of chunk solves.
+    Duplicate instances are solved once, their results are copied to all aliases when merging.
+
+    :param queue: path to the queue directory, must not contain units yet
+    :param instance_dir: path to directory with instances
+    :param property_file: path to property file
+    :param algorithms: list of algorithm names, reference separators or OGDF separators (see separators.ogdf_names)
+    :param attempts: number of attempts per instance (every start node if <= 0)
+    :param chunk: number of solves per unit
+    :param limit: size limit (in nodes) of the instances
+    :param alias_file: path to alias file as generated by deduplicate.py, ignored if it does not exist
+    :param selection: expression to select instances by (see catalog.py), or None
+    :param binary: path to the main binary, used for OGDF separators
+    :param postprocessing: whether to apply postprocessing (OGDF separators only)
+    :param cache: directory of the embedding cache of the main binary, "" for none
+    :return: number of units
+    """
+    for algo in algorithms:
+        if algo not in reference_separators.separators and algo not in ogdf_names:
+            raise ValueError(f"Unknown algorithm {algo}")
+
+    directories = _directories(queue)
+    if os.path.exists(directories["todo"]) and os.listdir(directories["todo"]):
+        raise ValueError(f"Queue {queue} already contains units")
+    for directory in directories.values():
+        os.makedirs(directory, exist_ok=True)
+
+    props = read_properties(property_file)
+    selected = compile_expression(selection)
+
+    aliases = dict()
+    if alias_file is not None and os.path.exists(alias_file):
+        for canonical, duplicates in read_aliases(alias_file).items():
+            aliases[os.path.normpath(canonical)] = [os.path.normpath(path) for path in duplicates]
+    canonical_of = {path: canonical for canonical, duplicates in aliases.items() for path in duplicates}
+
+    config = {"binary": binary, "properties": property_file, "attempts": attempts, "postprocessing": postprocessing,
+              "limit": limit, "cache": cache}
+    _write_atomic(os.path.join(queue, "config.json"), json.dumps(config, indent=2))
+
+    paths = {os.path.normpath(path): path for path in list_instances(instance_dir)}
+    units = 0
+    for key, path in paths.items():
+        if canonical_of.get(key) in paths:
+            continue
+
+        prop = reference_separators.instance_properties(props, path)
+        if int(prop['nodes']) > limit or not selected(catalog_row(path, prop, with_hash=False)):
+            continue
+
+        solves = attempts
+        if attempts <= 0:
+            solves = int(prop['nodes']) if int(prop['nodes']) >= 0 else read_graph(path).n
+            if solves > limit:
+                continue
+
+        alias_props = [reference_separators.instance_properties(props, paths[alias])
+                       for alias in aliases.get(key, []) if alias in paths]
+
+        for algo in algorithms:
+            for first in range(0, solves, chunk):
+                unit = {"instance": path, "properties": prop, "aliases": alias_props, "algorithm": algo,
+                        "first": first, "count": min(chunk, solves - first)}
+                _write_atomic(os.path.join(directories["todo"], f"{units:07d}.json"), json.dumps(unit))
+                units += 1
+
+    print(f"Created {units} units in {queue}")
+    return units
+
+
+class _Lease:
+    """
+    Renews the lease of a claimed unit in the background, by touching the claim file.
+    """
+
+    def __init__(self, path, duration):
+        self.path = path
+        self.duration = duration
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._renew, daemon=True)
+
+    def _renew(self):
+        while not self._stop.wait(self.duration / 3.0):
+            try:
+                os.utime(self.path)
+            except FileNotFoundError:  # another worker took over the unit
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+
+
+def claim(queue, worker, lease):
+    """
+    Claims a unit: an unclaimed one if possible, otherwise one whose lease expired.
+
+    :param queue: path to the queue directory
+    :param worker: id of the worker
+    :param lease: duration of a lease in seconds
+    :return: path to the claim file, or None if there is nothing to claim
+    """
+    directories = _directories(queue)
+
+    # workers start at different positions, so that they rarely compete for the same unit
+    todo = sorted(os.listdir(directories["todo"]))
+    start = random.randrange(len(todo)) if todo else 0
+    for name in todo[start:] + todo[:start]:
+        if name.endswith(".tmp"):
+            continue
+        source = os.path.join(directories["todo"], name)
+        target = os.path.join(directories["claimed"], f"{name}@{worker}")
+        try:
+            os.utime(source)  # renaming keeps the mtime, so the lease starts now
+            os.rename(source, target)
+            return target
+        except FileNotFoundError:  # claimed by another worker in the meantime
+            continue
+
+    now = time.time()
+    for name in sorted(os.listdir(directories["claimed"])):
+        source = os.path.join(directories["claimed"], name)
+        try:
+            if now - os.stat(source).st_mtime < lease:
+                continue
+            target = os.path.join(directories["claimed"], f"{name.split('@')[0]}@{worker}")
+            os.rename(source, target)
+            os.utime(target)
+            print(f"Took over {name}, its lease expired")
+            return target
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def run_unit(unit, config, shard):
+    """
+    Runs a unit and writes its results to a csv-file.
+
+    :param unit: the unit, as stored in the queue
+    :param config: the configuration of the queue
+    :param shard: path to the csv-file
+    """
+    window = (unit["first"], unit["count"])
+    if unit["algorithm"] in reference_separators.separators:
+        lines = reference_separators.solve_instance(unit["instance"], [unit["algorithm"]], config["attempts"],
+                                                    unit["properties"], window)
+        with open(shard, 'w') as file:
+            file.write(reference_separators.CSV_HEAD)
+            file.writelines(lines)
+        return
+
+    # aliases are handled when merging, so the binary gets none
+    command = [config["binary"], "-i", unit["instance"], "-A", ogdf_names[unit["algorithm"]],
+               "-a", str(config["attempts"]), "-w", f"{window[0]}:{window[1]}", "-r", shard,
+               "-p", config["properties"], "-l", str(config["limit"]), "-c", config["cache"], "-d", "", "-s", ""]
+    if config["postprocessing"]:
+        command.append("-P")
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def work(queue, lease=600.0, poll=10.0, worker=None):
+    """
+    Claims and runs units until all units of the queue are done.
+    Waits while other workers hold claims, as their leases may expire.
+
+    :param queue: path to the queue directory
+    :param lease: duration of a lease in seconds, it is renewed every lease/3 seconds
+    :param poll: seconds to wait before looking for expired leases again
+    :param worker: id of the worker, host name and process id by default
+    :return: number of units this worker finished
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    directories = _directories(queue)
+    with open(os.path.join(queue, "config.json")) as file:
+        config = json.load(file)
+
+    finished = 0
+    while True:
+        claimed = claim(queue, worker, lease)
+        if claimed is None:
+            if not os.listdir(directories["todo"]) and not os.listdir(directories["claimed"]):
+                break
+            time.sleep(poll)
+            continue
+
+        name = os.path.basename(claimed).split("@")[0]
+        with open(claimed) as file:
+            unit = json.load(file)
+        print(f"[{worker}] {name}: {unit['algorithm']} on {unit['properties']['name']}, "
+              f"solves {unit['first']} to {unit['first'] + unit['count'] - 1}")
+
+        shard = os.path.join(directories["shards"], f"{_unit_id(name)}.csv")
+        tmp = f"{shard}.{worker}.tmp"
+        with _Lease(claimed, lease) as renewal:
+            run_unit(unit, config, tmp)
+        os.replace(tmp, shard)
+
+        try:
+            os.rename(claimed, os.path.join(directories["done"], name))
+            finished += 1
+        except FileNotFoundError:
+            # the lease was taken over, the other worker writes an equivalent shard
+            print(f"[{worker}] {name}: lease was lost{' while working' if renewal.lost else ''}")
+
+    print(f"[{worker}] finished {finished} units")
+    return finished
+
+
+def status(queue):
+    """
+    Prints the progress of the queue.
+
+    :param queue: path to the queue directory
+    :return: dictionary mapping state to number of units
+    """
+    directories = _directories(queue)
+    counts = {state: len([name for name in os.listdir(directory) if not name.endswith(".tmp")])
+              for state, directory in directories.items()}
+
+    workers = dict()
+    for name in os.listdir(directories["claimed"]):
+        workers.setdefault(name.split("@")[1], []).append(_unit_id(name))
+
+    total = counts["todo"] + counts["claimed"] + counts["done"]
+    print(f"{counts['done']} of {total} units done, {counts['claimed']} claimed, {counts['todo']} to do")
+    for worker, units in sorted(workers.items()):
+        print(f"\t{worker}: {', '.join(sorted(units))}")
+    return counts
+
+
+def merge(queue, target, partial=False):
+    """
+    Concatenates the shards of all units into one result csv, in unit order. The results of every instance are
+    followed by their copies for the aliases of the instance, like in reference_separators.main.
+
+    :param queue: path to the queue directory
+    :param target: path to the resulting csv-file
+    :param partial: whether to merge even though not all units are done
+    :return: number of merged units
+    """
+    directories = _directories(queue)
+    units = {_unit_id(name): os.path.join(directories[state], name) for state in ["todo", "claimed", "done"]
+             for name in os.listdir(directories[state]) if not name.endswith(".tmp")}
+    shards = {_unit_id(name) for name in os.listdir(directories["shards"]) if name.endswith(".csv")}
+    missing = sorted(unit_id for unit_id in units if unit_id not in shards)
+    if missing and not partial:
+        raise RuntimeError(f"{len(missing)} of {len(units)} units are not done, e.g. {', '.join(missing[:5])}")
+
+    directory = os.path.dirname(target)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    merged = 0
+    with open(target, 'w') as out:
+        out.write(reference_separators.CSV_HEAD)
+
+        lines = []
+        aliases = []
+        instance = None
+        for unit_id in sorted(shards):
+            with open(units[unit_id]) as file:
+                unit = json.load(file)
+
+            if unit["instance"] != instance:
+                out.writelines(lines)
+                for prop in aliases:
+                    out.writelines(reference_separators.relabel(line, prop) for line in lines)
+                lines, aliases, instance = [], unit["aliases"], unit["instance"]
+
+            with open(os.path.join(directories["shards"], f"{unit_id}.csv")) as file:
+                lines.extend(file.readlines()[1:])
+            merged += 1
+
+        out.writelines(lines)
+        for prop in aliases:
+            out.writelines(reference_separators.relabel(line, prop) for line in lines)
+
+    print(f"Merged {merged} units into {target}" + (f", {len(missing)} units missing" if missing else ""))
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Work queue for experiment campaigns on a shared filesystem.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = commands.add_parser('create', help='Creates the units of a campaign')
+    create_parser.add_argument('--queue', type=str, required=True, help='Path to the queue directory')
+    create_parser.add_argument('--instances', type=str, default="../instances/", help='Path to directory with instances')
+    create_parser.add_argument('--properties', type=str, default="../instances/properties.xml",
+                               help='Path to property file')
+    create_parser.add_argument('--algorithms', type=str, default="LT,LTFC,Dual,DualFC,HPN,RefLevel,RefCycle",
+                               help='Comma-separated algorithms')
+    create_parser.add_argument('--attempts', type=int, default=20, help='Attempts per instance, every start node if <= 0')
+    create_parser.add_argument('--chunk', type=int, default=100, help='Solves per unit')
+    create_parser.add_argument('--limit', type=int, default=1000000, help='Size limit (in nodes) of the instances')
+    create_parser.add_argument('--aliases', type=str, default="../instances/aliases.xml", help='Path to alias file')
+    create_parser.add_argument('--select', type=str, default=None, help='Expression to select instances by')
+    create_parser.add_argument('--binary', type=str, default=DEFAULT_BINARY, help='Path to the main binary')
+    create_parser.add_argument('--postprocessing', action='store_true', help='Apply postprocessing (OGDF only)')
+    create_parser.add_argument('--cache', type=str, default="../instances/.embeddings",
+                               help='Embedding cache of the main binary, "" for none')
+
+    worker_parser = commands.add_parser('worker', help='Works on units until the queue is done')
+    worker_parser.add_argument('--queue', type=str, required=True, help='Path to the queue directory')
+    worker_parser.add_argument('--lease', type=float, default=600.0, help='Duration of a lease in seconds')
+    worker_parser.add_argument('--poll', type=float, default=10.0, help='Seconds between looking for expired leases')
+    worker_parser.add_argument('--id', type=str, default=None, help='Id of the worker, host and pid by default')
+
+    status_parser = commands.add_parser('status', help='Shows the progress of the queue')
+    status_parser.add_argument('--queue', type=str, required=True, help='Path to the queue directory')
+
+    merge_parser = commands.add_parser('merge', help='Merges the shards into one result csv')
+    merge_parser.add_argument('--queue', type=str, required=True, help='Path to the queue directory')
+    merge_parser.add_argument('--target', type=str, required=True, help='Path to resulting csv-file')
+    merge_parser.add_argument('--partial', action='store_true', help='Merge even though units are missing')
+
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        create(args.queue, args.instances, args.properties, args.algorithms.split(","), args.attempts, args.chunk,
+               args.limit, args.aliases, args.select, args.binary, args.postprocessing, args.cache)
+    elif args.command == 'worker':
+        work(args.queue, args.lease, args.poll, args.id)
+    elif args.command == 'status':
+        status(args.queue)
+    else:
+        try:
+            merge(args.queue, args.target, args.partial)
+        except RuntimeError as error:
+            sys.exit(str(error))
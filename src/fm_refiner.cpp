@@ -0,0 +1,305 @@
+#include <fm_refiner.h>
+#include <algorithm>
+
+// ========== bucket queue ========== //
+
+void FMRefiner::BucketQueue::init(const Graph &G, int maxDegree) {
+	// gains lie in [1 - maxDegree, 1]
+	m_offset = maxDegree;
+	m_maxBucket = -1;
+	m_head.assign(maxDegree + 2, nullptr);
+	m_next.init(G, nullptr);
+	m_prev.init(G, nullptr);
+	m_gain.init(G, 0);
+	m_inQueue.init(G, false);
+}
+
+void FMRefiner::BucketQueue::insert(node v, int gain) {
+	int bucket = gain + m_offset;
+	m_next[v] = m_head[bucket];
+	m_prev[v] = nullptr;
+	if(m_head[bucket] != nullptr) {
+		m_prev[m_head[bucket]] = v;
+	}
+	m_head[bucket] = v;
+	m_gain[v] = gain;
+	m_inQueue[v] = true;
+	m_maxBucket = std::max(m_maxBucket, bucket);
+}
+
+void FMRefiner::BucketQueue::remove(node v) {
+	int bucket = m_gain[v] + m_offset;
+	if(m_prev[v] != nullptr) {
+		m_next[m_prev[v]] = m_next[v];
+	} else {
+		m_head[bucket] = m_next[v];
+	}
+	if(m_next[v] != nullptr) {
+		m_prev[m_next[v]] = m_prev[v];
+	}
+	m_inQueue[v] = false;
+}
+
+void FMRefiner::BucketQueue::update(node v, int gain) {
+	remove(v);
+	insert(v, gain);
+}
+
+node FMRefiner::BucketQueue::top() {
+	while(m_maxBucket >= 0 && m_head[m_maxBucket] == nullptr) {
+		m_maxBucket--;
+	}
+	return m_maxBucket >= 0 ? m_head[m_maxBucket] : nullptr;
+}
+
+// ========== refinement ========== //
+
+FMRefiner::FMRefiner(int maxPasses, int maxNonImproving) : m_maxPasses{maxPasses}, m_maxNonImproving{maxNonImproving} { }
+
+bool FMRefiner::apply(const Graph &G, List<node> &separator, List<node> &first, List<node> &second) {
+
+	if(separator.empty()) return true;
+
+	// the node arrays are kept between calls, so only a new graph costs O(n)
+	if(m_side.graphOf() != &G) {
+		init(G);
+	}
+
+	// the lists are the only source of the sides, so they are read once (without touching any edges)
+	List<node> *halves[2] = {&first, &second};
+	for(int k = 0; k < 2; ++k) {
+		for(ListIterator<node> it = halves[k]->begin(); it.valid(); ++it) {
+			m_side[*it] = k;
+			m_origin[*it] = k;
+			m_position[*it] = it;
+		}
+	}
+	for(node v : separator) {
+		m_side[v] = SEP;
+		m_origin[v] = SEP;
+	}
+
+	m_size[0] = first.size();
+	m_size[1] = second.size();
+	m_size[SEP] = separator.size();
+
+	// never allow a half to grow beyond 2/3 of the nodes, unless it already was larger than that
+	m_bound = std::max(static_cast<int>(2.0 / 3.0 * G.numberOfNodes()), std::max(m_size[0], m_size[1]));
+
+	std::vector<node> sepNodes(separator.begin(), separator.end());
+	for(node v : sepNodes) {
+		countNeighbours(v);
+	}
+
+	m_changed.clear();
+	for(int i = 0; i < m_maxPasses; ++i) {
+		if(!pass(sepNodes)) break;
+	}
+
+	// only the moved and pulled nodes that kept their new side change the lists
+	for(node v : m_changed) {
+		if(m_listed[v]) continue;
+		m_listed[v] = true;
+		if(m_side[v] == m_origin[v]) continue;
+		if(m_origin[v] != SEP) {
+			halves[m_origin[v]]->del(m_position[v]);
+		}
+		if(m_side[v] != SEP) {
+			halves[m_side[v]]->pushBack(v);
+		}
+	}
+	for(node v : m_changed) m_listed[v] = false;
+
+	separator.clear();
+	for(node v : sepNodes) {
+		separator.pushBack(v);
+	}
+	return true;
+}
+
+void FMRefiner::init(const Graph &G) {
+	int maxDegree = 0;
+	for(node v : G.nodes) {
+		maxDegree = std::max(maxDegree, v->degree());
+	}
+
+	m_side.init(G, SEP);
+	m_origin.init(G, SEP);
+	m_position.init(G);
+	m_count[0].init(G, 0);
+	m_count[1].init(G, 0);
+	m_locked.init(G, false);
+	m_listed.init(G, false);
+	m_queue[0].init(G, maxDegree);
+	m_queue[1].init(G, maxDegree);
+}
+
+void FMRefiner::countNeighbours(node v) {
+	m_count[0][v] = 0;
+	m_count[1][v] = 0;
+	for(adjEntry adj : v->adjEntries) {
+		int side = m_side[adj->twinNode()];
+		if(side != SEP) {
+			m_count[side][v]++;
+		}
+	}
+}
+
+bool FMRefiner::pass(std::vector<node> &sepNodes) {
+
+	m_moves.clear();
+	m_pulled.clear();
+	m_touched.clear();
+
+	for(node v : sepNodes) {
+		m_queue[0].insert(v, 1 - m_count[1][v]);
+		m_queue[1].insert(v, 1 - m_count[0][v]);
+	}
+
+	int bestSepSize = m_size[SEP];
+	int bestImbalance = std::max(m_size[0], m_size[1]);
+	size_t bestMoves = 0;
+	int nonImproving = 0;
+
+	while(nonImproving < m_maxNonImproving) {
+
+		node candidate[2] = {bestMove(0), bestMove(1)};
+		if(candidate[0] == nullptr && candidate[1] == nullptr) break;
+
+		// take the higher gain, ties are broken in favour of the smaller half
+		int k;
+		if(candidate[1] == nullptr) {
+			k = 0;
+		} else if(candidate[0] == nullptr) {
+			k = 1;
+		} else {
+			int gain0 = m_queue[0].gain(candidate[0]);
+			int gain1 = m_queue[1].gain(candidate[1]);
+			k = gain0 != gain1 ? (gain0 > gain1 ? 0 : 1) : (m_size[0] <= m_size[1] ? 0 : 1);
+		}
+
+		move(candidate[k], k);
+
+		int imbalance = std::max(m_size[0], m_size[1]);
+		if(m_size[SEP] < bestSepSize || (m_size[SEP] == bestSepSize && imbalance < bestImbalance)) {
+			bestSepSize = m_size[SEP];
+			bestImbalance = imbalance;
+			bestMoves = m_moves.size();
+			nonImproving = 0;
+		} else {
+			nonImproving++;
+		}
+	}
+
+	// roll back to the best state of this pass
+	while(m_moves.size() > bestMoves) {
+		undo();
+	}
+
+	// clear the queues and collect the separator nodes for the next pass
+	std::vector<node> nextSepNodes;
+	auto collect = [&](node v) {
+		for(BucketQueue &queue : m_queue) {
+			if(queue.contains(v)) queue.remove(v);
+		}
+		m_locked[v] = false;
+		if(m_side[v] == SEP && !m_listed[v]) {
+			m_listed[v] = true;
+			nextSepNodes.push_back(v);
+		}
+	};
+	for(node v : sepNodes) collect(v);
+	for(node v : m_touched) collect(v);
+	for(node v : nextSepNodes) m_listed[v] = false;
+	m_changed.insert(m_changed.end(), m_touched.begin(), m_touched.end());
+
+	sepNodes = std::move(nextSepNodes);
+	return bestMoves > 0;
+}
+
+node FMRefiner::bestMove(int k) {
+	// moving a node into half k always grows k by exactly one node
+	if(m_size[k] + 1 > m_bound) return nullptr;
+	return m_queue[k].top();
+}
+
+void FMRefiner::move(node v, int k) {
+
+	for(BucketQueue &queue : m_queue) {
+		if(queue.contains(v)) queue.remove(v);
+	}
+	m_locked[v] = true;
+	m_touched.push_back(v);
+	m_moves.push_back({v, k, m_pulled.size()});
+
+	m_side[v] = k;
+	m_size[SEP]--;
+	m_size[k]++;
+
+	// separator neighbours now lose more when moving to the other half
+	for(adjEntry adj : v->adjEntries) {
+		node w = adj->twinNode();
+		if(m_side[w] != SEP) continue;
+		m_count[k][w]++;
+		if(m_queue[1-k].contains(w)) {
+			m_queue[1-k].update(w, 1 - m_count[k][w]);
+		}
+	}
+
+	// neighbours in the other half are pulled into the separator
+	for(adjEntry adj : v->adjEntries) {
+		node w = adj->twinNode();
+		if(m_side[w] != 1-k) continue;
+
+		m_side[w] = SEP;
+		m_size[1-k]--;
+		m_size[SEP]++;
+		m_pulled.push_back(w);
+		m_touched.push_back(w);
+
+		for(adjEntry adjW : w->adjEntries) {
+			node x = adjW->twinNode();
+			if(m_side[x] != SEP) continue;
+			m_count[1-k][x]--;
+			if(m_queue[k].contains(x)) {
+				m_queue[k].update(x, 1 - m_count[1-k][x]);
+			}
+		}
+
+		countNeighbours(w);
+		if(!m_locked[w]) {
+			m_queue[k].insert(w, 1 - m_count[1-k][w]);
+			m_queue[1-k].insert(w, 1 - m_count[k][w]);
+		}
+	}
+}
+
+void FMRefiner::undo() {
+
+	Move last = m_moves.back();
+	m_moves.pop_back();
+	int k = last.to;
+
+	while(m_pulled.size() > last.pulledBegin) {
+		node w = m_pulled.back();
+		m_pulled.pop_back();
+
+		m_side[w] = 1-k;
+		m_size[SEP]--;
+		m_size[1-k]++;
+		for(adjEntry adj : w->adjEntries) {
+			node x = adj->twinNode();
+			if(m_side[x] == SEP) m_count[1-k][x]++;
+		}
+	}
+
+	node v = last.v;
+	m_side[v] = SEP;
+	m_size[k]--;
+	m_size[SEP]++;
+	for(adjEntry adj : v->adjEntries) {
+		node x = adj->twinNode();
+		if(m_side[x] == SEP) m_count[k][x]--;
+	}
+	countNeighbours(v);
+}
@@ -680,6 +680,12 @@ void planarizeGraphs(const std::string &resource_path, const std::string &target
 
                 GraphIO::write(G, target_path + city_name + ".gml", GraphIO::writeGML);
 
+                // planarization keeps the nodes in their order, so the coordinates (see map_generator.py) still apply
+                fs::path coordinates = fs::path(path).replace_extension(".xy");
+                if (fs::exists(coordinates)) {
+                    fs::copy_file(coordinates, target_path + city_name + ".xy", fs::copy_options::overwrite_existing);
+                }
+
             }
         }
     }
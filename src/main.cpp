@@ -1,129 +1,42 @@
-#include <ogdf/graphalg/SeparatorLiptonTarjan.h>
-#include <ogdf/graphalg/SeparatorLiptonTarjanFC.h>
-#include <ogdf/graphalg/SeparatorDual.h>
-#include <ogdf/graphalg/SeparatorDualFC.h>
-#include <ogdf/graphalg/SeparatorHarPeled.h>
 #include <ogdf/basic/graph_generators/deterministic.h>
 
 #include <iostream>
 #include <functional>
 #include <chrono>
+#include <ctime>
 #include <filesystem>
 #include <regex>
 #include <vector>
 #include <unistd.h>
 #include <cassert>
-
+#include <set>
+#include <algorithm>
+#include <atomic>
+#include <random>
+#include <thread>
+#include <map>
+#include <mutex>
+#include <fstream>
+
+#include <progress.h>
 #include <property_recorder.h>
+#include <result.h>
+#include <separators.h>
 
 namespace fs = std::filesystem;
 using namespace ogdf;
 
-/**
- * Ecoding algorithms as const longs to select algorithms.
- */
-const short LT      = 1 << 0;
-const short LTFC    = 1 << 1;
-const short D       = 1 << 2;
-const short DFC     = 1 << 3;
-const short HP      = 1 << 4;
-const short all     = (1 << 5) - 1;
-
 /**
  * Evaluates five different Separator modules on all test instances.
  */
 class Experiment {
 
-    /**
-     * Container for one line of the results-csv.
-     * Stores data on the instance, the algorithm and the solution - some of it redundant.
-     */
-    struct Result {
-
-        std::string algorithm;
-        PropertyRecorder::Properties prop;
-        int nodes;
-        int edges;
-        long time;
-        int sepSize;
-        double balance;   // defined as A/B where A is the smaller half
-        double ratio; // defined as S/A where A is the smaller half
-		std::string exitPoint;
-
-
-		/**
-		 * Constructor.
-		 *
-		 * @param algorithm the name of the algorithm
-		 * @param prop properties of the instance
-		 * @param nodes number of nodes of the instance
-		 * @param edges number of edges of the instance
-		 * @param time time in microseconds it took to solve the instance
-		 * @param sepSize separator size (nodes in the separator)
-		 * @param firstSize size of the first list
-		 * @param secondSize size of the second list
-		 * @param exitPoint identifier of the termination point of the algorithm
-		 */
-        Result(const std::string &algorithm, const PropertyRecorder::Properties &prop, int nodes, int edges, long time, int sepSize, int firstSize, int secondSize, const std::string &exitPoint)
-            : algorithm{algorithm}, prop{prop}, nodes{nodes}, edges{edges}, time{time}, sepSize{sepSize}, exitPoint{exitPoint} {
-
-            int shortList = min(firstSize, secondSize);
-            int longList = max(firstSize, secondSize);
-
-            balance = shortList / (double) longList;
-            ratio = sepSize / (double) shortList;
-        }
-
-
-		/**
-		 * Exports the result to one csv-line.
-		 *
-		 * @return a string containing the data of this result
-		 */
-        std::string to_csv() const {
-
-            std::vector<std::string> data = {
-                    algorithm,
-                    prop.name,
-                    to_string(nodes),
-                    to_string(edges),
-                    to_string(prop.diameter),
-                    to_string(prop.diameter_lB),
-                    to_string(prop.diameter_uB),
-                    to_string(prop.radius),
-                    to_string(time),
-                    to_string(sepSize),
-                    to_string(balance),
-                    to_string(ratio),
-					exitPoint};
-
-            std::string result;
-            for(const std::string &val : data) {
-                result += val + ",";
-            }
-            int length = result.size() - result.substr(result.rfind(',')).size();
-            result = result.substr(0,length);
-
-            return result + "\n";
-        }
-
-
-		/**
-		 * Contains the headline of the csv-file.
-		 *
-		 * @return the headline
-		 */
-        static string get_head() {
-            return "algorithm,instance,nodes,edges,diameter,diam_lB,diam_uB,radius,time,sep_size,balance,ratio,exit\n";
-        }
-    };
-
 public:
 
 	/**
 	 * Constructor.
 	 *
-	 * @param res_file path to file in which results are written
+	 * @param res_file path to file in which results are written (binary records if it ends with .psr, csv otherwise)
 	 * @param target_dir directory of instance files
 	 * @param propertyFile path to property file (as generated by property recorder)
 	 * @param limit size limit (in nodes) of the instances
@@ -131,15 +44,47 @@ public:
 	 * @param attempts number of solving attempts (with different random seeds)
 	 * @param algorithm which algorithm to use
 	 * @param postprocessing whether to apply postprocessing or not
+	 * @param aliasFile path to alias file (as generated by scripts/deduplicate.py), ignored if it does not exist
+	 * @param selectionFile path to file with the names of the instances to run (as generated by scripts/catalog.py), all instances are run if empty
+	 * @param embeddingCache directory to cache the planar embeddings of the instances in, no cache is used if empty
+	 * @param threads number of threads that solve an instance concurrently, all cores are used if <= 0
+	 * @param windowFirst position of the first solve (start node or attempt) to run
+	 * @param windowCount number of solves to run from windowFirst on, all solves are run if < 0
+	 * @param rootsFile path to file with predicted start nodes (as generated by scripts/root_index.py), that the
+	 *                  attempts use instead of random ones, ignored if empty
+	 * @param eventFile path to the file (or pipe) that progress events are written to as json lines (see
+	 *                  scripts/monitor.py), no events are written if empty
 	 */
-    Experiment(const std::string &res_file, const std::string &target_dir, const std::string &propertyFile, int limit, bool test, int attempts, short algorithm, bool postprocessing)
-        : res_file{res_file}, instance_dir{target_dir}, limit{limit}, test{test}, attempts{attempts}, selectedAlgorithms{algorithm}, postProcessing{postprocessing}, recorder{propertyFile} {
+    Experiment(const std::string &res_file, const std::string &target_dir, const std::string &propertyFile, int limit, bool test, int attempts, short algorithm, bool postprocessing, const std::string &aliasFile, const std::string &selectionFile, const std::string &embeddingCache, int threads, int windowFirst, int windowCount, const std::string &rootsFile, const std::string &eventFile)
+        : res_file{res_file}, instance_dir{target_dir}, limit{limit}, test{test}, attempts{attempts}, selectedAlgorithms{algorithm}, postProcessing{postprocessing}, recorder{propertyFile}, embeddingCache{embeddingCache}, threads{threads}, windowFirst{windowFirst}, windowCount{windowCount}, progress{eventFile} {
+
+		if(this->threads <= 0) {
+			this->threads = std::max(1u, std::thread::hardware_concurrency());
+		}
+
+		if(!embeddingCache.empty()) {
+			fs::create_directories(embeddingCache);
+		}
 
 		fs::create_directories(res_file.substr(0, res_file.rfind("/")));
-        file.open(res_file);
-        file << Result::get_head();
-        file.close();
+        sink = createResultSink(res_file);
+
+		if(!aliasFile.empty() && fs::exists(aliasFile)) {
+			readAliases(aliasFile);
+		}
 
+		if(!selectionFile.empty()) {
+			std::ifstream selectionStream(selectionFile);
+			std::string name;
+			while(std::getline(selectionStream, name)) {
+				if(!name.empty()) selection.insert(name);
+			}
+			std::cout << "Selected " << selection.size() << " instances." << std::endl;
+		}
+
+		if(!rootsFile.empty()) {
+			readRoots(rootsFile);
+		}
     }
 
 	/**
@@ -147,45 +92,88 @@ public:
 	 */
     void run() {
 
-        // all separators
-        SeparatorLiptonTarjan sepLipTar(true, 2);
-        SeparatorDual sepDual(true, 2);
-        SeparatorLiptonTarjanFC sepLTFC(true);
-        SeparatorDualFC sepDFC(true);
-        SeparatorHarPeled sepHarPel;
-
         // collection of separators to use
-        std::vector<PlanarSeparatorModule*> separators;
-		if(selectedAlgorithms & LT)
-			separators.push_back( &sepLipTar );
-        if(selectedAlgorithms & D)
-			separators.push_back( &sepDual );
-        if(selectedAlgorithms & LTFC)
-			separators.push_back( &sepLTFC );
-        if(selectedAlgorithms & DFC)
-			separators.push_back( &sepDFC );
-        if(selectedAlgorithms & HP)
-			separators.push_back( &sepHarPel );
+        std::vector<std::unique_ptr<PlanarSeparatorModule>> separators = createSeparators(selectedAlgorithms);
 
-        // walk over all files/directories in instance directory
-        using rec_dir_it = std::filesystem::recursive_directory_iterator;
-        for (const auto &dirEntry : rec_dir_it(instance_dir)) {
+        // walk over all files/directories in instance directory, or take the instance file itself
+        std::map<std::string, std::string> paths; // maps normalized path to path
+        if (fs::is_regular_file(instance_dir)) {
+            paths[normalize(instance_dir)] = instance_dir;
+        } else {
+            using rec_dir_it = std::filesystem::recursive_directory_iterator;
+            for (const auto &dirEntry : rec_dir_it(instance_dir)) {
 
-            if (!dirEntry.is_directory()) { // just skip directories
+                if (!dirEntry.is_directory()) { // just skip directories
 
-                std::string path = dirEntry.path().string();
+                    std::string path = dirEntry.path().string();
 
-                if (isGraphFile(path)) {
+                    // unselected instances are never opened
+                    if (isGraphFile(path) && (selection.empty() || selection.count(extractFullFileName(path)))) {
+                        paths[normalize(path)] = path;
+                    }
+                }
+            }
+        }
 
-                    std::cout << "Working on " << extractFileName(path) << std::endl;
+        // the queue of instances to run, as normalized paths
+        std::vector<std::string> queue;
+        for (const auto &entry : paths) {
 
-                    for(const auto sep : separators) {
-                        apply(path, *sep);
-                    }
+            // duplicates are solved only once, via their canonical instance
+            auto canonical = canonicalOf.find(entry.first);
+            if (canonical != canonicalOf.end() && paths.count(canonical->second)) {
+                std::cout << "Skipping " << extractFileName(entry.second) << " (duplicate of " << extractFileName(canonical->second) << ")" << std::endl;
+                continue;
+            }
+
+            // known instances that are too large are skipped before reading them
+            if(recorder.getProperties(entry.second).nodes > limit) continue;
+
+            queue.push_back(entry.first);
+        }
+
+        if(progress.enabled()) {
+            writeStartEvent(separators, paths, queue);
+        }
+
+        for (size_t position = 0; position < queue.size(); ++position) {
+
+            const std::string &path = paths[queue[position]];
 
+            currentInstance = extractFullFileName(path);
+            aliasProperties.clear();
+            for (const std::string &alias : aliases[queue[position]]) {
+                if (paths.count(alias)) {
+                    aliasProperties.push_back(recorder.getProperties(paths[alias]));
                 }
             }
+
+            PropertyRecorder::Properties prop = recorder.getProperties(path);
+
+            std::cout << "Working on " << extractFileName(path) << std::endl;
+
+            // the instance is read and embedded once and then shared by all separators
+            double loadStart = progress.elapsed();
+            Graph G;
+            load(path, G);
+            if(G.numberOfNodes() > limit) {
+                ProgressEvent event("skip");
+                progress.write(event.add("instance", currentInstance).add("nodes", G.numberOfNodes()));
+                continue;
+            }
+
+            ProgressEvent event("instance");
+            progress.write(event.add("instance", currentInstance).add("position", position).add("nodes", G.numberOfNodes())
+                    .add("edges", G.numberOfEdges()).add("load", progress.elapsed() - loadStart));
+
+            for(size_t i = 0; i < separators.size(); ++i) {
+                apply(G, prop, i, separators[i]->getName());
+            }
+            sink->flush();
         }
+
+        ProgressEvent done("done");
+        progress.write(done);
         std::cout << "Experiments ran successfully!" << std::endl;
     }
 
@@ -193,7 +181,7 @@ private:
 
     std::string res_file;
     std::string instance_dir;
-    std::ofstream file;
+    std::unique_ptr<ResultSink> sink;
     int limit;
     bool test; // whether to test results or not
     int attempts;
@@ -202,45 +190,272 @@ private:
 
     PropertyRecorder recorder;
 
+    std::map<std::string, std::vector<std::string>> aliases; // maps canonical instance to its duplicates
+    std::map<std::string, std::string> canonicalOf; // maps duplicate to its canonical instance
+    std::vector<PropertyRecorder::Properties> aliasProperties; // properties of the duplicates of the current instance
+
+    std::set<std::string> selection; // names of the instances to run, empty if all instances are run
+
+    std::string embeddingCache; // directory of the embedding cache, no cache is used if empty
+
+    int threads; // number of threads that solve an instance
+
+    int windowFirst; // first solve of the window of solves that is run
+    int windowCount; // size of the window, all solves are run if < 0
+
+    std::map<std::string, std::map<std::string, std::vector<int>>> startNodes; // maps instance and algorithm to predicted start nodes
+    std::string currentInstance; // name of the instance that is solved
+
+    ProgressLog progress; // structured progress events
+
+    std::mutex randomMutex; // serializes the separation steps of randomized separators, which share OGDF's random stream
+
 
 	/**
-	 * Applies the separator to the instance at path.
+	 * Normalizes a path, so that paths from the alias file and from the instance directory can be compared.
 	 *
-	 * @param path the instance-path
-	 * @param sep the separator to be used
+	 * @param path the path
+	 * @return the normalized path
 	 */
-    void apply(const std::string &path, PlanarSeparatorModule &sep) {
+    static std::string normalize(const std::string &path) {
+        return fs::path(path).lexically_normal().string();
+    }
 
 
-        PropertyRecorder::Properties prop = recorder.getProperties(path);
+	/**
+	 * Reads the groups of duplicate instances, the first instance of each group is the canonical one.
+	 *
+	 * @param aliasFile path to the alias file
+	 */
+    void readAliases(const std::string &aliasFile) {
+        tinyxml2::XMLDocument doc;
+        doc.LoadFile(aliasFile.c_str());
+
+        tinyxml2::XMLElement* root = doc.FirstChildElement("aliases");
+        for(tinyxml2::XMLElement* group = root->FirstChildElement("group"); group != nullptr; group = group->NextSiblingElement("group")) {
+            tinyxml2::XMLElement* canonical = group->FirstChildElement("instance");
+            std::string canonicalPath = normalize(canonical->GetText());
+            for(tinyxml2::XMLElement* alias = canonical->NextSiblingElement("instance"); alias != nullptr; alias = alias->NextSiblingElement("instance")) {
+                std::string aliasPath = normalize(alias->GetText());
+                aliases[canonicalPath].push_back(aliasPath);
+                canonicalOf[aliasPath] = canonicalPath;
+            }
+        }
+    }
+
+
+	/**
+	 * Reads the predicted start nodes, one line per algorithm and instance: algorithm, instance and the start nodes
+	 * (best first, separated by spaces), separated by tabs.
+	 *
+	 * @param rootsFile path to the roots file
+	 */
+    void readRoots(const std::string &rootsFile) {
+        std::ifstream in(rootsFile);
+        std::string line;
+        while(std::getline(in, line)) {
+            size_t first = line.find('\t');
+            size_t second = line.find('\t', first + 1);
+            if(first == std::string::npos || second == std::string::npos) continue;
+
+            std::vector<int> &nodes = startNodes[line.substr(first + 1, second - first - 1)][line.substr(0, first)];
+            std::stringstream indices(line.substr(second + 1));
+            int index;
+            while(indices >> index) {
+                nodes.push_back(index);
+            }
+        }
+        std::cout << "Read start nodes for " << startNodes.size() << " instances." << std::endl;
+    }
+
 
-        Graph G;
+	/**
+	 * Number of solves per separator of an instance, as planned before reading the instance (with predicted start
+	 * nodes, there may be fewer).
+	 *
+	 * @param nodes number of nodes of the instance (according to the property file)
+	 * @return the number of solves
+	 */
+    size_t plannedSolves(int nodes) const {
+        size_t solves = attempts <= 0 ? static_cast<size_t>(std::max(nodes, 0)) : static_cast<size_t>(attempts);
+        if(windowCount >= 0) {
+            size_t first = std::min(static_cast<size_t>(windowFirst), solves);
+            solves = std::min(solves - first, static_cast<size_t>(windowCount));
+        }
+        return solves;
+    }
+
+
+	/**
+	 * Writes the event that starts the progress log: the settings, the separators and the queue of instances (name,
+	 * nodes, edges and planned solves per separator, sizes are 0 if the instance is not in the property file).
+	 *
+	 * @param separators the separators
+	 * @param paths maps normalized path to path
+	 * @param queue the normalized paths of the instances to run, in order
+	 */
+    void writeStartEvent(const std::vector<std::unique_ptr<PlanarSeparatorModule>> &separators, std::map<std::string, std::string> &paths, const std::vector<std::string> &queue) {
+        std::string names = "[";
+        for(size_t i = 0; i < separators.size(); ++i) {
+            names += (i > 0 ? "," : "") + jsonString(separators[i]->getName());
+        }
+        names += "]";
+
+        std::string instances = "[";
+        for(size_t i = 0; i < queue.size(); ++i) {
+            PropertyRecorder::Properties prop = recorder.getProperties(paths[queue[i]]);
+            ProgressEvent instance("queued");
+            instance.add("instance", extractFullFileName(paths[queue[i]])).add("nodes", prop.nodes).add("edges", prop.edges).add("solves", plannedSolves(prop.nodes));
+            instances += (i > 0 ? "," : "") + instance.str();
+        }
+        instances += "]";
+
+        ProgressEvent event("start");
+        event.add("time", static_cast<long>(std::time(nullptr))).add("results", res_file).addJson("algorithms", names)
+            .add("attempts", attempts).add("postprocessing", postProcessing).add("threads", threads).addJson("queue", instances);
+        progress.write(event);
+    }
+
+
+	/**
+	 * Reads the instance at path, makes it simple and undirected and planar-embeds it. If an embedding cache is
+	 * used, the rotation system is read from the cache (keyed by the hash of the file contents) instead of
+	 * computing it, or stored in the cache after computing it.
+	 *
+	 * @param path the instance-path
+	 * @param G the graph to read the instance into
+	 */
+    void load(const std::string &path, Graph &G) {
         readGraph(G, path);
 
 		// ensure that conditions hold
 		makeSimpleUndirected(G);
-		planarEmbedPlanarGraph(G);
 
-        if(G.numberOfNodes() <= limit) {
+        if(embeddingCache.empty()) {
+            planarEmbedPlanarGraph(G);
+            return;
+        }
 
-            std::cout << "\t" << "with " << sep.getName() << std::endl;
+        std::stringstream cacheFile;
+        cacheFile << embeddingCache << "/" << std::hex << getHashCode(path) << ".rot";
+        if(!readRotationSystem(G, cacheFile.str())) {
+            planarEmbedPlanarGraph(G);
+            writeRotationSystem(G, cacheFile.str());
+        }
+    }
 
-			if(attempts <= 0) {
-				for (node no: G.nodes) {
-					// solve the instance with sep and all combinations of postprocessors
-					setSeed(42);
-					sep.setStartIndex(no->index());
-					solve(sep, G, prop);
-				}
-			} else {
-				sep.setStartIndex(-1);
-				for(int i = 0; i < attempts; i++) {
-					setSeed(i);
-					solve(sep, G, prop);
-				}
+
+	/**
+	 * Draws the random start nodes of the attempts: attempt i gets the node that G.chooseNode() picks after setSeed(i),
+	 * i.e. the node at position randomNumber(0, n-1) of G.nodes, drawn first from a std::mt19937 seeded with i.
+	 *
+	 * @param G the graph, not empty
+	 * @return the indices of the start nodes, one per attempt
+	 */
+    std::vector<int> drawStartIndices(const Graph &G) const {
+        std::vector<int> nodeIndices;
+        for (node no: G.nodes) {
+            nodeIndices.push_back(no->index());
+        }
+
+        std::vector<int> startIndices;
+        for(int i = 0; i < attempts; i++) {
+            std::mt19937 rng(i);
+            std::uniform_int_distribution<> distribution(0, static_cast<int>(nodeIndices.size()) - 1);
+            startIndices.push_back(nodeIndices[distribution(rng)]);
+        }
+        return startIndices;
+    }
+
+
+	/**
+	 * Applies a separator to an instance: either once per start node, or <attempts> many times with a random start
+	 * node (or with the predicted start nodes, if there are any for the instance and the separator). The solves are
+	 * independent, so they are distributed over the threads, every thread works with its own separator instance.
+	 * The seeding is the same as in a sequential run: solve i of a sweep over all start nodes is seeded with 42,
+	 * attempt i with i, and the random start node of attempt i is the node that G.chooseNode() picks after setSeed(i).
+	 * It is drawn from a stream of its own (see drawStartIndices), so the deterministic separators never touch OGDF's
+	 * shared random stream. Randomized separators (see usesRandomness) draw from it while separating, so only their
+	 * separation step runs under a lock, right after seeding the stream (see solve). Hence the results do not depend on
+	 * the number of threads (or on the window, if only a window of the solves is run). Results are collected per solve
+	 * and written in batches, in the order of the solves.
+	 *
+	 * @param G the graph, simple and planar embedded
+	 * @param prop properties of the graph
+	 * @param index position of the separator in createSeparators(selectedAlgorithms)
+	 * @param name the name of the separator
+	 */
+    void apply(const Graph &G, const PropertyRecorder::Properties &prop, size_t index, const std::string &name) {
+
+        std::cout << "\t" << "with " << name << std::endl;
+        double applyStart = progress.elapsed();
+
+        std::vector<int> startIndices;
+        bool drawn = false; // whether the start nodes are random
+		if(attempts <= 0) {
+			for (node no: G.nodes) {
+				startIndices.push_back(no->index());
 			}
+		} else if(startNodes.count(currentInstance) && startNodes[currentInstance].count(name)) {
+			for(int start : startNodes[currentInstance][name]) {
+				if(static_cast<int>(startIndices.size()) == attempts) break;
+				if(start < G.numberOfNodes()) startIndices.push_back(start);
+			}
+		} else if(!G.empty()) {
+			startIndices = drawStartIndices(G);
+			drawn = true;
+		}
+
+		// only run the window of solves, e.g. one unit of a distributed campaign (see scripts/work_queue.py)
+		size_t firstSolve = 0; // index of the first solve of the window among all solves
+		if(windowCount >= 0) {
+			firstSolve = std::min(static_cast<size_t>(windowFirst), startIndices.size());
+			size_t last = std::min(firstSolve + windowCount, startIndices.size());
+			startIndices = std::vector<int>(startIndices.begin() + firstSolve, startIndices.begin() + last);
+		}
+
+        size_t batchSize = 64 * threads;
+        for(size_t begin = 0; begin < startIndices.size(); begin += batchSize) {
+            size_t end = std::min(begin + batchSize, startIndices.size());
+
+            // every solve only writes into its own slot, so no locking is needed
+            std::vector<std::vector<Result>> results(end - begin);
+            std::atomic<size_t> next{begin};
+
+            auto worker = [&]() {
+                std::unique_ptr<PlanarSeparatorModule> sep = std::move(createSeparators(selectedAlgorithms)[index]);
+                bool randomized = usesRandomness(*sep);
+                for(size_t i = next++; i < end; i = next++) {
+                    // a randomized separator draws its random start node itself, from the seeded stream
+                    sep->setStartIndex(randomized && drawn ? -1 : startIndices[i]);
+                    int seed = attempts <= 0 ? 42 : static_cast<int>(firstSolve + i);
+
+                    // solve the instance with sep and all combinations of postprocessors
+                    solve(*sep, G, prop, results[i - begin], seed);
+                }
+            };
+
+            if(threads == 1) {
+                worker();
+            } else {
+                std::vector<std::thread> pool;
+                for(size_t t = 0; t < std::min(static_cast<size_t>(threads), end - begin); ++t) {
+                    pool.emplace_back(worker);
+                }
+                for(std::thread &thread : pool) {
+                    thread.join();
+                }
+            }
+
+            writeResults(results);
+
+            ProgressEvent event("progress");
+            progress.write(event.add("instance", currentInstance).add("algorithm", name).add("attempt", end).add("solves", startIndices.size()));
         }
 
+        ProgressEvent event("algorithm");
+        progress.write(event.add("instance", currentInstance).add("algorithm", name).add("nodes", G.numberOfNodes())
+                .add("solves", startIndices.size()).add("duration", progress.elapsed() - applyStart));
     }
 
 
@@ -252,16 +467,28 @@ private:
 	 * @param sep the separator
 	 * @param G the graph
 	 * @param prop properties of the graph
+	 * @param results the list to append the results to
+	 * @param seed the seed of OGDF's random stream for a randomized separator (see usesRandomness)
 	 */
-    void solve(PlanarSeparatorModule &sep, const Graph &G, const PropertyRecorder::Properties &prop) {
+    void solve(PlanarSeparatorModule &sep, const Graph &G, const PropertyRecorder::Properties &prop, std::vector<Result> &results, int seed) {
 
         List<node> separator;
         List<node> first;
         List<node> second;
 
-        auto start = std::chrono::high_resolution_clock::now();
-        sep.separate(G, separator, first, second, false);
-        auto end = std::chrono::high_resolution_clock::now();
+        std::chrono::high_resolution_clock::time_point start, end;
+        {
+            // the random stream is shared by all threads, so it is only held while separating (the postprocessors
+            // are deterministic and run in parallel)
+            std::unique_lock<std::mutex> lock(randomMutex, std::defer_lock);
+            if(usesRandomness(sep)) {
+                lock.lock();
+                setSeed(seed);
+            }
+            start = std::chrono::high_resolution_clock::now();
+            sep.separate(G, separator, first, second, false);
+            end = std::chrono::high_resolution_clock::now();
+        }
 
         // if test-flag is set, verify that the instance was solved correctly
         if(test) {
@@ -271,11 +498,10 @@ private:
         auto duration = std::chrono::duration_cast<std::chrono::microseconds>(end - start);
 
         // create a pure result
-        Result res(sep.getName(), prop, G.numberOfNodes(), G.numberOfEdges(), duration.count(), separator.size(), first.size(), second.size(), sep.getExitPoint());
-        writeResults(res);
+        results.emplace_back(sep.getName(), prop, G.numberOfNodes(), G.numberOfEdges(), duration.count(), separator.size(), first.size(), second.size(), sep.getExitPoint());
 
 		if(postProcessing) {
-			applyPostProcessors(G, sep.getName(), prop, separator, first, second);
+			applyPostProcessors(G, sep.getName(), prop, separator, first, second, results);
 		}
     }
 
@@ -284,7 +510,8 @@ private:
 	 * Applies all postprocessor and all possible combinations of postprocessors to a given solution.
 	 * This is done separately instead of adding the postprocessors to the separators directly, because that would mean
 	 * re-solving the instance for all combination of postprocessors.
-	 * The solution is passed by value, not by reference, on purpose.
+	 * The chains of postprocessors form a prefix tree, e.g. _DMD_NE continues from the result of _DMD, so every
+	 * intermediate solution is computed only once and shared by all chains that extend it.
 	 *
 	 * @param G the graph
 	 * @param name the name of the algorithm
@@ -292,52 +519,78 @@ private:
 	 * @param separator the list of separator nodes
 	 * @param first the first half of the graph
 	 * @param second the second half of the graph
+	 * @param results the list to append the results to
 	 */
-    void applyPostProcessors(const Graph &G, const std::string &name, const PropertyRecorder::Properties &prop, List<node> separator, List<node> first, List<node> second) {
+    void applyPostProcessors(const Graph &G, const std::string &name, const PropertyRecorder::Properties &prop, const List<node> &separator, const List<node> &first, const List<node> &second, std::vector<Result> &results) {
 
-        // currently, 2 post-processors
-        NodeExpulsor expulsor;
-        DMDecomposer decomposer;
+        // currently, 3 post-processors
+        std::vector<std::unique_ptr<Postprocessor>> postProcessors;
+        postProcessors.push_back(createPostprocessor("NE"));
+        postProcessors.push_back(createPostprocessor("DMD"));
+        postProcessors.push_back(createPostprocessor("FM"));
 
-        std::vector<Postprocessor*> postProcessors;
-        postProcessors.push_back(nullptr);
-        postProcessors.push_back( &expulsor );
-        postProcessors.push_back( &decomposer );
+        std::vector<bool> used(postProcessors.size(), false);
+        extendChain(G, name, prop, postProcessors, used, separator, first, second, 0, results);
+    }
 
-        // 4. solve with all permutations of postProcessors
-        do {
-			if(postProcessors.front() == nullptr) continue;
+
+	/**
+	 * Extends a chain of postprocessors by every postprocessor that is not yet part of it, writes the results and
+	 * recurses (depth first traversal of the prefix tree of all chains).
+	 * Every stage is timed on its own, the time of a chain is the sum of the times of its stages.
+	 *
+	 * @param G the graph
+	 * @param name the name of the algorithm, followed by the names of the postprocessors in the chain
+	 * @param prop the properties of the graph
+	 * @param postProcessors all postprocessors
+	 * @param used marks the postprocessors that are already part of the chain
+	 * @param separator the list of separator nodes after the chain
+	 * @param first the first half of the graph after the chain
+	 * @param second the second half of the graph after the chain
+	 * @param time the time in microseconds that the chain took
+	 * @param results the list to append the results to
+	 */
+    void extendChain(const Graph &G, const std::string &name, const PropertyRecorder::Properties &prop, const std::vector<std::unique_ptr<Postprocessor>> &postProcessors, std::vector<bool> &used, const List<node> &separator, const List<node> &first, const List<node> &second, long time, std::vector<Result> &results) {
+
+        for(size_t i = 0; i < postProcessors.size(); ++i) {
+            if(used[i]) continue;
 
 			List<node> separatorCopy = separator;
 			List<node> firstCopy = first;
 			List<node> secondCopy = second;
 
-            std::string postName = "";
             auto start = std::chrono::high_resolution_clock::now();
-            for(const auto post : postProcessors) {
-                if(post == nullptr) break;
-                post->apply(G, separatorCopy, firstCopy, secondCopy);
-                postName += "_" + post->getName();
-            }
+            postProcessors[i]->apply(G, separatorCopy, firstCopy, secondCopy);
             auto end = std::chrono::high_resolution_clock::now();
-            auto duration = std::chrono::duration_cast<std::chrono::microseconds>(end - start);
+            long chainTime = time + std::chrono::duration_cast<std::chrono::microseconds>(end - start).count();
 
-            Result res(name+postName, prop, G.numberOfNodes(), G.numberOfEdges(), duration.count(), separatorCopy.size(), firstCopy.size(), secondCopy.size(), "post");
-            writeResults(res);
+            std::string chainName = name + "_" + postProcessors[i]->getName();
+            results.emplace_back(chainName, prop, G.numberOfNodes(), G.numberOfEdges(), chainTime, separatorCopy.size(), firstCopy.size(), secondCopy.size(), "post");
 
-        } while (std::next_permutation(postProcessors.begin(), postProcessors.end()));
+            used[i] = true;
+            extendChain(G, chainName, prop, postProcessors, used, separatorCopy, firstCopy, secondCopy, chainTime, results);
+            used[i] = false;
+        }
     }
 
 
 	/**
-	 * Writes a result into the csv file.
+	 * Passes a batch of results to the result sink, each result once for the instance and once for each of its
+	 * duplicates.
 	 *
-	 * @param res the result-object
+	 * @param results the results, grouped by solve
 	 */
-    void writeResults(const Result &res) {
-        file.open(res_file, std::ios_base::app);
-        file << res.to_csv();
-        file.close();
+    void writeResults(const std::vector<std::vector<Result>> &results) {
+        for(const auto &solveResults : results) {
+            for(const Result &res : solveResults) {
+                sink->write(res);
+                for(const auto &prop : aliasProperties) {
+                    Result copy = res;
+                    copy.prop = &prop;
+                    sink->write(copy);
+                }
+            }
+        }
     }
 
 };
@@ -347,14 +600,25 @@ private:
  * Parses command line arguments and starts experiments as specified.
  *
  * === Command Line Arguments ===
- *      -r (results) = path to csv-file that will hold results
- *      -i (instances) = path to directory that contains instances (.gml, .stp)
+ *      -r (results) = path to csv-file that will hold results (or .psr-file for binary records, see result.h)
+ *      -i (instances) = path to directory that contains instances (.gml, .stp), or to a single instance file
  *      -p (properties) = path to xml-file as generated by record_properties.cpp that holds instance properties
  *      -l (limit) = size limit for instances in nodes, larger instances are skipped
  *      -t (test) = whether the generated results should be tested for correctness
  *      -a (attempts) = how many times to solve each instance with each algorithm
  *      -A (Algorithm) = which algorithm should be used, default is all
  *      -P (postprocessing) = whether to apply postprocessing or not
+ *      -d (duplicates) = path to xml-file as generated by scripts/deduplicate.py that lists duplicate instances
+ *      -s (selection) = path to file with the names of the instances to run, as generated by scripts/catalog.py
+ *      -c (cache) = directory of the embedding cache, pass "" to compute all embeddings from scratch
+ *      -j (threads) = number of threads that solve an instance concurrently (0 = all cores), note that timings are
+ *                     measured per solve and may be affected by other threads
+ *      -R (roots) = path to file with predicted start nodes as generated by scripts/root_index.py, attempts use them
+ *                   instead of random start nodes
+ *      -w (window) = "first:count", only run the solves (start nodes or attempts) first, ..., first+count-1 of each
+ *                    instance, as used by the workers of scripts/work_queue.py
+ *      -e (events) = path to a file or pipe that progress events are appended to as json lines, to be followed by
+ *                    scripts/monitor.py
  * ==============================
  *
  * === Version ===
@@ -370,6 +634,14 @@ int main(int argc, char **argv) {
     std::string res_file = "../results/data_" + currentTime() + version + ".csv"; // location to write results to
     std::string instance_path = "../instances/";                        // instance location
     std::string property_file = "../instances/properties.xml";          // where to look for properties
+    std::string alias_file = "../instances/aliases.xml";                // where to look for duplicate instances
+    std::string selection_file = "";                                    // which instances to run (all if empty)
+    std::string embedding_cache = "../instances/.embeddings";           // where to cache planar embeddings
+    int threads = 1;                                                    // threads per instance, 0 = all cores
+    int window_first = 0;                                               // first solve to run
+    int window_count = -1;                                              // number of solves to run, all if < 0
+    std::string roots_file = "";                                        // predicted start nodes (random if empty)
+    std::string event_file = "";                                        // progress events (none if empty)
     int attempts = 20;
     int size_limit = 1000000;                                           // size limit (in nodes) up to which instances are attempted
     bool test_results = false;                                          // whether to test results to confirm correctness
@@ -378,7 +650,7 @@ int main(int argc, char **argv) {
 
     /* command line argument parsing */
     int opt;
-    while ((opt = getopt(argc, argv, "r:i:p:l:a:A:tP")) != -1) { // : means arg takes a value
+    while ((opt = getopt(argc, argv, "r:i:p:l:a:A:tPd:s:c:j:w:R:e:")) != -1) { // : means arg takes a value
         switch (opt) {
             case 'r':
                 res_file = optarg;
@@ -401,14 +673,36 @@ int main(int argc, char **argv) {
 			case 'P':
 				postprocessing = true;
 				break;
-			case 'A': {
-				std::string names = optarg;
-				algorithm = 0;
-				if (names.find("LipTar") != std::string::npos) algorithm |= LT;
-				if (names.find("LTFC")   != std::string::npos) algorithm |= LTFC;
-				if (names.find("Dual")   != std::string::npos) algorithm |= D;
-				if (names.find("DFC")    != std::string::npos) algorithm |= DFC;
-				if (names.find("HP")     != std::string::npos) algorithm |= HP;
+			case 'A':
+				algorithm = parseAlgorithms(optarg);
+				break;
+			case 'd':
+				alias_file = optarg;
+				break;
+			case 's':
+				selection_file = optarg;
+				break;
+			case 'c':
+				embedding_cache = optarg;
+				break;
+			case 'j':
+				threads = std::stoi(optarg);
+				break;
+			case 'R':
+				roots_file = optarg;
+				break;
+			case 'e':
+				event_file = optarg;
+				break;
+			case 'w': {
+				std::string window = optarg;
+				size_t colon = window.find(':');
+				if(colon == std::string::npos) {
+					std::cout << "Window must be given as first:count!" << std::endl;
+					return 1;
+				}
+				window_first = std::stoi(window.substr(0, colon));
+				window_count = std::stoi(window.substr(colon + 1));
 				break;
 			}
             case '?':
@@ -426,8 +720,15 @@ int main(int argc, char **argv) {
         << "instance path:   " << instance_path << "\n"
         << "result file:     " << res_file << "\n"
         << "property file:   " << property_file << "\n"
+        << "alias file:      " << alias_file << "\n"
+        << "selection file:  " << (selection_file.empty() ? "none" : selection_file) << "\n"
+        << "start nodes:     " << (roots_file.empty() ? "random" : roots_file) << "\n"
+        << "embedding cache: " << (embedding_cache.empty() ? "none" : embedding_cache) << "\n"
         << "size limit:      " << size_limit << "\n"
         << "attempts:        " << attempts << "\n"
+        << "threads:         " << (threads > 0 ? std::to_string(threads) : "all") << "\n"
+        << "progress events: " << (event_file.empty() ? "none" : event_file) << "\n"
+        << "window:          " << (window_count < 0 ? "all" : std::to_string(window_first) + ":" + std::to_string(window_count)) << "\n"
         << "testing results: " << (test_results ? "yes" : "no") << "\n"
 		<< "postprocessing:  " << (postprocessing ? "yes" : "no") << "\n"
         << std::endl;
@@ -435,7 +736,7 @@ int main(int argc, char **argv) {
 
     /* experiments */
     setSeed(42);
-    Experiment exp(res_file, instance_path, property_file, size_limit, test_results, attempts, algorithm, postprocessing);
+    Experiment exp(res_file, instance_path, property_file, size_limit, test_results, attempts, algorithm, postprocessing, alias_file, selection_file, embedding_cache, threads, window_first, window_count, roots_file, event_file);
     exp.run();
 
     return 0;
@@ -0,0 +1,98 @@
+#include <progress.h>
+#include <cmath>
+#include <cstdio>
+
+// ========== event ========== //
+
+ProgressEvent::ProgressEvent(const std::string &type) {
+    json = "{\"event\":" + jsonString(type);
+}
+
+ProgressEvent &ProgressEvent::add(const std::string &key, const std::string &value) {
+    return addJson(key, jsonString(value));
+}
+
+ProgressEvent &ProgressEvent::add(const std::string &key, const char *value) {
+    return addJson(key, jsonString(value));
+}
+
+ProgressEvent &ProgressEvent::add(const std::string &key, int value) {
+    return addJson(key, std::to_string(value));
+}
+
+ProgressEvent &ProgressEvent::add(const std::string &key, long value) {
+    return addJson(key, std::to_string(value));
+}
+
+ProgressEvent &ProgressEvent::add(const std::string &key, unsigned long value) {
+    return addJson(key, std::to_string(value));
+}
+
+ProgressEvent &ProgressEvent::add(const std::string &key, double value) {
+    if(!std::isfinite(value)) {
+        return addJson(key, "null");
+    }
+    char buffer[32];
+    std::snprintf(buffer, sizeof(buffer), "%.6g", value);
+    return addJson(key, buffer);
+}
+
+ProgressEvent &ProgressEvent::add(const std::string &key, bool value) {
+    return addJson(key, value ? "true" : "false");
+}
+
+ProgressEvent &ProgressEvent::addJson(const std::string &key, const std::string &value) {
+    json += ',';
+    json += jsonString(key);
+    json += ':';
+    json += value;
+    return *this;
+}
+
+std::string ProgressEvent::str() const {
+    return json + "}";
+}
+
+std::string jsonString(const std::string &value) {
+    std::string result = "\"";
+    for(char c : value) {
+        switch(c) {
+            case '"': result += "\\\""; break;
+            case '\\': result += "\\\\"; break;
+            case '\n': result += "\\n"; break;
+            case '\t': result += "\\t"; break;
+            case '\r': result += "\\r"; break;
+            default:
+                if(static_cast<unsigned char>(c) < 0x20) {
+                    char buffer[8];
+                    std::snprintf(buffer, sizeof(buffer), "\\u%04x", c);
+                    result += buffer;
+                } else {
+                    result += c;
+                }
+        }
+    }
+    return result + "\"";
+}
+
+// ========== log ========== //
+
+ProgressLog::ProgressLog(const std::string &file) : start{std::chrono::steady_clock::now()} {
+    if(!file.empty()) {
+        out = std::make_unique<std::ofstream>(file, std::ios::app);
+    }
+}
+
+bool ProgressLog::enabled() const {
+    return out != nullptr;
+}
+
+void ProgressLog::write(ProgressEvent &event) {
+    if(!out) return;
+    event.add("elapsed", elapsed());
+    *out << event.str() << std::endl;
+}
+
+double ProgressLog::elapsed() const {
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
@@ -1,8 +1,125 @@
 #include <property_recorder.h>
+#include <ogdf/basic/simple_graph_alg.h>
+#include <ogdf/basic/extended_graph_alg.h>
+#include <ogdf/basic/CombinatorialEmbedding.h>
+#include <algorithm>
+#include <random>
+#include <sstream>
+#include <thread>
 
 namespace fs = std::filesystem;
 
-PropertyRecorder::PropertyRecorder(const std::string &file) : fileName{file} {
+namespace {
+
+	/**
+	 * Formats a histogram as "key:count key:count ...".
+	 */
+	std::string histogramToString(const std::map<int, int> &histogram) {
+		std::stringstream ss;
+		bool first = true;
+		for(const auto &entry : histogram) {
+			ss << (first ? "" : " ") << entry.first << ":" << entry.second;
+			first = false;
+		}
+		return ss.str();
+	}
+
+	std::map<int, int> histogramFromString(const char* text) {
+		std::map<int, int> histogram;
+		std::stringstream ss(text != nullptr ? text : "");
+		int key, count;
+		char colon;
+		while(ss >> key >> colon >> count) {
+			histogram[key] = count;
+		}
+		return histogram;
+	}
+
+	std::string listToString(const std::vector<int> &list) {
+		std::stringstream ss;
+		for(size_t i = 0; i < list.size(); ++i) {
+			ss << (i > 0 ? " " : "") << list[i];
+		}
+		return ss.str();
+	}
+
+	std::vector<int> listFromString(const char* text) {
+		std::vector<int> list;
+		std::stringstream ss(text != nullptr ? text : "");
+		int value;
+		while(ss >> value) {
+			list.push_back(value);
+		}
+		return list;
+	}
+
+	/**
+	 * Calculates the number of nodes per BFS level for every root. The graph is passed in CSR-format, so the threads
+	 * only read from plain arrays and every thread works on its own share of the roots.
+	 *
+	 * @param offsets the neighbours of node v are targets[offsets[v]] ... targets[offsets[v+1]-1]
+	 * @param targets the concatenated neighbour lists
+	 * @param roots the roots
+	 * @param threads number of threads
+	 * @return one level width profile per root
+	 */
+	std::vector<std::vector<int>> calculateLevelWidths(const std::vector<int> &offsets, const std::vector<int> &targets, const std::vector<int> &roots, int threads) {
+		std::vector<std::vector<int>> widths(roots.size());
+
+		auto worker = [&](int t) {
+			int n = offsets.size() - 1;
+			std::vector<int> level(n);
+			std::vector<int> queue(n);
+			for(size_t i = t; i < roots.size(); i += threads) {
+				std::fill(level.begin(), level.end(), -1);
+				std::vector<int> &width = widths[i];
+				int head = 0;
+				int tail = 0;
+				queue[tail++] = roots[i];
+				level[roots[i]] = 0;
+				// nodes are dequeued level by level, so a new level starts whenever level[v] == width.size()
+				while(head < tail) {
+					int v = queue[head++];
+					if(level[v] == static_cast<int>(width.size())) width.push_back(0);
+					width[level[v]]++;
+					for(int k = offsets[v]; k < offsets[v+1]; ++k) {
+						int w = targets[k];
+						if(level[w] == -1) {
+							level[w] = level[v] + 1;
+							queue[tail++] = w;
+						}
+					}
+				}
+			}
+		};
+
+		std::vector<std::thread> pool;
+		for(int t = 0; t < threads; ++t) {
+			pool.emplace_back(worker, t);
+		}
+		for(std::thread &thread : pool) {
+			thread.join();
+		}
+		return widths;
+	}
+
+	/**
+	 * @param widths a level width profile
+	 * @return the width of the level that contains the median node
+	 */
+	int middleLevelWidth(const std::vector<int> &widths) {
+		int total = 0;
+		for(int width : widths) total += width;
+		int seen = 0;
+		for(int width : widths) {
+			seen += width;
+			if(2 * seen >= total) return width;
+		}
+		return 0;
+	}
+}
+
+PropertyRecorder::PropertyRecorder(const std::string &file, int samples, int threads) : fileName{file}, samples{samples}, threads{threads} {
 
     // check if xml-property-file already exists
     // if yes, populate dictionary by scanning the file and setting the properties
@@ -37,6 +154,18 @@ void PropertyRecorder::readInstanceProperties(tinyxml2::XMLNode* inst) {
     prop.diameter_uB = atoi(inst->FirstChildElement("diameter_uB")->GetText());
     prop.radius = atoi(inst->FirstChildElement("radius")->GetText());
 
+    // structural statistics are optional, older property files do not contain them
+    tinyxml2::XMLElement* structure = inst->FirstChildElement("structure");
+    if(structure != nullptr) {
+        prop.middleWidth = atoi(structure->FirstChildElement("middle_width")->GetText());
+        for(tinyxml2::XMLElement* levels = structure->FirstChildElement("levels"); levels != nullptr; levels = levels->NextSiblingElement("levels")) {
+            prop.roots.push_back(levels->IntAttribute("root"));
+            prop.levelWidths.push_back(listFromString(levels->GetText()));
+        }
+        prop.faceSizes = histogramFromString(structure->FirstChildElement("face_sizes")->GetText());
+        prop.degrees = histogramFromString(structure->FirstChildElement("degrees")->GetText());
+    }
+
     propMap[identifier] = prop;
 }
 
@@ -97,6 +226,61 @@ void PropertyRecorder::processInstance(std::string path) {
         propMap[identifier].name = extractFullFileName(path);
     }
 
+    if(propMap[identifier].levelWidths.empty()) {
+        makeSimpleUndirected(G);
+        planarEmbedPlanarGraph(G);
+        calculateStructure(G, propMap[identifier]);
+    }
+
+}
+
+void PropertyRecorder::calculateStructure(const Graph &G, Properties &prop) const {
+
+    // CSR-representation, node ids follow the order of the nodes in the file
+    NodeArray<int> id(G);
+    int n = 0;
+    for(node v : G.nodes) id[v] = n++;
+
+    std::vector<int> offsets;
+    std::vector<int> targets;
+    offsets.reserve(n + 1);
+    targets.reserve(2 * G.numberOfEdges());
+    offsets.push_back(0);
+    prop.degrees.clear();
+    for(node v : G.nodes) {
+        for(adjEntry adj : v->adjEntries) {
+            targets.push_back(id[adj->twinNode()]);
+        }
+        offsets.push_back(targets.size());
+        prop.degrees[v->degree()]++;
+    }
+
+    // deterministic sample of roots
+    prop.roots.clear();
+    if(n > 0) {
+        std::mt19937 rng(42);
+        std::uniform_int_distribution<int> distribution(0, n - 1);
+        for(int i = 0; i < std::min(samples, n); ++i) {
+            prop.roots.push_back(distribution(rng));
+        }
+    }
+
+    int numThreads = std::max(1, std::min(threads, static_cast<int>(prop.roots.size())));
+    prop.levelWidths = calculateLevelWidths(offsets, targets, prop.roots, numThreads);
+
+    prop.middleWidth = -1;
+    for(const std::vector<int> &widths : prop.levelWidths) {
+        int width = middleLevelWidth(widths);
+        if(prop.middleWidth == -1 || width < prop.middleWidth) {
+            prop.middleWidth = width;
+        }
+    }
+
+    prop.faceSizes.clear();
+    ConstCombinatorialEmbedding E(G);
+    for(face f : E.faces) {
+        prop.faceSizes[f->size()]++;
+    }
 }
 
 void PropertyRecorder::exportData() {
@@ -112,6 +296,18 @@ void PropertyRecorder::exportData() {
         instance->InsertNewChildElement("radius")->SetText(to_string(prop.second.radius).c_str());
         instance->InsertNewChildElement("diameter_lB")->SetText(to_string(prop.second.diameter_lB).c_str());
         instance->InsertNewChildElement("diameter_uB")->SetText(to_string(prop.second.diameter_uB).c_str());
+
+        if(!prop.second.levelWidths.empty()) {
+            tinyxml2::XMLElement* structure = instance->InsertNewChildElement("structure");
+            structure->InsertNewChildElement("middle_width")->SetText(to_string(prop.second.middleWidth).c_str());
+            for(size_t i = 0; i < prop.second.levelWidths.size(); ++i) {
+                tinyxml2::XMLElement* levels = structure->InsertNewChildElement("levels");
+                levels->SetAttribute("root", prop.second.roots[i]);
+                levels->SetText(listToString(prop.second.levelWidths[i]).c_str());
+            }
+            structure->InsertNewChildElement("face_sizes")->SetText(histogramToString(prop.second.faceSizes).c_str());
+            structure->InsertNewChildElement("degrees")->SetText(histogramToString(prop.second.degrees).c_str());
+        }
     }
     doc.InsertFirstChild(instances);
     doc.SaveFile(fileName.c_str());
@@ -0,0 +1,154 @@
+#include <result.h>
+#include <algorithm>
+#include <cstdint>
+#include <sstream>
+
+// ========== result ========== //
+
+Result::Result(const std::string &algorithm, const PropertyRecorder::Properties &prop, int nodes, int edges, long time, int sepSize, int firstSize, int secondSize, const std::string &exitPoint)
+    : algorithm{algorithm}, prop{&prop}, nodes{nodes}, edges{edges}, time{time}, sepSize{sepSize}, exitPoint{exitPoint} {
+
+    shortSize = std::min(firstSize, secondSize);
+    longSize = std::max(firstSize, secondSize);
+
+    balance = shortSize / (double) longSize;
+    ratio = sepSize / (double) shortSize;
+}
+
+std::string Result::to_csv() const {
+
+    std::string result;
+    result.reserve(128);
+    result += algorithm;
+    result += ',';
+    result += prop->name;
+    result += ',';
+    for(long val : {(long) nodes, (long) edges, (long) prop->diameter, (long) prop->diameter_lB, (long) prop->diameter_uB, (long) prop->radius, time, (long) sepSize}) {
+        result += std::to_string(val);
+        result += ',';
+    }
+    result += std::to_string(balance);
+    result += ',';
+    result += std::to_string(ratio);
+    result += ',';
+    result += exitPoint;
+    result += '\n';
+
+    return result;
+}
+
+std::string Result::get_head() {
+    return "algorithm,instance,nodes,edges,diameter,diam_lB,diam_uB,radius,time,sep_size,balance,ratio,exit\n";
+}
+
+// ========== csv ========== //
+
+CsvResultSink::CsvResultSink(const std::string &file, size_t blockSize) : fileName{file}, blockSize{blockSize} {
+    std::ofstream out(fileName);
+    out << Result::get_head();
+}
+
+CsvResultSink::~CsvResultSink() {
+    flush();
+}
+
+void CsvResultSink::write(const Result &res) {
+    buffer += res.to_csv();
+    if(++buffered >= blockSize) {
+        flush();
+    }
+}
+
+void CsvResultSink::flush() {
+    if(buffer.empty()) return;
+    std::ofstream out(fileName, std::ios_base::app);
+    out << buffer;
+    buffer.clear();
+    buffered = 0;
+}
+
+// ========== binary ========== //
+
+namespace {
+    const char resultMagic[8] = {'P', 'S', 'R', 'E', 'S', '0', '1', '\n'};
+
+    template<typename T>
+    void append(std::vector<char> &buffer, T value) {
+        // the records are little endian, like all platforms the experiments run on
+        const char* bytes = reinterpret_cast<const char*>(&value);
+        buffer.insert(buffer.end(), bytes, bytes + sizeof(T));
+    }
+}
+
+BinaryResultSink::BinaryResultSink(const std::string &file, size_t blockSize) : fileName{file}, blockSize{blockSize} {
+    std::vector<char> header(resultMagic, resultMagic + sizeof(resultMagic));
+    append<uint32_t>(header, recordSize);
+    append<uint32_t>(header, 0);
+
+    std::ofstream out(fileName, std::ios::binary);
+    out.write(header.data(), header.size());
+    std::ofstream dictionary(fileName + ".dict");
+
+    buffer.reserve(blockSize * recordSize);
+}
+
+BinaryResultSink::~BinaryResultSink() {
+    flush();
+}
+
+template<typename T>
+T BinaryResultSink::encode(std::map<std::string, T> &dictionary, const std::string &kind, const std::string &name, const Result* instance) {
+    auto it = dictionary.find(name);
+    if(it != dictionary.end()) return it->second;
+
+    T code = dictionary.size();
+    dictionary[name] = code;
+
+    std::stringstream entry;
+    entry << kind << " " << code << " ";
+    if(instance != nullptr) {
+        entry << instance->nodes << " " << instance->edges << " " << instance->prop->diameter << " "
+              << instance->prop->diameter_lB << " " << instance->prop->diameter_uB << " " << instance->prop->radius << " ";
+    }
+    entry << name << "\n";
+    dictionaryBuffer += entry.str();
+    return code;
+}
+
+void BinaryResultSink::write(const Result &res) {
+
+    append<uint32_t>(buffer, encode(instances, "instance", res.prop->name, &res));
+    append<uint16_t>(buffer, encode(algorithms, "algorithm", res.algorithm));
+    append<uint16_t>(buffer, encode(exitPoints, "exit", res.exitPoint));
+    append<int64_t>(buffer, res.time);
+    append<int32_t>(buffer, res.sepSize);
+    append<int32_t>(buffer, res.shortSize);
+    append<int32_t>(buffer, res.longSize);
+
+    if(buffer.size() >= blockSize * recordSize) {
+        flush();
+    }
+}
+
+void BinaryResultSink::flush() {
+    // the dictionary is written first, so every code in the result file can be decoded
+    if(!dictionaryBuffer.empty()) {
+        std::ofstream dictionary(fileName + ".dict", std::ios_base::app);
+        dictionary << dictionaryBuffer;
+        dictionaryBuffer.clear();
+    }
+    if(!buffer.empty()) {
+        std::ofstream out(fileName, std::ios_base::app | std::ios::binary);
+        out.write(buffer.data(), buffer.size());
+        buffer.clear();
+    }
+}
+
+// ========== factory ========== //
+
+std::unique_ptr<ResultSink> createResultSink(const std::string &file) {
+    if(file.size() >= 4 && file.substr(file.size() - 4) == ".psr") {
+        return std::make_unique<BinaryResultSink>(file);
+    }
+    return std::make_unique<CsvResultSink>(file);
+}
@@ -0,0 +1,115 @@
+#include <ogdf/basic/simple_graph_alg.h>
+#include <ogdf/basic/extended_graph_alg.h>
+
+#include <iostream>
+#include <fstream>
+#include <sstream>
+#include <unistd.h>
+
+#include <utils.h>
+#include <separators.h>
+
+using namespace ogdf;
+
+/**
+ * Writes a list of nodes as one line of space-separated node indices.
+ *
+ * @param os the stream to write to
+ * @param list the nodes
+ */
+void writeNodes(std::ostream &os, const List<node> &list) {
+	bool first = true;
+	for(node no : list) {
+		os << (first ? "" : " ") << no->index();
+		first = false;
+	}
+	os << "\n";
+}
+
+/**
+ * Separates a single instance with one algorithm and a chain of postprocessors.
+ * This is the building block for tools that apply separators recursively (e.g. scripts/nested_dissection.py).
+ *
+ * === Command Line Arguments ===
+ *      -i (instance) = path to the graph file (.gml, .chaco, .stp)
+ *      -o (output) = path to the output file, default is stdout
+ *      -A (Algorithm) = which algorithm to use (LipTar, LTFC, Dual, DFC, HP), default is Dual
+ *      -P (postprocessors) = comma-separated chain of postprocessors, e.g. NE,DMD
+ *      -s (seed) = random seed
+ * ==============================
+ *
+ * === Output ===
+ * 		three lines with the node indices of the separator, the first half and the second half
+ * ==============
+ */
+int main(int argc, char **argv) {
+
+	std::string instance_path;
+	std::string output;
+	short algorithm = D;
+	std::string postprocessors;
+	int seed = 42;
+
+	int opt;
+	while ((opt = getopt(argc, argv, "i:o:A:P:s:")) != -1) {
+		switch (opt) {
+			case 'i':
+				instance_path = optarg;
+				break;
+			case 'o':
+				output = optarg;
+				break;
+			case 'A':
+				algorithm = parseAlgorithms(optarg);
+				break;
+			case 'P':
+				postprocessors = optarg;
+				break;
+			case 's':
+				seed = std::stoi(optarg);
+				break;
+			default:
+				std::cerr << "Could not parse command line arguments!" << std::endl;
+				return 1;
+		}
+	}
+
+	// exactly one separator is used, if several are selected the first one is taken
+	std::vector<std::unique_ptr<PlanarSeparatorModule>> separators = createSeparators(algorithm);
+	if(instance_path.empty() || separators.empty()) {
+		std::cerr << "Usage: separate -i <instance> [-o <output>] [-A <algorithm>] [-P <postprocessors>] [-s <seed>]" << std::endl;
+		return 1;
+	}
+
+	Graph G;
+	readGraph(G, instance_path);
+	makeSimpleUndirected(G);
+	planarEmbedPlanarGraph(G);
+
+	List<node> separator;
+	List<node> first;
+	List<node> second;
+
+	setSeed(seed);
+	separators.front()->separate(G, separator, first, second, false);
+
+	std::stringstream chain(postprocessors);
+	std::string name;
+	while(std::getline(chain, name, ',')) {
+		if(!name.empty()) {
+			createPostprocessor(name)->apply(G, separator, first, second);
+		}
+	}
+
+	std::ofstream file;
+	if(!output.empty()) {
+		file.open(output);
+	}
+	std::ostream &os = output.empty() ? std::cout : file;
+
+	writeNodes(os, separator);
+	writeNodes(os, first);
+	writeNodes(os, second);
+
+	return 0;
+}
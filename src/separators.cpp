@@ -0,0 +1,43 @@
+#include <separators.h>
+#include <fm_refiner.h>
+#include <ogdf/graphalg/SeparatorLiptonTarjan.h>
+#include <ogdf/graphalg/SeparatorLiptonTarjanFC.h>
+#include <ogdf/graphalg/SeparatorDual.h>
+#include <ogdf/graphalg/SeparatorDualFC.h>
+#include <ogdf/graphalg/SeparatorHarPeled.h>
+
+short parseAlgorithms(const std::string &names) {
+	short algorithm = 0;
+	if (names.find("LipTar") != std::string::npos) algorithm |= LT;
+	if (names.find("LTFC")   != std::string::npos) algorithm |= LTFC;
+	if (names.find("Dual")   != std::string::npos) algorithm |= D;
+	if (names.find("DFC")    != std::string::npos) algorithm |= DFC;
+	if (names.find("HP")     != std::string::npos) algorithm |= HP;
+	return algorithm;
+}
+
+std::vector<std::unique_ptr<PlanarSeparatorModule>> createSeparators(short selection) {
+	std::vector<std::unique_ptr<PlanarSeparatorModule>> separators;
+	if(selection & LT)
+		separators.emplace_back(new SeparatorLiptonTarjan(true, 2));
+	if(selection & D)
+		separators.emplace_back(new SeparatorDual(true, 2));
+	if(selection & LTFC)
+		separators.emplace_back(new SeparatorLiptonTarjanFC(true));
+	if(selection & DFC)
+		separators.emplace_back(new SeparatorDualFC(true));
+	if(selection & HP)
+		separators.emplace_back(new SeparatorHarPeled());
+	return separators;
+}
+
+bool usesRandomness(const PlanarSeparatorModule &sep) {
+	return dynamic_cast<const SeparatorHarPeled*>(&sep) != nullptr;
+}
+
+std::unique_ptr<Postprocessor> createPostprocessor(const std::string &name) {
+	if(name == "NE") return std::unique_ptr<Postprocessor>(new NodeExpulsor());
+	if(name == "DMD") return std::unique_ptr<Postprocessor>(new DMDecomposer());
+	if(name == "FM") return std::unique_ptr<Postprocessor>(new FMRefiner());
+	throw std::invalid_argument("Unknown postprocessor " + name);
+}
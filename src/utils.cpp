@@ -2,6 +2,10 @@
 #include <utils.h>
 #include <ogdf/basic/simple_graph_alg.h>
 #include <climits>
+#include <algorithm>
+#include <cstdio>
+#include <fstream>
+#include <random>
 #include <ogdf/graphalg/SeparatorHarPeled.h>
 #include <ogdf/graphalg/SeparatorDual.h>
 
@@ -32,6 +36,77 @@ unsigned long getHashCode(std::string path) {
     return std::hash<std::string>()(buffer.str());
 }
 
+namespace {
+	const char rotationMagic[4] = {'R', 'O', 'T', '1'};
+
+	void writeUInt(std::ofstream &out, uint32_t value) {
+		out.write(reinterpret_cast<const char*>(&value), sizeof(value));
+	}
+
+	bool readUInt(std::ifstream &in, uint32_t &value) {
+		return static_cast<bool>(in.read(reinterpret_cast<char*>(&value), sizeof(value)));
+	}
+}
+
+void writeRotationSystem(const Graph &G, const std::string &file) {
+	NodeArray<uint32_t> index(G);
+	uint32_t i = 0;
+	for(node v : G.nodes) index[v] = i++;
+
+	// write to a temporary file first, so that concurrent runs never see a partial cache entry (the name is unique,
+	// as runs on several hosts may share the cache)
+	std::string tmpFile = file + "." + std::to_string(std::random_device{}()) + ".tmp";
+	std::ofstream out(tmpFile, std::ios::binary);
+	out.write(rotationMagic, sizeof(rotationMagic));
+	writeUInt(out, G.numberOfNodes());
+	writeUInt(out, G.numberOfEdges());
+	for(node v : G.nodes) {
+		writeUInt(out, v->degree());
+		for(adjEntry adj : v->adjEntries) {
+			writeUInt(out, index[adj->twinNode()]);
+		}
+	}
+	out.close();
+	std::rename(tmpFile.c_str(), file.c_str());
+}
+
+bool readRotationSystem(Graph &G, const std::string &file) {
+	std::ifstream in(file, std::ios::binary);
+	if(!in) return false;
+
+	char magic[4];
+	uint32_t n, m;
+	in.read(magic, sizeof(magic));
+	if(!in || !std::equal(magic, magic + 4, rotationMagic)) return false;
+	if(!readUInt(in, n) || !readUInt(in, m)) return false;
+	if(n != static_cast<uint32_t>(G.numberOfNodes()) || m != static_cast<uint32_t>(G.numberOfEdges())) return false;
+
+	std::vector<node> byIndex;
+	byIndex.reserve(n);
+	for(node v : G.nodes) byIndex.push_back(v);
+
+	NodeArray<adjEntry> towards(G, nullptr); // adjacency entry of the current node towards a neighbour
+	std::vector<uint32_t> rotation;
+	for(node v : G.nodes) {
+		uint32_t degree;
+		if(!readUInt(in, degree) || degree != static_cast<uint32_t>(v->degree())) return false;
+		rotation.resize(degree);
+		if(!in.read(reinterpret_cast<char*>(rotation.data()), degree * sizeof(uint32_t))) return false;
+
+		for(adjEntry adj : v->adjEntries) towards[adj->twinNode()] = adj;
+
+		List<adjEntry> order;
+		for(uint32_t w : rotation) {
+			if(w >= n || towards[byIndex[w]] == nullptr) return false;
+			order.pushBack(towards[byIndex[w]]);
+			towards[byIndex[w]] = nullptr; // every neighbour appears exactly once
+		}
+		G.sort(v, order);
+	}
+
+	return G.representsCombEmbedding();
+}
+
 std::string extractFileName(std::string path) {
     size_t name_start_pos = path.rfind("/")+1;
     size_t name_end_pos = path.rfind(".");